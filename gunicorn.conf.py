@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration for terminusgps-site.
+
+The application is imported and warmed up once in the master process, then its memory is frozen out of the garbage collector so forked workers keep sharing it. Workers are recycled after a number of requests or once their memory use exceeds a threshold.
+
+See https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import gc
+import os
+import resource
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+preload_app = True
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+max_worker_memory = int(os.getenv("GUNICORN_MAX_WORKER_MEMORY_MB", "512"))
+"""Resident memory in MiB after which a worker exits once its request is done."""
+
+
+def get_rss_mb() -> float:
+    """Returns the resident memory of the current process in MiB."""
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak rather than current usage where /proc isn't available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def when_ready(server):
+    from terminusgps.warmup import warm_up
+
+    warm_up()
+    # Objects allocated so far are never collected, so workers don't
+    # touch, and copy, the pages they live on
+    gc.collect()
+    gc.freeze()
+
+
+def post_request(worker, req, environ, resp):
+    rss = get_rss_mb()
+    if rss > max_worker_memory:
+        worker.log.info(
+            f"Worker {worker.pid} uses {rss:.0f} MiB, more than {max_worker_memory} MiB, restarting"
+        )
+        worker.alive = False
@@ -0,0 +1,111 @@
+import contextlib
+import logging
+import time
+
+from django.core.cache import BaseCache
+
+from terminusgps.throttling import get_throttle_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a service fast once it fails repeatedly, instead of waiting for each call to time out.
+
+    The circuit opens after ``failure_threshold`` failures within ``failure_window`` seconds, then calls raise :py:exc:`CircuitOpenError` for ``reset_timeout`` seconds. After that a single call is let through as a probe: the circuit closes if it succeeds and opens again if it fails. State is kept in the ``THROTTLE_CACHE_ALIAS`` cache, so it's shared by every worker.
+
+    :param name: Name of the service.
+    :type name: str
+    :param is_failure: A function returning whether an exception raised by a call means the service is failing.
+    :type is_failure: ~collections.abc.Callable[[BaseException], bool]
+    :param failure_threshold: Optional. Failures that open the circuit. Default is ``5``.
+    :type failure_threshold: int
+    :param failure_window: Optional. Seconds failures are counted for. Default is ``60``.
+    :type failure_window: int
+    :param reset_timeout: Optional. Seconds the circuit stays open before a probe. Default is ``30``.
+    :type reset_timeout: int
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_failure,
+        failure_threshold: int = 5,
+        failure_window: int = 60,
+        reset_timeout: int = 30,
+    ) -> None:
+        self.name = name
+        self.is_failure = is_failure
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.failures_key = f"circuit:{name}:failures"
+        self.open_key = f"circuit:{name}:open-until"
+        self.probe_key = f"circuit:{name}:probe"
+
+    def __str__(self) -> str:
+        return f"{self.name} circuit breaker"
+
+    @property
+    def cache(self) -> BaseCache:
+        return get_throttle_cache()
+
+    def is_open(self) -> bool:
+        """Returns whether calls currently fail fast."""
+        open_until = self.cache.get(self.open_key)
+        return open_until is not None and time.time() < open_until
+
+    @contextlib.contextmanager
+    def guard(self):
+        """
+        Runs the block as a call to the service, recording whether it failed.
+
+        :raises CircuitOpenError: If the circuit is open.
+
+        """
+        probe = False
+        open_until = self.cache.get(self.open_key)
+        if open_until is not None:
+            if time.time() < open_until or not self.cache.add(
+                self.probe_key, True, self.reset_timeout
+            ):
+                raise CircuitOpenError(f"{self} is open")
+            probe = True
+        try:
+            yield
+        except BaseException as error:
+            if self.is_failure(error):
+                self.record_failure(probe)
+            elif probe:
+                self.close()
+            raise
+        else:
+            if probe:
+                self.close()
+
+    def record_failure(self, probe: bool = False) -> None:
+        self.cache.add(self.failures_key, 0, self.failure_window)
+        try:
+            failures = self.cache.incr(self.failures_key)
+        except ValueError:
+            # Expired since it was added
+            failures = 1
+        if probe or failures >= self.failure_threshold:
+            self.open()
+
+    def open(self) -> None:
+        logger.warning(f"Opened {self} for {self.reset_timeout}s")
+        self.cache.set(self.open_key, time.time() + self.reset_timeout, None)
+        self.cache.delete_many([self.failures_key, self.probe_key])
+
+    def close(self) -> None:
+        logger.info(f"Closed {self}")
+        self.cache.delete_many(
+            [self.open_key, self.failures_key, self.probe_key]
+        )
@@ -0,0 +1,81 @@
+import time
+
+import boto3
+
+
+def create_invalidation(distribution_id: str, paths: list[str]) -> str:
+    """
+    Invalidates ``paths`` in a CloudFront distribution.
+
+    :param distribution_id: A CloudFront distribution id.
+    :type distribution_id: str
+    :param paths: URL paths to invalidate.
+    :type paths: list[str]
+    :returns: The invalidation id.
+    :rtype: str
+
+    """
+    client = boto3.client("cloudfront")
+    response = client.create_invalidation(
+        DistributionId=distribution_id,
+        InvalidationBatch={
+            "Paths": {"Quantity": len(paths), "Items": paths},
+            "CallerReference": f"terminusgps-site-{time.time_ns()}",
+        },
+    )
+    return response["Invalidation"]["Id"]
+
+
+def enable_compression(distribution_id: str) -> list[str]:
+    """
+    Makes a CloudFront distribution compress responses at the edge, with brotli or gzip depending on the viewer's ``Accept-Encoding``.
+
+    Turns on ``Compress`` for every cache behavior, and brotli and gzip in the custom cache policies they use. Managed cache policies can't be changed, ``CachingOptimized`` already enables both.
+
+    :param distribution_id: A CloudFront distribution id.
+    :type distribution_id: str
+    :returns: The changed cache behaviors and cache policies.
+    :rtype: list[str]
+
+    """
+    client = boto3.client("cloudfront")
+    response = client.get_distribution_config(Id=distribution_id)
+    config = response["DistributionConfig"]
+    behaviors = [
+        config["DefaultCacheBehavior"],
+        *config["CacheBehaviors"].get("Items", []),
+    ]
+    changed = []
+    for behavior in behaviors:
+        if not behavior.get("Compress"):
+            behavior["Compress"] = True
+            changed.append(f"behavior {behavior.get('PathPattern', '*')}")
+    if changed:
+        client.update_distribution(
+            Id=distribution_id,
+            IfMatch=response["ETag"],
+            DistributionConfig=config,
+        )
+    custom_policy_ids = {
+        item["CachePolicy"]["Id"]
+        for item in client.list_cache_policies(Type="custom")[
+            "CachePolicyList"
+        ].get("Items", [])
+    }
+    policy_ids = {behavior.get("CachePolicyId") for behavior in behaviors}
+    for policy_id in sorted(policy_ids & custom_policy_ids):
+        response = client.get_cache_policy_config(Id=policy_id)
+        policy = response["CachePolicyConfig"]
+        params = policy["ParametersInCacheKeyAndForwardedToOrigin"]
+        if (
+            params["EnableAcceptEncodingBrotli"]
+            and params["EnableAcceptEncodingGzip"]
+        ):
+            continue
+        params["EnableAcceptEncodingBrotli"] = True
+        params["EnableAcceptEncodingGzip"] = True
+        client.update_cache_policy(
+            Id=policy_id, IfMatch=response["ETag"], CachePolicyConfig=policy
+        )
+        changed.append(f"cache policy {policy['Name']}")
+    return changed
@@ -0,0 +1,228 @@
+import gzip
+import secrets
+import struct
+import zlib
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = frozenset(
+    {
+        "application/javascript",
+        "application/json",
+        "application/manifest+json",
+        "application/xml",
+        "image/svg+xml",
+        "text/css",
+        "text/csv",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+        "text/xml",
+    }
+)
+"""Content types worth compressing. Images, fonts and archives are already compressed."""
+
+
+def is_compressible(content_type: str) -> bool:
+    """
+    Returns whether a response of ``content_type`` is worth compressing.
+
+    :param content_type: A ``Content-Type`` header value, optionally with parameters.
+    :type content_type: str
+    :returns: Whether the content type is compressible.
+    :rtype: bool
+
+    """
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type in COMPRESSIBLE_CONTENT_TYPES
+
+
+def get_available_encodings() -> list[str]:
+    """Returns supported content encodings, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def get_accepted_encoding(
+    accept_encoding: str, encodings: list[str] | None = None
+) -> str | None:
+    """
+    Returns the most preferred available encoding allowed by ``accept_encoding``.
+
+    :param accept_encoding: An ``Accept-Encoding`` header value.
+    :type accept_encoding: str
+    :param encodings: Optional. Encodings to choose from, most preferred first. Default is :py:func:`get_available_encodings`.
+    :type encodings: list[str] | None
+    :returns: A content encoding, or ``None`` if the client accepts none.
+    :rtype: str | None
+
+    """
+    qualities = {}
+    for token in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in token.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    for encoding in encodings or get_available_encodings():
+        if qualities.get(encoding, qualities.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def get_gzip_header(max_random_bytes: int = 0) -> bytes:
+    """
+    Returns a gzip member header, with a random file name of up to ``max_random_bytes`` characters if it's set.
+
+    The random file name varies the compressed length, which mitigates BREACH attacks like Django's ``GZipMiddleware``.
+
+    :param max_random_bytes: Optional. Maximum length of the random file name. Default is ``0``, no file name.
+    :type max_random_bytes: int
+    :returns: A gzip header.
+    :rtype: bytes
+
+    """
+    # Magic number, deflate, flags, zero mtime, no extra flags, unknown OS
+    if not max_random_bytes:
+        return b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+    length = secrets.randbelow(max_random_bytes) + 1
+    filename = secrets.token_hex(max_random_bytes)[:length].encode()
+    return (
+        b"\x1f\x8b\x08"
+        + bytes([gzip.FNAME])
+        + b"\x00\x00\x00\x00\x00\xff"
+        + filename
+        + b"\x00"
+    )
+
+
+class GzipCompressor:
+    """
+    Compresses a stream into a gzip member, flushing on :py:meth:`flush` and writing the trailer on :py:meth:`finish`.
+
+    The header is written by :py:func:`get_gzip_header` so it can carry a random file name.
+
+    :param level: Compression level from ``1`` to ``9``.
+    :type level: int
+    :param max_random_bytes: Optional. Maximum length of the header's random file name. Default is ``0``.
+    :type max_random_bytes: int
+
+    """
+
+    def __init__(self, level: int, max_random_bytes: int = 0) -> None:
+        self.header = get_gzip_header(max_random_bytes)
+        self.compressor = zlib.compressobj(
+            level, zlib.DEFLATED, -zlib.MAX_WBITS
+        )
+        self.crc = 0
+        self.size = 0
+
+    def compress(self, data: bytes) -> bytes:
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        header, self.header = self.header, b""
+        return header + self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        header, self.header = self.header, b""
+        trailer = struct.pack("<2I", self.crc, self.size & 0xFFFFFFFF)
+        return header + self.compressor.flush() + trailer
+
+
+def compress_bytes(
+    content: bytes, encoding: str, level: int = 9, max_random_bytes: int = 0
+) -> bytes:
+    """
+    Compresses ``content`` with ``encoding``.
+
+    :param content: Content to compress.
+    :type content: bytes
+    :param encoding: ``"br"`` or ``"gzip"``.
+    :type encoding: str
+    :param level: Compression level from ``1`` to ``9``, scaled up for brotli. Default is ``9``.
+    :type level: int
+    :param max_random_bytes: Optional. Pads gzip with a random file name of up to this many characters, see :py:func:`get_gzip_header`. Brotli can't be padded. Default is ``0``.
+    :type max_random_bytes: int
+    :raises ValueError: If ``encoding`` is unsupported.
+    :returns: The compressed content.
+    :rtype: bytes
+
+    """
+    if encoding == "gzip":
+        compressor = GzipCompressor(level, max_random_bytes)
+        return compressor.compress(content) + compressor.finish()
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(content, quality=min(level + 2, 11))
+    raise ValueError(f"Unsupported content encoding: '{encoding}'")
+
+
+def compress_sequence(
+    sequence: Iterable[bytes],
+    encoding: str,
+    level: int = 5,
+    max_random_bytes: int = 0,
+) -> Iterator[bytes]:
+    """
+    Lazily compresses ``sequence``, flushing after every item so streamed content reaches the client as soon as it's produced.
+
+    :param sequence: An iterable of content chunks.
+    :type sequence: ~collections.abc.Iterable[bytes]
+    :param encoding: ``"br"`` or ``"gzip"``.
+    :type encoding: str
+    :param level: Compression level from ``1`` to ``9``. Default is ``5``.
+    :type level: int
+    :param max_random_bytes: Optional. Pads gzip with a random file name of up to this many characters, see :py:func:`get_gzip_header`. Default is ``0``.
+    :type max_random_bytes: int
+    :yields: Compressed chunks.
+    :rtype: ~collections.abc.Iterator[bytes]
+
+    """
+    compress, flush, finish = _get_stream_compressor(
+        encoding, level, max_random_bytes
+    )
+    for item in sequence:
+        data = compress(item) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_sequence(
+    sequence: AsyncIterator[bytes],
+    encoding: str,
+    level: int = 5,
+    max_random_bytes: int = 0,
+) -> AsyncIterator[bytes]:
+    """Asynchronous version of :py:func:`compress_sequence`."""
+    compress, flush, finish = _get_stream_compressor(
+        encoding, level, max_random_bytes
+    )
+    async for item in sequence:
+        data = compress(item) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def _get_stream_compressor(
+    encoding: str, level: int, max_random_bytes: int = 0
+):
+    if encoding == "gzip":
+        compressor = GzipCompressor(level, max_random_bytes)
+        return compressor.compress, compressor.flush, compressor.finish
+    if encoding == "br" and brotli is not None:
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.flush, compressor.finish
+    raise ValueError(f"Unsupported content encoding: '{encoding}'")
@@ -0,0 +1,123 @@
+import contextvars
+import dataclasses
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_CHECK_INTERVAL = 5
+"""Seconds a replica's health is reused for, per process."""
+
+# Zero while the replica has replayed everything it received, so an idle
+# primary doesn't look like lag
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+    )
+END
+"""
+
+
+@dataclasses.dataclass
+class RoutingState:
+    pinned: bool = False
+    """Whether reads go to the primary, set once the request writes."""
+    wrote: bool = False
+
+
+routing_state = contextvars.ContextVar("db_routing_state", default=None)
+"""Routing state of the current request, set by :py:class:`~terminusgps.middleware.PrimaryPinningMiddleware`."""
+
+_replica_health: dict[str, tuple[bool, float]] = {}
+_replica_health_lock = threading.Lock()
+
+
+def check_replica(alias: str) -> bool:
+    """
+    Returns whether the replica at ``alias`` is reachable and at most ``DATABASE_REPLICA_MAX_LAG`` seconds behind the primary.
+
+    :param alias: A database alias.
+    :type alias: str
+    :returns: Whether the replica is healthy.
+    :rtype: bool
+
+    """
+    connection = connections[alias]
+    max_lag = getattr(settings, "DATABASE_REPLICA_MAX_LAG", 10)
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor != "postgresql":
+                cursor.execute("SELECT 1")
+                return True
+            cursor.execute(REPLICA_LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError as error:
+        logger.warning(f"Replica '{alias}' is unavailable: {error}")
+        connection.close_if_unusable_or_obsolete()
+        return False
+    if lag > max_lag:
+        logger.warning(f"Replica '{alias}' is {lag:.1f}s behind")
+        return False
+    return True
+
+
+def is_replica_healthy(alias: str) -> bool:
+    """Returns the health of the replica at ``alias``, checking it at most every :py:data:`REPLICA_CHECK_INTERVAL` seconds."""
+    now = time.monotonic()
+    with _replica_health_lock:
+        healthy, checked_at = _replica_health.get(alias, (True, None))
+    if checked_at is not None and now - checked_at < REPLICA_CHECK_INTERVAL:
+        return healthy
+    healthy = check_replica(alias)
+    with _replica_health_lock:
+        _replica_health[alias] = (healthy, now)
+    return healthy
+
+
+class ReplicaRouter:
+    """
+    Routes reads to the ``DATABASE_REPLICAS`` aliases and writes to the primary, the default database.
+
+    Only requests passing through :py:class:`~terminusgps.middleware.PrimaryPinningMiddleware` read from replicas, tasks and management commands always use the primary. A request is pinned to the primary once it writes, when it isn't ``GET``, ``HEAD`` or ``OPTIONS``, and shortly after a previous request from the same client wrote, so clients read their own writes. Reads inside a transaction go to the primary as well.
+
+    Replicas are picked at random among healthy ones, see :py:func:`check_replica`. Without a healthy replica reads fall back to the primary.
+
+    """
+
+    def get_replicas(self) -> list[str]:
+        return getattr(settings, "DATABASE_REPLICAS", [])
+
+    def db_for_read(self, model, **hints) -> str:
+        state = routing_state.get()
+        if (
+            state is None
+            or state.pinned
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        replicas = [
+            alias for alias in self.get_replicas() if is_replica_healthy(alias)
+        ]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        state = routing_state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        databases = {DEFAULT_DB_ALIAS, *self.get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db not in self.get_replicas()
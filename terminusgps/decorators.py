@@ -1,6 +1,15 @@
 import functools
+import hashlib
 
 from django.http import HttpRequest, HttpResponse
+from django.utils.decorators import decorator_from_middleware_with_args
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+
+from terminusgps.surrogate_keys import (
+    get_template_surrogate_keys,
+    patch_surrogate_keys,
+)
 
 
 def is_htmx_request(request: HttpRequest) -> bool:
@@ -9,8 +18,55 @@ def is_htmx_request(request: HttpRequest) -> bool:
     return hx_request and not hx_boosted
 
 
-def htmx_template(template_name: str):
+def get_variant_etag(template_name: str, etag: str | None) -> str | None:
+    """
+    Returns an ETag for ``etag`` that is distinct for each template variant.
+
+    :param template_name: A template name, optionally with a ``#partial`` suffix.
+    :type template_name: str
+    :param etag: A view's ETag, or ``None`` if the view has none.
+    :type etag: str | None
+    :returns: A digest of the template name and ETag, or ``None``.
+    :rtype: str | None
+
+    """
+    if etag is None:
+        return None
+    return hashlib.sha256(f"{template_name}:{etag}".encode()).hexdigest()
+
+
+def htmx_template(template_name: str, etag_func=None, last_modified_func=None):
+    """
+    Sets ``request.template_name`` to the full template, or its ``#main`` partial for htmx requests.
+
+    Responses are tagged with the template's surrogate keys, see :py:func:`~terminusgps.surrogate_keys.get_template_surrogate_keys`.
+
+    If ``etag_func`` or ``last_modified_func`` are provided they are called with the view's arguments before the view, and matching conditional requests are answered with ``304 Not Modified`` without calling the view. ETags are mixed with the template name, so full and partial responses never share one.
+
+    :param template_name: A template name.
+    :type template_name: str
+    :param etag_func: Optional. A function returning an ETag for the request, or ``None``.
+    :type etag_func: ~collections.abc.Callable | None
+    :param last_modified_func: Optional. A function returning a last modified datetime for the request, or ``None``.
+    :type last_modified_func: ~collections.abc.Callable | None
+
+    """
+
     def outer_wrapper(view_func):
+        if etag_func is not None:
+
+            def variant_etag_func(request, *args, **kwargs):
+                etag = etag_func(request, *args, **kwargs)
+                return get_variant_etag(request.template_name, etag)
+
+        else:
+            variant_etag_func = None
+        if etag_func is not None or last_modified_func is not None:
+            view_func = condition(
+                etag_func=variant_etag_func,
+                last_modified_func=last_modified_func,
+            )(view_func)
+
         @functools.wraps(view_func)
         def inner_wrapper(
             request: HttpRequest, *args, **kwargs
@@ -19,8 +75,46 @@ def htmx_template(template_name: str):
                 request.template_name = template_name + "#main"
             else:
                 request.template_name = template_name
-            return view_func(request, *args, **kwargs)
+            response = view_func(request, *args, **kwargs)
+            if (
+                variant_etag_func is not None
+                and request.method in ("GET", "HEAD")
+                and response.status_code == 200
+                and not response.has_header("ETag")
+            ):
+                # The view may have produced the data its ETag depends on
+                etag = variant_etag_func(request, *args, **kwargs)
+                if etag is not None:
+                    response.headers["ETag"] = quote_etag(etag)
+            patch_surrogate_keys(
+                response, get_template_surrogate_keys(request.template_name)
+            )
+            return response
 
+        # Lets middleware find the template before calling the view
+        inner_wrapper.template_name = template_name
         return inner_wrapper
 
     return outer_wrapper
+
+
+def throttle(scope: str, rate: str, key="ip", methods=None):
+    """
+    Limits how often a client can call a view, see :py:class:`~terminusgps.middleware.ThrottleMiddleware`.
+
+    :param scope: Name shared by the buckets of the limit, unique per view and key.
+    :type scope: str
+    :param rate: Requests per period, e.g. ``"5/m"``.
+    :type rate: str
+    :param key: Optional. ``"ip"``, ``"user"`` or a function called with the view's arguments returning a bucket key. Default is ``"ip"``.
+    :type key: str | ~collections.abc.Callable
+    :param methods: Optional. Request methods to limit. Default is every method.
+    :type methods: ~collections.abc.Iterable[str] | None
+
+    """
+    # The middleware module imports this one
+    from terminusgps.middleware import ThrottleMiddleware
+
+    return decorator_from_middleware_with_args(ThrottleMiddleware)(
+        scope=scope, rate=rate, key=key, methods=methods
+    )
@@ -0,0 +1,66 @@
+import functools
+import re
+
+from django.templatetags.static import static
+from django.template import engines
+
+from terminusgps.surrogate_keys import get_parent_template_names
+
+LINK_TAG_PATTERN = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r"""([\w-]+)=(["'])(.*?)\2""", re.DOTALL)
+STATIC_TAG_PATTERN = re.compile(r"""{%\s*static\s+(["'])(.+?)\1\s*%}""")
+PRELOAD_RELS = ("preload", "modulepreload")
+
+
+def get_preload_link(tag: str) -> str | None:
+    """
+    Returns a ``Link`` header value for a ``<link rel="preload">`` or ``<link rel="modulepreload">`` tag in template source.
+
+    :param tag: A ``<link>`` tag, its ``href`` a literal URL or a ``{% static %}`` tag.
+    :type tag: str
+    :returns: A ``Link`` header value, or ``None`` if ``tag`` isn't a preload.
+    :rtype: str | None
+
+    """
+    attributes = {
+        name.lower(): value
+        for name, _, value in ATTRIBUTE_PATTERN.findall(tag)
+    }
+    rel, href = attributes.get("rel"), attributes.get("href", "")
+    if rel not in PRELOAD_RELS or "{{" in href:
+        return None
+    match = STATIC_TAG_PATTERN.fullmatch(href.strip())
+    if match:
+        href = static(match.group(2))
+    elif "{%" in href:
+        return None
+    link = f"<{href}>; rel={rel}"
+    if "as" in attributes:
+        link += f"; as={attributes['as']}"
+    return link
+
+
+@functools.lru_cache(maxsize=128)
+def get_template_preload_links(template_name: str) -> tuple[str, ...]:
+    """
+    Returns ``Link`` header values for the preloads declared by ``template_name`` and the templates it extends.
+
+    :param template_name: A template name.
+    :type template_name: str
+    :returns: ``Link`` header values, the furthest parent's first.
+    :rtype: tuple[str, ...]
+
+    """
+    engine = engines["django"].engine
+    names = [
+        *reversed(get_parent_template_names(template_name)),
+        template_name,
+    ]
+    links = []
+    for name in names:
+        source = engine.get_template(name).source
+        for tag in LINK_TAG_PATTERN.findall(source):
+            link = get_preload_link(tag)
+            if link is not None and link not in links:
+                links.append(link)
+    return tuple(links)
@@ -0,0 +1,147 @@
+import dataclasses
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from django.core.cache import cache, caches
+from django.db import connections
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+logger = logging.getLogger(__name__)
+
+WIALON_SID_CACHE_KEY = "health:wialon-sid"
+
+
+@dataclasses.dataclass(frozen=True)
+class Probe:
+    name: str
+    check: Callable[[], None]
+    """A function raising an exception if the dependency is unavailable."""
+    ttl: float
+    """Seconds a result is reused for."""
+    critical: bool = True
+    """Whether the process can't serve requests without the dependency."""
+
+
+@dataclasses.dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    latency: float
+    checked_at: float
+    error: str = ""
+
+
+def check_database() -> None:
+    with connections["default"].cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def check_cache() -> None:
+    default_cache = caches["default"]
+    default_cache.set("health:ping", 1, 10)
+    default_cache.get("health:ping")
+
+
+def check_wialon() -> None:
+    """Checks a Wialon session reused between probes is active, logging in again if it expired."""
+    from terminusgps.wialon import (
+        WialonSession,
+        session_is_active,
+        wialon_circuit_breaker,
+    )
+
+    if wialon_circuit_breaker.is_open():
+        raise RuntimeError(f"{wialon_circuit_breaker} is open")
+    session = WialonSession(sid=cache.get(WIALON_SID_CACHE_KEY))
+    if session.id is None or not session_is_active(session):
+        session = WialonSession()
+        session.login()
+        cache.set(WIALON_SID_CACHE_KEY, session.id, None)
+
+
+PROBES = [
+    Probe("database", check_database, ttl=5),
+    Probe("cache", check_cache, ttl=5),
+    Probe("wialon", check_wialon, ttl=60, critical=False),
+]
+
+_results: dict[str, ProbeResult] = {}
+_results_lock = threading.Lock()
+
+
+def run_probe(probe: Probe) -> tuple[ProbeResult, bool]:
+    """
+    Returns the result of ``probe``, checking the dependency again only once the last result is older than the probe's ttl.
+
+    Results are kept per process.
+
+    :param probe: A dependency probe.
+    :type probe: ~terminusgps.health.Probe
+    :returns: The result and whether it was reused.
+    :rtype: tuple[~terminusgps.health.ProbeResult, bool]
+
+    """
+    now = time.monotonic()
+    with _results_lock:
+        result = _results.get(probe.name)
+    if result is not None and now - result.checked_at < probe.ttl:
+        return result, True
+    try:
+        probe.check()
+    except Exception as error:
+        logger.warning(f"Readiness probe '{probe.name}' failed: {error}")
+        result = ProbeResult(
+            ok=False,
+            latency=time.monotonic() - now,
+            checked_at=now,
+            # Messages can hold hostnames, only the type is reported
+            error=type(error).__name__,
+        )
+    else:
+        result = ProbeResult(
+            ok=True, latency=time.monotonic() - now, checked_at=now
+        )
+    with _results_lock:
+        _results[probe.name] = result
+    return result, False
+
+
+@never_cache
+@require_safe
+def healthz_view(request: HttpRequest) -> HttpResponse:
+    return HttpResponse("ok", content_type="text/plain")
+
+
+@never_cache
+@require_safe
+def readyz_view(request: HttpRequest) -> HttpResponse:
+    """
+    Reports whether the process can serve requests, with the status of each dependency.
+
+    Responds ``503 Service Unavailable`` if a critical dependency is unavailable. A non-critical one, Wialon, only marks the process ``degraded``.
+
+    """
+    checks = {}
+    status = "ok"
+    for probe in PROBES:
+        result, cached = run_probe(probe)
+        checks[probe.name] = {
+            "status": "ok" if result.ok else "unavailable",
+            "critical": probe.critical,
+            "latency_ms": round(result.latency * 1000, 1),
+            "age_s": round(time.monotonic() - result.checked_at, 1),
+            "cached": cached,
+        }
+        if not result.ok:
+            checks[probe.name]["error"] = result.error
+            if probe.critical:
+                status = "unavailable"
+            elif status == "ok":
+                status = "degraded"
+    return JsonResponse(
+        {"status": status, "checks": checks},
+        status=503 if status == "unavailable" else 200,
+    )
@@ -0,0 +1,297 @@
+import math
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+from django.middleware.cache import (
+    FetchFromCacheMiddleware,
+    UpdateCacheMiddleware,
+)
+from django.utils.cache import (
+    add_never_cache_headers,
+    cc_delim_re,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.deprecation import MiddlewareMixin
+
+from terminusgps.compression import (
+    acompress_sequence,
+    compress_bytes,
+    compress_sequence,
+    get_accepted_encoding,
+    is_compressible,
+)
+from terminusgps.db_router import RoutingState, routing_state
+from terminusgps.decorators import is_htmx_request
+from terminusgps.early_hints import get_template_preload_links
+from terminusgps.surrogate_keys import index_response
+from terminusgps.throttling import KEY_FUNCS, parse_rate, take_token
+
+
+def has_session_cookie(request: HttpRequest) -> bool:
+    return settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def is_public_response(response: HttpResponse) -> bool:
+    directives = cc_delim_re.split(response.get("Cache-Control", ""))
+    return "public" in (d.partition("=")[0].lower() for d in directives)
+
+
+def remove_vary_header(response: HttpResponse, header: str) -> None:
+    vary = [
+        value
+        for value in cc_delim_re.split(response.get("Vary", ""))
+        if value and value.lower() != header.lower()
+    ]
+    if vary:
+        response.headers["Vary"] = ", ".join(vary)
+    else:
+        del response.headers["Vary"]
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses text responses with brotli or gzip, depending on what the client accepts.
+
+    Streaming responses are compressed chunk by chunk and flushed after every chunk. Responses shorter than :py:attr:`min_length` bytes, responses with a non-text content type and responses that are already encoded are left alone.
+
+    Gzip is padded with up to :py:attr:`max_random_bytes` random bytes to mitigate BREACH attacks, like Django's ``GZipMiddleware``. Brotli can't be padded, so it's only used for responses that can't contain a CSRF token: responses to requests that didn't call :py:func:`~django.middleware.csrf.get_token`, which aren't streamed.
+
+    """
+
+    min_length = 512
+    level = 5
+    max_random_bytes = 100
+
+    def may_contain_token(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> bool:
+        # Set by get_token(), streamed content may call it after this runs
+        return response.streaming or bool(
+            request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        )
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        if response.has_header("Content-Encoding"):
+            return response
+        if not is_compressible(response.get("Content-Type", "")):
+            return response
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = get_accepted_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""),
+            ["gzip"] if self.may_contain_token(request, response) else None,
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_sequence(
+                    response.streaming_content,
+                    encoding,
+                    self.level,
+                    self.max_random_bytes,
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content,
+                    encoding,
+                    self.level,
+                    self.max_random_bytes,
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress_bytes(
+                response.content, encoding, self.level, self.max_random_bytes
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The compressed body is only semantically equivalent to the original
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class EarlyHintsMiddleware(MiddlewareMixin):
+    """
+    Sends the preloads of a view's template as ``103 Early Hints`` before calling the view, and as a ``Link`` header on its response.
+
+    The template is the ``template_name`` attribute of the view function, set by :py:func:`~terminusgps.decorators.htmx_template`, or of a class-based view. Early hints are sent through the ``wsgi.early_hints`` callback gunicorn provides, other servers and proxies can generate them from the ``Link`` header.
+
+    """
+
+    def process_view(
+        self, request: HttpRequest, view_func, view_args, view_kwargs
+    ) -> None:
+        if request.method != "GET" or is_htmx_request(request):
+            return None
+        view_class = getattr(view_func, "view_class", None)
+        template_name = getattr(view_func, "template_name", None) or getattr(
+            view_class, "template_name", None
+        )
+        if not template_name:
+            return None
+        links = get_template_preload_links(template_name)
+        if not links:
+            return None
+        request.preload_links = links
+        send_early_hints = request.META.get("wsgi.early_hints")
+        if callable(send_early_hints):
+            send_early_hints([("Link", ", ".join(links))])
+        return None
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        links = getattr(request, "preload_links", None)
+        if links and response.status_code == 200:
+            if not response.has_header("Link"):
+                response.headers["Link"] = ", ".join(links)
+        return response
+
+
+class AnonymousUpdateCacheMiddleware(UpdateCacheMiddleware):
+    """
+    Shares public responses to anonymous visitors between them, in the page cache and in downstream caches.
+
+    A request without a session cookie is anonymous, so a ``public`` response to it that sets no cookies doesn't depend on the request's cookies and ``Cookie`` is removed from its ``Vary`` header. Public responses to requests with a session cookie, or setting a cookie, are made ``private`` instead. Shared responses stored in the page cache are indexed by their ``Surrogate-Key`` header for :py:func:`~terminusgps.surrogate_keys.purge_surrogate_keys`.
+
+    The CDN must bypass its cache for requests with a session cookie, like :py:class:`AnonymousFetchFromCacheMiddleware` does.
+
+    """
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        shared = is_public_response(response)
+        if shared and (has_session_cookie(request) or response.cookies):
+            patch_cache_control(response, private=True)
+            shared = False
+        elif shared:
+            remove_vary_header(response, "Cookie")
+        # Only set by the fetch middleware on a miss, hits are already indexed
+        stored = shared and getattr(request, "_cache_update_cache", False)
+        response = super().process_response(request, response)
+        if (
+            stored
+            and request.method in ("GET", "HEAD")
+            and response.status_code == 200
+        ):
+            index_response(request, response, self.key_prefix, self.cache)
+        return response
+
+
+class AnonymousFetchFromCacheMiddleware(FetchFromCacheMiddleware):
+    """Serves cached pages only to requests without a session cookie."""
+
+    def process_request(self, request: HttpRequest) -> HttpResponse | None:
+        if has_session_cookie(request):
+            request._cache_update_cache = False
+            return None
+        return super().process_request(request)
+
+
+class ThrottleMiddleware(MiddlewareMixin):
+    """
+    Limits how often a client can call views, answering with ``429 Too Many Requests`` and a ``Retry-After`` header once it runs out of tokens.
+
+    Installed in ``MIDDLEWARE`` it applies ``THROTTLE_RATE`` to every view per IP address, and isn't used if the setting is unset. Per-view limits are set with :py:func:`~terminusgps.decorators.throttle`. Buckets are kept in the ``THROTTLE_CACHE_ALIAS`` cache, see :py:func:`~terminusgps.throttling.take_token`.
+
+    Setting ``THROTTLE_ENABLED`` to ``False`` turns off every limit, e.g. to measure capacity with a load test.
+
+    :param scope: Optional. Name shared by the buckets of a limit. Default is ``"site"``.
+    :type scope: str | None
+    :param rate: Optional. Requests per period, e.g. ``"5/m"``. Default is ``THROTTLE_RATE``.
+    :type rate: str | None
+    :param key: Optional. ``"ip"``, ``"user"`` or a function called with the view's arguments returning a bucket key. Default is ``"ip"``.
+    :type key: str | ~collections.abc.Callable
+    :param methods: Optional. Request methods to limit. Default is every method.
+    :type methods: ~collections.abc.Iterable[str] | None
+
+    """
+
+    def __init__(
+        self,
+        get_response,
+        scope: str | None = None,
+        rate: str | None = None,
+        key="ip",
+        methods=None,
+    ) -> None:
+        super().__init__(get_response)
+        rate = rate or getattr(settings, "THROTTLE_RATE", None)
+        if rate is None:
+            raise MiddlewareNotUsed
+        self.scope = scope or "site"
+        self.count, self.period = parse_rate(rate)
+        self.key_func = KEY_FUNCS[key] if isinstance(key, str) else key
+        self.methods = {m.upper() for m in methods} if methods else None
+
+    def process_view(
+        self, request: HttpRequest, view_func, view_args, view_kwargs
+    ) -> HttpResponse | None:
+        if not getattr(settings, "THROTTLE_ENABLED", True):
+            return None
+        if self.methods is not None and request.method not in self.methods:
+            return None
+        key = self.key_func(request, *view_args, **view_kwargs)
+        wait = take_token(
+            f"throttle:{self.scope}:{key}", self.count, self.period
+        )
+        if not wait:
+            return None
+        retry_after = math.ceil(wait)
+        response = HttpResponse(
+            f"Too many requests, try again in {retry_after} seconds.",
+            content_type="text/plain",
+            status=429,
+            headers={"Retry-After": str(retry_after)},
+        )
+        add_never_cache_headers(response)
+        return response
+
+
+class PrimaryPinningMiddleware(MiddlewareMixin):
+    """
+    Lets :py:class:`~terminusgps.db_router.ReplicaRouter` send the request's reads to database replicas, until it writes.
+
+    Requests that aren't ``GET``, ``HEAD`` or ``OPTIONS`` read from the primary. After a request writes, a cookie pins the client's requests to the primary for ``DATABASE_REPLICA_PIN_SECONDS``, so a redirect after a write reads it back even if replicas lag behind.
+
+    """
+
+    cookie_name = "pin_primary"
+
+    def process_request(self, request: HttpRequest) -> None:
+        # Not reset after the response, streamed content still reads from it
+        routing_state.set(
+            RoutingState(
+                pinned=request.method not in ("GET", "HEAD", "OPTIONS")
+                or self.cookie_name in request.COOKIES
+            )
+        )
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        state = routing_state.get()
+        if state is not None and state.wrote:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 5),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,39 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator that uses the planner's row estimate for unfiltered PostgreSQL tables.
+
+    Falls back to an exact ``COUNT(*)`` for filtered querysets, other database backends and tables smaller than :py:attr:`exact_count_threshold` rows.
+
+    """
+
+    exact_count_threshold = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self._get_estimated_count()
+        if estimate is not None and estimate >= self.exact_count_threshold:
+            return estimate
+        return super().count
+
+    def _get_estimated_count(self) -> int | None:
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is None or query.where or query.distinct:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return int(row[0])
@@ -0,0 +1,61 @@
+import secrets
+
+from django.http import HttpRequest, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+
+class StreamingTemplateResponse(StreamingHttpResponse):
+    """
+    Streams a page shell before rendering content that depends on slow data.
+
+    The full template is rendered up front with a ``stream_marker`` in place of its ``content`` block, which ``terminusgps/layout.html`` supports. Everything before the marker, the head and navbar, is sent as soon as the response is returned. The values of ``deferred_context`` are called afterwards and the template's ``#main`` partial is sent once they are ready, followed by the rest of the layout.
+
+    Templates must render ``{% partial main %}`` as their ``content`` block. A partial template name is streamed as a single chunk. Since the status line is sent first, exceptions raised by ``deferred_context`` can only end the stream.
+
+    """
+
+    def __init__(
+        self,
+        request: HttpRequest,
+        template: str,
+        context: dict | None = None,
+        deferred_context: dict | None = None,
+        content_type: str | None = None,
+        status: int | None = None,
+        headers: dict | None = None,
+    ) -> None:
+        super().__init__(
+            content_type=content_type, status=status, headers=headers
+        )
+        self.template_name = template
+        self.context_data = context or {}
+        self.deferred_context = deferred_context or {}
+        head, tail, content_template = "", "", template
+        if "#" not in template:
+            marker = mark_safe(f"<!-- stream {secrets.token_hex(16)} -->")
+            shell = render_to_string(
+                template,
+                self.context_data | {"stream_marker": marker},
+                request,
+            )
+            head, found, tail = shell.partition(marker)
+            if found:
+                content_template = f"{template}#main"
+            else:
+                head, tail = "", ""
+        self.streaming_content = self.iter_content(
+            request, head, content_template, tail
+        )
+
+    def iter_content(
+        self, request: HttpRequest, head: str, template: str, tail: str
+    ):
+        if head:
+            yield head
+        context = self.context_data | {
+            key: value() for key, value in self.deferred_context.items()
+        }
+        yield render_to_string(template, context, request)
+        if tail:
+            yield tail
@@ -0,0 +1,57 @@
+import hashlib
+import re
+
+from botocore.exceptions import ClientError
+from django.core.files.storage import Storage
+from storages.backends.s3 import S3ManifestStaticStorage
+from storages.utils import clean_name
+
+HASHED_NAME_PATTERN = re.compile(r"\.[0-9a-f]{12}\.")
+
+
+class ImmutableManifestS3Storage(S3ManifestStaticStorage):
+    """
+    An S3 storage that stores content-hashed copies of static files and a manifest mapping names to them.
+
+    Hashed files are uploaded with a far-future ``immutable`` ``Cache-Control`` header. CloudFront compresses them at the edge, see :py:func:`~terminusgps.cloudfront.enable_compression`.
+
+    """
+
+    hashed_cache_control = "public, max-age=31536000, immutable"
+    # A missing manifest entry falls back to the unhashed URL instead of a 500
+    manifest_strict = False
+
+    def get_object_parameters(self, name: str) -> dict:
+        params = super().get_object_parameters(name)
+        if HASHED_NAME_PATTERN.search(name):
+            params["CacheControl"] = self.hashed_cache_control
+        return params
+
+    def file_matches(
+        self, name: str, source_storage: Storage, source_path: str
+    ) -> bool:
+        """
+        Returns whether the uploaded file ``name`` has the same content as ``source_path`` in ``source_storage``.
+
+        Compares the object's ETag, the MD5 digest of its content for single part uploads, without downloading it.
+
+        :param name: A file name in this storage.
+        :type name: str
+        :param source_storage: The storage ``source_path`` is found in.
+        :type source_storage: ~django.core.files.storage.Storage
+        :param source_path: A file name in ``source_storage``.
+        :type source_path: str
+        :returns: Whether the file is unchanged.
+        :rtype: bool
+
+        """
+        try:
+            obj = self.bucket.Object(self._normalize_name(clean_name(name)))
+            etag = obj.e_tag.strip('"')
+        except ClientError:
+            return False
+        digest = hashlib.md5(usedforsecurity=False)
+        with source_storage.open(source_path) as file:
+            for chunk in file.chunks():
+                digest.update(chunk)
+        return etag == digest.hexdigest()
@@ -32,6 +32,8 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "media/"
 
+PRERENDER_ROOT = BASE_DIR / "prerendered"
+
 MERCHANT_AUTH_LOGIN_ID = os.getenv("MERCHANT_AUTH_LOGIN_ID")
 
 MERCHANT_AUTH_TRANSACTION_KEY = os.getenv("MERCHANT_AUTH_TRANSACTION_KEY")
@@ -64,6 +66,8 @@ USE_TZ = True
 
 WSGI_APPLICATION = "terminusgps.wsgi.application"
 
+WIALON_API_URL = os.getenv("WIALON_API_URL", "https://hst-api.wialon.com")
+
 WIALON_TOKEN = os.getenv("WIALON_TOKEN")
 
 MESSAGE_TAGS = {
@@ -108,23 +112,27 @@ INSTALLED_APPS = [
     "django.contrib.humanize",
     "django.contrib.messages",
     "django.contrib.sessions",
+    "terminusgps_site.apps.TerminusgpsSiteConfig",
     "django.contrib.staticfiles",
     "django.forms",
     "phonenumber_field",
     "formset",
-    "terminusgps_site.apps.TerminusgpsSiteConfig",
     "terminusgps_installer.apps.TerminusgpsInstallerConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.middleware.cache.UpdateCacheMiddleware",
+    "terminusgps.middleware.AnonymousUpdateCacheMiddleware",
+    "terminusgps.middleware.CompressionMiddleware",
+    "terminusgps.middleware.EarlyHintsMiddleware",
+    "terminusgps.middleware.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "terminusgps.middleware.ThrottleMiddleware",
 ]
 
 LOGGING = {
@@ -185,6 +193,8 @@ DATABASES = {
     }
 }
 
+DATABASE_ROUTERS = ["terminusgps.db_router.ReplicaRouter"]
+
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.postgresql",
@@ -1,18 +1,37 @@
+import functools
 import logging.config
 import os
 import pathlib
 import socket
 import sys
 
+from django.utils.functional import lazy
+
 BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
 
+
+@functools.cache
+def resolve_host_ip() -> str:
+    return socket.gethostbyname(socket.gethostname())
+
+
+def get_host_ip() -> str:
+    """Returns the container's IP address for load balancer health checks, or an empty string, which matches no host, if its hostname doesn't resolve."""
+    try:
+        return resolve_host_ip()
+    except OSError:
+        # Not cached, so the next host validation tries again
+        return ""
+
+
 ALLOWED_HOSTS = [
     "terminusgps.com",
     ".terminusgps.com",
     ".elb.amazonaws.com",
     ".s3.amazonaws.com",
     ".awswaf.com",
-    socket.gethostbyname(socket.gethostname()),
+    # Resolved on the first request instead of at import, for load balancer health checks
+    lazy(get_host_ip, str)(),
 ]
 
 ADMINS = ["pspeckman@terminusgps.com", "blake@terminusgps.com"]
@@ -25,6 +44,8 @@ CSRF_COOKIE_SECURE = True
 
 CSRF_TRUSTED_ORIGINS = ["https://*.terminusgps.com", "https://terminusgps.com"]
 
+CLOUDFRONT_DISTRIBUTION_ID = os.getenv("CLOUDFRONT_DISTRIBUTION_ID")
+
 CORS_ALLOWED_ORIGINS = ["https://terminusgps-site-bucket.s3.amazonaws.com"]
 
 DEBUG = False
@@ -61,6 +82,8 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "media/"
 
+PRERENDER_ROOT = BASE_DIR / "prerendered"
+
 MERCHANT_AUTH_LOGIN_ID = os.getenv("MERCHANT_AUTH_LOGIN_ID")
 
 MERCHANT_AUTH_TRANSACTION_KEY = os.getenv("MERCHANT_AUTH_TRANSACTION_KEY")
@@ -83,6 +106,17 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 
 STATIC_URL = "static/"
 
+# Requests reach the site through CloudFront, then the load balancer. Each
+# appends the address it received the request from to X-Forwarded-For, so
+# the client is the second address from the right. Set it to 1 for requests
+# that go straight to the load balancer.
+THROTTLE_PROXY_COUNT = int(os.getenv("THROTTLE_PROXY_COUNT", "2"))
+
+# Set to 0 to turn off every throttle, for load tests measuring capacity
+THROTTLE_ENABLED = os.getenv("THROTTLE_ENABLED", "1") == "1"
+
+THROTTLE_RATE = "300/m"
+
 TIME_ZONE = "America/Chicago"
 
 USE_I18N = True
@@ -91,6 +125,16 @@ USE_TZ = True
 
 USE_X_FORWARDED_HOST = True
 
+WIALON_API_URL = os.getenv("WIALON_API_URL", "https://hst-api.wialon.com")
+
+WIALON_BACKGROUND_RESERVE = 0.5
+
+WIALON_MAX_CONCURRENT_REQUESTS = int(
+    os.getenv("WIALON_MAX_CONCURRENT_REQUESTS", "8")
+)
+
+WIALON_REQUESTS_PER_SECOND = int(os.getenv("WIALON_REQUESTS_PER_SECOND", "10"))
+
 WIALON_TOKEN = os.getenv("WIALON_TOKEN")
 
 WSGI_APPLICATION = "terminusgps.wsgi.application"
@@ -146,7 +190,7 @@ CACHES = {
 STORAGES = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
     "staticfiles": {
-        "BACKEND": "storages.backends.s3.S3Storage",
+        "BACKEND": "terminusgps.s3.ImmutableManifestS3Storage",
         "OPTIONS": {
             "bucket_name": os.getenv(
                 "AWS_S3_BUCKET_NAME", "terminusgps-site-bucket"
@@ -154,14 +198,16 @@ STORAGES = {
             "location": os.getenv("AWS_S3_BUCKET_LOCATION", "static/"),
             "region_name": os.getenv("AWS_S3_BUCKET_REGION", "us-east-1"),
             "verify": os.getenv("AWS_S3_CERT_PATH", False),
+            "querystring_auth": False,
         },
     },
 }
 
 TASKS = {
     "default": {
-        "BACKEND": "django.tasks.backends.immediate.ImmediateBackend",
+        "BACKEND": "terminusgps.task_backends.ThreadPoolBackend",
         "QUEUES": ["default"],
+        "OPTIONS": {"MAX_WORKERS": 2},
     }
 }
 
@@ -173,26 +219,30 @@ INSTALLED_APPS = [
     "django.contrib.humanize",
     "django.contrib.messages",
     "django.contrib.sessions",
+    "terminusgps_site.apps.TerminusgpsSiteConfig",
     "django.contrib.staticfiles",
     "django.forms",
     "formset",
     "phonenumber_field",
     "corsheaders",
-    "terminusgps_site.apps.TerminusgpsSiteConfig",
     "terminusgps_installer.apps.TerminusgpsInstallerConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.cache.UpdateCacheMiddleware",
+    "terminusgps.middleware.AnonymousUpdateCacheMiddleware",
+    "terminusgps.middleware.CompressionMiddleware",
+    "terminusgps.middleware.EarlyHintsMiddleware",
+    "terminusgps.middleware.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "django.middleware.cache.FetchFromCacheMiddleware",
+    "terminusgps.middleware.AnonymousFetchFromCacheMiddleware",
+    "terminusgps.middleware.ThrottleMiddleware",
 ]
 
 TEMPLATES = [
@@ -223,6 +273,25 @@ DATABASES = {
     }
 }
 
+# Comma-separated hosts of streaming replicas of the default database
+DATABASES.update(
+    {
+        f"replica_{i}": DATABASES["default"]
+        | {"HOST": host.strip(), "TEST": {"MIRROR": "default"}}
+        for i, host in enumerate(
+            filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+        )
+    }
+)
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+DATABASE_REPLICA_MAX_LAG = 10
+
+DATABASE_REPLICA_PIN_SECONDS = 5
+
+DATABASE_ROUTERS = ["terminusgps.db_router.ReplicaRouter"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -0,0 +1,83 @@
+import dataclasses
+import time
+from typing import Any
+
+from django.core.cache import cache
+
+REVALIDATE_LOCK_TIMEOUT = 60
+"""Seconds before another revalidation of the same key can be started."""
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedValue:
+    value: Any
+    stale: bool = False
+    """Whether the value is older than its maximum age."""
+
+
+def set_cached_value(key: str, value: Any, stale_ttl: int) -> None:
+    """
+    Caches ``value`` for :py:func:`get_stale_while_revalidate`.
+
+    :param key: A cache key.
+    :type key: str
+    :param value: A value.
+    :type value: ~typing.Any
+    :param stale_ttl: Seconds to keep the value for.
+    :type stale_ttl: int
+    :returns: Nothing.
+    :rtype: None
+
+    """
+    cache.set(key, (value, time.time()), stale_ttl)
+    cache.delete(f"{key}:revalidating")
+
+
+def get_cached_age(key: str) -> float | None:
+    """
+    Returns the age of the value cached at ``key``.
+
+    :param key: A cache key.
+    :type key: str
+    :returns: Seconds since the value was cached, or ``None`` if it isn't.
+    :rtype: float | None
+
+    """
+    cached = cache.get(key)
+    return None if cached is None else time.time() - cached[1]
+
+
+def get_stale_while_revalidate(
+    key: str, fetch, revalidate, max_age: int, stale_ttl: int
+) -> CachedValue:
+    """
+    Returns the cached value at ``key``, serving it stale while it's revalidated in the background.
+
+    A value up to ``max_age`` seconds old is returned as is. An older value is returned marked stale, and ``revalidate`` is called to refresh it, at most once per :py:data:`REVALIDATE_LOCK_TIMEOUT`. Without a cached value, ``fetch`` is called and its result cached for ``stale_ttl`` seconds.
+
+    :param key: A cache key.
+    :type key: str
+    :param fetch: A function returning a fresh value.
+    :type fetch: ~collections.abc.Callable
+    :param revalidate: A function starting a refresh of the value, which should store it with :py:func:`set_cached_value`.
+    :type revalidate: ~collections.abc.Callable
+    :param max_age: Seconds a value is fresh for.
+    :type max_age: int
+    :param stale_ttl: Seconds a value is kept for.
+    :type stale_ttl: int
+    :raises Exception: Whatever ``fetch`` raises.
+    :returns: The value and whether it's stale.
+    :rtype: ~terminusgps.stale_cache.CachedValue
+
+    """
+    cached = cache.get(key)
+    if cached is None:
+        value = fetch()
+        set_cached_value(key, value, stale_ttl)
+        return CachedValue(value)
+    value, fetched_at = cached
+    if time.time() - fetched_at <= max_age:
+        return CachedValue(value)
+    if cache.add(f"{key}:revalidating", True, REVALIDATE_LOCK_TIMEOUT):
+        revalidate()
+    return CachedValue(value, stale=True)
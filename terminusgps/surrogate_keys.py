@@ -0,0 +1,213 @@
+import functools
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.http import HttpRequest, HttpResponse
+from django.template import engines
+from django.template.loader_tags import ExtendsNode
+from django.utils.cache import get_cache_key
+
+from terminusgps.throttling import is_redis_cache
+
+logger = logging.getLogger(__name__)
+
+SURROGATE_KEY_HEADER = "Surrogate-Key"
+SITE_SURROGATE_KEY = "terminusgps"
+"""Key tagging every response, purging it purges the whole site."""
+MAX_INDEXED_PATHS = 1000
+"""Maximum number of paths remembered per key, the oldest are forgotten first."""
+MAX_INDEXED_CACHE_KEYS = 20
+"""Maximum number of page cache keys remembered per path, one per query string, the oldest are forgotten first."""
+
+# Adds a path to the sorted sets of its surrogate keys and its page cache
+# key to the sorted set of the path, scored by time so the oldest members
+# are trimmed first. KEYS are the surrogate key sets, then the path's set.
+INDEX_SCRIPT = """
+local now = redis.call("TIME")[1]
+for i = 1, #KEYS - 1 do
+    redis.call("ZADD", KEYS[i], now, ARGV[1])
+    redis.call("ZREMRANGEBYRANK", KEYS[i], 0, -tonumber(ARGV[3]) - 1)
+end
+redis.call("ZADD", KEYS[#KEYS], now, ARGV[2])
+redis.call("ZREMRANGEBYRANK", KEYS[#KEYS], 0, -tonumber(ARGV[4]) - 1)
+return 0
+"""
+
+_index_lock = threading.Lock()
+
+
+def get_surrogate_key(template_name: str) -> str:
+    """Returns the surrogate key of ``template_name``, ignoring a ``#partial`` suffix."""
+    name = template_name.partition("#")[0]
+    return name.removesuffix(".html").replace("/", "-")
+
+
+def get_parent_template_names(template_name: str) -> list[str]:
+    """Returns the names of the templates ``template_name`` extends, nearest first."""
+    engine = engines["django"].engine
+    names = []
+    while True:
+        template = engine.get_template(template_name)
+        nodes = [n for n in template.nodelist if isinstance(n, ExtendsNode)]
+        # Parents chosen at render time by a variable can't be known
+        if not nodes or not isinstance(nodes[0].parent_name.var, str):
+            return names
+        template_name = str(nodes[0].parent_name.var)
+        names.append(template_name)
+
+
+@functools.lru_cache(maxsize=128)
+def get_template_surrogate_keys(template_name: str) -> tuple[str, ...]:
+    """
+    Returns the surrogate keys of a response rendered from ``template_name``.
+
+    Full templates are also tagged with the keys of the templates they extend, partials only with their own.
+
+    :param template_name: A template name, optionally with a ``#partial`` suffix.
+    :type template_name: str
+    :returns: Surrogate keys.
+    :rtype: tuple[str, ...]
+
+    """
+    keys = [SITE_SURROGATE_KEY, get_surrogate_key(template_name)]
+    if "#" not in template_name:
+        keys.extend(
+            get_surrogate_key(name)
+            for name in get_parent_template_names(template_name)
+        )
+    return tuple(keys)
+
+
+def get_surrogate_keys(response: HttpResponse) -> list[str]:
+    return response.get(SURROGATE_KEY_HEADER, "").split()
+
+
+def patch_surrogate_keys(response: HttpResponse, keys) -> None:
+    """Adds ``keys`` to the ``Surrogate-Key`` header of ``response``."""
+    existing = get_surrogate_keys(response)
+    keys = existing + [key for key in keys if key not in existing]
+    response.headers[SURROGATE_KEY_HEADER] = " ".join(keys)
+
+
+def get_index_cache_key(key: str) -> str:
+    return f"surrogate-key:{key}"
+
+
+def get_path_cache_key(path: str) -> str:
+    return f"surrogate-key-path:{path}"
+
+
+def get_default_cache() -> BaseCache:
+    return caches[settings.CACHE_MIDDLEWARE_ALIAS]
+
+
+def index_response(
+    request: HttpRequest,
+    response: HttpResponse,
+    key_prefix: str | None = None,
+    cache: BaseCache | None = None,
+) -> None:
+    """
+    Remembers the path of ``request`` and its page cache key under each surrogate key of ``response``.
+
+    Indexes are sorted sets updated atomically by a Lua script when ``cache`` is a ``django_redis`` cache. Other caches are updated under a per-process lock, which is only atomic for a single process.
+
+    :param request: A request whose response was stored in the page cache.
+    :type request: ~django.http.HttpRequest
+    :param response: The response.
+    :type response: ~django.http.HttpResponse
+    :param key_prefix: Optional. The cache middleware key prefix. Default is the ``CACHE_MIDDLEWARE_KEY_PREFIX`` setting.
+    :type key_prefix: str | None
+    :param cache: Optional. The page cache. Default is the ``CACHE_MIDDLEWARE_ALIAS`` cache.
+    :type cache: ~django.core.cache.backends.base.BaseCache | None
+    :returns: Nothing.
+    :rtype: None
+
+    """
+    cache = cache or get_default_cache()
+    cache_key = get_cache_key(request, key_prefix, request.method, cache=cache)
+    keys = get_surrogate_keys(response)
+    if cache_key is None or not keys:
+        return
+    if is_redis_cache(cache):
+        client = cache.client.get_client(write=True)
+        script = client.register_script(INDEX_SCRIPT)
+        script(
+            keys=[cache.make_key(get_index_cache_key(key)) for key in keys]
+            + [cache.make_key(get_path_cache_key(request.path))],
+            args=[
+                request.path,
+                cache_key,
+                MAX_INDEXED_PATHS,
+                MAX_INDEXED_CACHE_KEYS,
+            ],
+        )
+        return
+
+    with _index_lock:
+        for key in keys:
+            index = cache.get(get_index_cache_key(key), {})
+            cache_keys = index.pop(request.path, [])
+            if cache_key in cache_keys:
+                cache_keys.remove(cache_key)
+            cache_keys.append(cache_key)
+            index[request.path] = cache_keys[-MAX_INDEXED_CACHE_KEYS:]
+            while len(index) > MAX_INDEXED_PATHS:
+                del index[next(iter(index))]
+            cache.set(get_index_cache_key(key), index, timeout=None)
+
+
+def purge_surrogate_keys(keys, cache: BaseCache | None = None) -> list[str]:
+    """
+    Deletes the cached pages tagged with any of ``keys`` and invalidates their paths on the CDN.
+
+    The CDN is only invalidated if the ``CLOUDFRONT_DISTRIBUTION_ID`` setting is set.
+
+    :param keys: Surrogate keys.
+    :type keys: ~collections.abc.Iterable[str]
+    :param cache: Optional. The page cache. Default is the ``CACHE_MIDDLEWARE_ALIAS`` cache.
+    :type cache: ~django.core.cache.backends.base.BaseCache | None
+    :returns: The purged paths.
+    :rtype: list[str]
+
+    """
+    cache = cache or get_default_cache()
+    index_keys = [get_index_cache_key(key) for key in keys]
+    paths, cache_keys = set(), []
+    if is_redis_cache(cache):
+        client = cache.client.get_client(write=True)
+        index_keys = [cache.make_key(key) for key in index_keys]
+        for index_key in index_keys:
+            paths.update(
+                path.decode() for path in client.zrange(index_key, 0, -1)
+            )
+        path_keys = [
+            cache.make_key(get_path_cache_key(path)) for path in paths
+        ]
+        for path_key in path_keys:
+            cache_keys.extend(
+                cache_key.decode()
+                for cache_key in client.zrange(path_key, 0, -1)
+            )
+        cache.delete_many(cache_keys)
+        if index_keys:
+            client.delete(*index_keys, *path_keys)
+    else:
+        for index in cache.get_many(index_keys).values():
+            for path, path_cache_keys in index.items():
+                paths.add(path)
+                cache_keys.extend(path_cache_keys)
+        cache.delete_many(cache_keys + index_keys)
+    paths = sorted(paths)
+    distribution_id = getattr(settings, "CLOUDFRONT_DISTRIBUTION_ID", None)
+    if paths and distribution_id:
+        from terminusgps.cloudfront import create_invalidation
+
+        invalidation_id = create_invalidation(distribution_id, paths)
+        logger.info(
+            f"Created invalidation '{invalidation_id}' for {len(paths)} paths"
+        )
+    return paths
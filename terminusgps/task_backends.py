@@ -0,0 +1,45 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.tasks.backends.immediate import ImmediateBackend
+
+
+class ThreadPoolBackend(ImmediateBackend):
+    """
+    Runs tasks on a pool of background threads in the process enqueuing them, so requests don't wait for them.
+
+    Each process starts its own pool on its first enqueue, pools aren't inherited across forks. Pending tasks are finished before the process exits, but are lost if it is killed. The pool size is the ``MAX_WORKERS`` option, ``2`` by default.
+
+    """
+
+    def __init__(self, alias, params):
+        super().__init__(alias, params)
+        self.max_workers = self.options.get("MAX_WORKERS", 2)
+        self._executor = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._forget_executor)
+
+    def _forget_executor(self) -> None:
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"tasks-{self.alias}",
+                )
+            return self._executor
+
+    def _execute_task(self, task_result):
+        self.get_executor().submit(self._run_task, task_result)
+
+    def _run_task(self, task_result):
+        try:
+            super()._execute_task(task_result)
+        finally:
+            # Connections are per thread, don't leave them open in the pool
+            connections.close_all()
@@ -0,0 +1,237 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.http import HttpRequest
+
+RATE_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Refills and takes a token in one step, so concurrent workers can't both
+# take the last one. Returns the seconds to wait for a token, 0 if one was
+# taken. Floats are returned as strings, Redis truncates Lua numbers.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 + reserve then
+    tokens = tokens - 1
+else
+    wait = (1 + reserve - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+# Takes one of a limited number of slots, dropping slots held past their
+# timeout by crashed workers. Returns 1 if a slot was taken, 0 otherwise.
+SLOTS_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local timeout = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now)
+if redis.call("ZCARD", KEYS[1]) >= limit then
+    return 0
+end
+redis.call("ZADD", KEYS[1], now + timeout, ARGV[2])
+redis.call("EXPIRE", KEYS[1], math.ceil(timeout) + 1)
+return 1
+"""
+
+_bucket_lock = threading.Lock()
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parses a rate like ``"5/m"`` into a number of requests and a period.
+
+    :param rate: A number of requests, a slash and a period of ``s``, ``m``, ``h`` or ``d``.
+    :type rate: str
+    :raises ValueError: If the rate is malformed.
+    :returns: A tuple of requests and seconds.
+    :rtype: tuple[int, int]
+
+    """
+    count, _, period = rate.partition("/")
+    if period[:1] not in RATE_PERIODS or not count.isdigit():
+        raise ValueError(f"Invalid rate '{rate}', expected e.g. '5/m'.")
+    return int(count), RATE_PERIODS[period[:1]]
+
+
+def get_client_ip(request: HttpRequest) -> str:
+    """
+    Returns the IP address of the client making ``request``.
+
+    Behind ``THROTTLE_PROXY_COUNT`` reverse proxies the address is taken from ``X-Forwarded-For``, counting from the right, since clients can prepend anything to it.
+
+    :param request: An HTTP request.
+    :type request: ~django.http.HttpRequest
+    :returns: An IP address.
+    :rtype: str
+
+    """
+    proxy_count = getattr(settings, "THROTTLE_PROXY_COUNT", 0)
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if proxy_count and forwarded_for:
+        addresses = [a.strip() for a in forwarded_for.split(",")]
+        return addresses[-min(proxy_count, len(addresses))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def get_ip_key(request: HttpRequest, *args, **kwargs) -> str:
+    return f"ip:{get_client_ip(request)}"
+
+
+def get_user_key(request: HttpRequest, *args, **kwargs) -> str:
+    """Returns a key for the request's user, or its IP address if anonymous."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return get_ip_key(request)
+
+
+KEY_FUNCS = {"ip": get_ip_key, "user": get_user_key}
+
+
+def get_throttle_cache() -> BaseCache:
+    return caches[getattr(settings, "THROTTLE_CACHE_ALIAS", "default")]
+
+
+def is_redis_cache(cache: BaseCache) -> bool:
+    return type(cache).__module__.startswith("django_redis")
+
+
+def take_token(
+    key: str,
+    count: int,
+    period: int,
+    cache: BaseCache | None = None,
+    reserve: float = 0,
+) -> float:
+    """
+    Takes a token from the bucket at ``key``, which holds up to ``count`` tokens and refills at ``count`` per ``period``.
+
+    Buckets are updated atomically by a Lua script when ``cache`` is a ``django_redis`` cache. Other caches are updated under a per-process lock, which is only atomic for a single process.
+
+    :param key: A bucket key.
+    :type key: str
+    :param count: The bucket's capacity.
+    :type count: int
+    :param period: Seconds for an empty bucket to refill.
+    :type period: int
+    :param cache: Optional. A cache. Default is the ``THROTTLE_CACHE_ALIAS`` cache.
+    :type cache: ~django.core.cache.BaseCache | None
+    :param reserve: Optional. Tokens to leave in the bucket for other callers. Default is ``0``.
+    :type reserve: float
+    :returns: Seconds until a token is available, ``0`` if one was taken.
+    :rtype: float
+
+    """
+    if cache is None:
+        cache = get_throttle_cache()
+    rate = count / period
+    if is_redis_cache(cache):
+        client = cache.client.get_client(write=True)
+        script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return float(
+            script(keys=[cache.make_key(key)], args=[count, rate, reserve])
+        )
+
+    with _bucket_lock:
+        now = time.time()
+        tokens, updated = cache.get(key, (count, now))
+        tokens = min(count, tokens + max(0, now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1 + reserve:
+            tokens -= 1
+        else:
+            wait = (1 + reserve - tokens) / rate
+        cache.set(key, (tokens, now), math.ceil(count / rate) + 1)
+    return wait
+
+
+def acquire_slot(
+    key: str,
+    limit: int,
+    token: str,
+    timeout: float,
+    cache: BaseCache | None = None,
+) -> bool:
+    """
+    Takes one of ``limit`` slots at ``key`` for ``token``, limiting how many callers can do something at once.
+
+    Slots are released by :py:func:`release_slot`, or expire after ``timeout`` seconds. Like :py:func:`take_token`, slots are only shared between processes by a ``django_redis`` cache.
+
+    :param key: A slots key.
+    :type key: str
+    :param limit: Maximum number of slots taken at once.
+    :type limit: int
+    :param token: A unique token for the slot.
+    :type token: str
+    :param timeout: Seconds after which the slot is released anyway.
+    :type timeout: float
+    :param cache: Optional. A cache. Default is the ``THROTTLE_CACHE_ALIAS`` cache.
+    :type cache: ~django.core.cache.BaseCache | None
+    :returns: Whether a slot was taken.
+    :rtype: bool
+
+    """
+    if cache is None:
+        cache = get_throttle_cache()
+    if is_redis_cache(cache):
+        client = cache.client.get_client(write=True)
+        script = client.register_script(SLOTS_SCRIPT)
+        return bool(
+            script(keys=[cache.make_key(key)], args=[limit, token, timeout])
+        )
+
+    with _bucket_lock:
+        now = time.time()
+        slots = {
+            t: expires
+            for t, expires in cache.get(key, {}).items()
+            if expires > now
+        }
+        if len(slots) >= limit:
+            return False
+        slots[token] = now + timeout
+        cache.set(key, slots, math.ceil(timeout) + 1)
+    return True
+
+
+def release_slot(key: str, token: str, cache: BaseCache | None = None) -> None:
+    """
+    Releases the slot at ``key`` taken for ``token`` by :py:func:`acquire_slot`.
+
+    :param key: A slots key.
+    :type key: str
+    :param token: The slot's token.
+    :type token: str
+    :param cache: Optional. A cache. Default is the ``THROTTLE_CACHE_ALIAS`` cache.
+    :type cache: ~django.core.cache.BaseCache | None
+    :returns: Nothing.
+    :rtype: None
+
+    """
+    if cache is None:
+        cache = get_throttle_cache()
+    if is_redis_cache(cache):
+        client = cache.client.get_client(write=True)
+        client.zrem(cache.make_key(key), token)
+        return
+
+    with _bucket_lock:
+        slots = cache.get(key, {})
+        if slots.pop(token, None) is not None:
+            expires = max(slots.values(), default=time.time())
+            cache.set(key, slots, math.ceil(expires - time.time()) + 1)
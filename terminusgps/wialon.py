@@ -1,24 +1,142 @@
+import contextlib
+import contextvars
 import functools
 import json
 import urllib.parse
 from typing import Any
 
 from django.conf import settings
-from wialon.api import Wialon, WialonError
 
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 from .constants import CommandFlag, CommandLinkType
+from .wialon_scheduler import schedule_requests
+
+DEFAULT_WIALON_API_URL = "https://hst-api.wialon.com"
+
+_timeout: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "wialon_timeout", default=None
+)
+
+
+@contextlib.contextmanager
+def wialon_timeout(seconds: float):
+    """
+    Makes Wialon API requests within the block time out after ``seconds``, instead of the socket's default timeout.
+
+    :param seconds: Seconds to wait for each connection and read.
+    :type seconds: float
+
+    """
+    token = _timeout.set(seconds)
+    try:
+        yield
+    finally:
+        _timeout.reset(token)
+
+
+def urlopen(request, *args, **kwargs):
+    """Opens ``request`` like :py:func:`urllib.request.urlopen`, with the timeout set by :py:func:`wialon_timeout`."""
+    import urllib.request
+
+    if (timeout := _timeout.get()) is not None:
+        kwargs.setdefault("timeout", timeout)
+    return urllib.request.urlopen(request, *args, **kwargs)
+
+
+@functools.cache
+def get_wialon_api():
+    """
+    Returns the :py:mod:`wialon.api` module, opening its requests with :py:func:`urlopen`.
+
+    Imported on first use rather than at startup, it pulls in ``urllib.request``, ``http.client`` and ``ssl``.
+
+    """
+    import wialon.api
+
+    # python-wialon opens every request with urlopen() and no timeout
+    wialon.api.urlopen = urlopen
+    return wialon.api
+
+
+def is_wialon_outage(error: BaseException) -> bool:
+    """Returns whether ``error`` means the Wialon API is down or unreachable, rather than a call was refused."""
+    from wialon.api import WialonError
+
+    if isinstance(error, WialonError):
+        # python-wialon raises code 0 for HTTP and connection errors
+        return error._code == 0
+    return isinstance(error, OSError)
+
+
+wialon_circuit_breaker = CircuitBreaker("wialon", is_failure=is_wialon_outage)
+
+
+def guard_requests(request_func):
+    """
+    Wraps a :py:meth:`wialon.api.Wialon.request` method to run its requests guarded by :py:data:`wialon_circuit_breaker`.
+
+    While the circuit is open requests raise :py:exc:`wialon.api.WialonError` with code ``0``, like a connection error, without calling Wialon.
+
+    :param request_func: A bound ``request`` method.
+    :type request_func: ~collections.abc.Callable
+    :returns: The wrapped method.
+    :rtype: ~collections.abc.Callable
+
+    """
+
+    @functools.wraps(request_func)
+    def wrapper(action_name, url, params):
+        try:
+            with wialon_circuit_breaker.guard():
+                return request_func(action_name, url, params)
+        except CircuitOpenError as error:
+            from wialon.api import WialonError
+
+            raise WialonError(0, str(error)) from error
+
+    return wrapper
+
+
+def get_wialon_api_location() -> tuple[str, str, int]:
+    """
+    Returns the scheme, host and port of the Wialon API, set by ``WIALON_API_URL``.
+
+    Point ``WIALON_API_URL`` at a stand-in to run without Wialon, e.g. for load tests.
+
+    :returns: A scheme, host and port.
+    :rtype: tuple[str, str, int]
+
+    """
+    url = urllib.parse.urlsplit(
+        getattr(settings, "WIALON_API_URL", None) or DEFAULT_WIALON_API_URL
+    )
+    return (
+        url.scheme,
+        url.hostname or "",
+        url.port or (443 if url.scheme == "https" else 80),
+    )
 
 
 class WialonSession:
     def __init__(
         self,
-        scheme: str = "https",
-        host: str = "hst-api.wialon.com",
-        port: int = 443,
+        scheme: str | None = None,
+        host: str | None = None,
+        port: int | None = None,
         sid: str | None = None,
         token: str | None = None,
     ) -> None:
-        self._wialon_api = Wialon(scheme=scheme, host=host, port=port, sid=sid)
+        default_scheme, default_host, default_port = get_wialon_api_location()
+        self._wialon_api = get_wialon_api().Wialon(
+            scheme=scheme or default_scheme,
+            host=host or default_host,
+            port=port or default_port,
+            sid=sid,
+        )
+        # Every API call goes through request()
+        self._wialon_api.request = guard_requests(
+            schedule_requests(self._wialon_api.request)
+        )
         self._token = token or settings.WIALON_TOKEN
         self._uid = None
         self._gis_sid = None
@@ -54,6 +172,8 @@ class WialonSession:
         self._gis_sid = response.get("gis_sid")
 
     def logout(self) -> None:
+        from wialon.api import WialonError
+
         sid = self.wialon_api.sid
         if sid is not None:
             response = self.wialon_api.core_logout()
@@ -122,6 +242,8 @@ def session_is_active(session: WialonSession) -> bool:
     :rtype: bool
 
     """
+    from wialon.api import WialonError
+
     try:
         session.wialon_api.avl_evts()
     except WialonError as error:
@@ -186,10 +308,64 @@ def get_unit_by_imei(
         }
     )
     if response["totalItemsCount"] != 1:
+        from wialon.api import WialonError
+
         raise WialonError(-1, f"Too many items returned for IMEI #: {imei}")
     return response["items"][0]
 
 
+def get_units_by_imeis(
+    session: WialonSession, imeis: Sequence[str], flags: int = 1
+) -> dict[str, dict]:
+    """
+    Returns Wialon unit dictionaries by IMEI # (sys_unique_id) in a single batch call.
+
+    IMEI #s that don't match exactly one Wialon unit are omitted from the result.
+
+    :param session: A valid Wialon API session.
+    :type session: ~terminusgps.wialon.WialonSession
+    :param imeis: A sequence of IMEI numbers.
+    :type imeis: ~collections.abc.Sequence[str]
+    :param flags: Response flags. Default is ``1``.
+    :type flags: int
+    :raises wialon.api.WialonError: If anything went wrong calling the Wialon API.
+    :returns: A dictionary of Wialon unit dictionaries keyed by IMEI #.
+    :rtype: dict[str, dict]
+
+    """
+    if not imeis:
+        return {}
+    response = session.wialon_api.core_batch(
+        **{
+            "params": [
+                {
+                    "svc": "core/search_items",
+                    "params": {
+                        "spec": {
+                            "itemsType": "avl_unit",
+                            "propName": "sys_unique_id",
+                            "propValueMask": f"={imei}",
+                            "propType": "property",
+                            "sortType": "sys_name",
+                        },
+                        "from": 0,
+                        "to": 0,
+                        "force": 0,
+                        "flags": flags,
+                    },
+                }
+                for imei in imeis
+            ],
+            "flags": 0,
+        }
+    )
+    return {
+        imei: result["items"][0]
+        for imei, result in zip(imeis, response)
+        if result.get("totalItemsCount") == 1
+    }
+
+
 @functools.lru_cache(maxsize=300)
 def get_unit_by_id(
     session: WialonSession, unit_id: int, flags: int = 1
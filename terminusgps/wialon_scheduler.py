@@ -0,0 +1,135 @@
+import contextlib
+import contextvars
+import enum
+import functools
+import logging
+import math
+import secrets
+import time
+
+from django.conf import settings
+
+from terminusgps.throttling import acquire_slot, release_slot, take_token
+
+logger = logging.getLogger(__name__)
+
+RATE_KEY = "wialon-scheduler:rate"
+SLOTS_KEY = "wialon-scheduler:slots"
+SLOT_TIMEOUT = 60
+"""Seconds after which a slot held by a crashed worker is released."""
+SLOT_POLL_INTERVAL = 0.05
+SHED_ERROR_CODE = 1003
+"""Wialon's own error code for too many requests, raised for shed calls."""
+
+
+class Priority(enum.IntEnum):
+    INTERACTIVE = 0
+    """Calls someone is waiting on, e.g. executing a command."""
+    BACKGROUND = 1
+    """Bulk calls, e.g. importing jobs or warming up caches."""
+
+
+MAX_WAIT = {Priority.INTERACTIVE: 10, Priority.BACKGROUND: 30}
+"""Seconds a call waits for capacity before it's shed."""
+
+_priority = contextvars.ContextVar(
+    "wialon_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def wialon_priority(priority: Priority):
+    """
+    Schedules Wialon calls made within the block, or decorated function, with ``priority``.
+
+    :param priority: A priority.
+    :type priority: ~terminusgps.wialon_scheduler.Priority
+
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get_limits(priority: Priority) -> tuple[int, float, int]:
+    """
+    Returns the request rate, reserved tokens and concurrent requests available to ``priority``.
+
+    Background calls leave ``WIALON_BACKGROUND_RESERVE``, a fraction of the rate and concurrency, to interactive calls.
+
+    :param priority: A priority.
+    :type priority: ~terminusgps.wialon_scheduler.Priority
+    :returns: Requests per second, tokens to leave in the bucket and maximum concurrent requests.
+    :rtype: tuple[int, float, int]
+
+    """
+    rate = getattr(settings, "WIALON_REQUESTS_PER_SECOND", 10)
+    concurrency = getattr(settings, "WIALON_MAX_CONCURRENT_REQUESTS", 8)
+    if priority == Priority.INTERACTIVE:
+        return rate, 0, concurrency
+    reserve = getattr(settings, "WIALON_BACKGROUND_RESERVE", 0.5)
+    return (
+        rate,
+        rate * reserve,
+        max(1, math.floor(concurrency * (1 - reserve))),
+    )
+
+
+def get_shed_error(action_name: str, priority: Priority):
+    from wialon.api import WialonError
+
+    logger.warning(f"Shed {priority.name.lower()} Wialon call '{action_name}'")
+    return WialonError(
+        SHED_ERROR_CODE, f"Scheduler is at capacity for '{action_name}'"
+    )
+
+
+@contextlib.contextmanager
+def scheduled(action_name: str):
+    """
+    Waits for capacity to call the Wialon API, shared by every worker.
+
+    A call takes a token from a ``WIALON_REQUESTS_PER_SECOND`` bucket, then one of ``WIALON_MAX_CONCURRENT_REQUESTS`` slots for the duration of the block. Calls are scheduled with the priority set by :py:func:`wialon_priority`, interactive by default. Background calls are deferred while capacity is reserved for interactive calls, see :py:func:`get_limits`.
+
+    :param action_name: A Wialon API action, for logging.
+    :type action_name: str
+    :raises wialon.api.WialonError: If capacity isn't available within the priority's :py:data:`MAX_WAIT`.
+
+    """
+    priority = _priority.get()
+    rate, reserve, concurrency = get_limits(priority)
+    deadline = time.monotonic() + MAX_WAIT[priority]
+    while wait := take_token(RATE_KEY, rate, 1, reserve=reserve):
+        if time.monotonic() + wait > deadline:
+            raise get_shed_error(action_name, priority)
+        time.sleep(wait)
+    token = secrets.token_hex(8)
+    while not acquire_slot(SLOTS_KEY, concurrency, token, SLOT_TIMEOUT):
+        if time.monotonic() > deadline:
+            raise get_shed_error(action_name, priority)
+        time.sleep(SLOT_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        release_slot(SLOTS_KEY, token)
+
+
+def schedule_requests(request_func):
+    """
+    Wraps a :py:meth:`wialon.api.Wialon.request` method, which every Wialon API call goes through, to run its requests :py:func:`scheduled`.
+
+    :param request_func: A bound ``request`` method.
+    :type request_func: ~collections.abc.Callable
+    :returns: The wrapped method.
+    :rtype: ~collections.abc.Callable
+
+    """
+
+    @functools.wraps(request_func)
+    def wrapper(action_name, url, params):
+        with scheduled(action_name):
+            return request_func(action_name, url, params)
+
+    return wrapper
@@ -0,0 +1,112 @@
+import json
+import secrets
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMMAND_NAMES = ["Locate", "Reboot", "Block engine", "Unblock engine"]
+INVALID_SERVICE_ERROR_CODE = 2
+
+
+def search_units(params: dict) -> dict:
+    """Returns one unit for any IMEI #, with an id derived from it so it's stable across calls."""
+    imei = params["spec"]["propValueMask"].removeprefix("=")
+    unit_id = int(imei[-9:]) if imei.isdigit() else 1
+    return {
+        "totalItemsCount": 1,
+        "items": [{"id": unit_id, "nm": f"Unit {imei}"}],
+    }
+
+
+def call_service(svc: str, params) -> dict | list:
+    """
+    Returns a response to the Wialon API service ``svc``, shaped like Wialon's for the calls this site makes.
+
+    :param svc: A Wialon API service, e.g. ``core/search_items``.
+    :type svc: str
+    :param params: The service's parameters.
+    :type params: dict | list
+    :returns: A response.
+    :rtype: dict | list
+
+    """
+    match svc:
+        case "token/login":
+            return {
+                "eid": secrets.token_hex(16),
+                "au": "standin",
+                "user": {"id": 1, "nm": "standin"},
+                "gis_sid": secrets.token_hex(16),
+            }
+        case "core/logout":
+            return {"error": 0}
+        case "core/search_items":
+            return search_units(params)
+        case "core/batch":
+            return [
+                call_service(call["svc"], call["params"]) for call in params
+            ]
+        case "token/update":
+            return {"h": secrets.token_hex(32)}
+        case "unit/get_command_definition_data":
+            return [
+                {"id": n, "n": name, "c": "custom_msg", "l": "tcp", "p": ""}
+                for n, name in enumerate(COMMAND_NAMES, start=1)
+            ]
+        case "unit/exec_cmd":
+            return {}
+    return {"error": INVALID_SERVICE_ERROR_CODE}
+
+
+class WialonStandInHandler(BaseHTTPRequestHandler):
+    """Answers Wialon API requests made by :py:class:`wialon.api.Wialon` after the server's ``latency``."""
+
+    server: "WialonStandInServer"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        form = urllib.parse.parse_qs(self.rfile.read(length).decode())
+        time.sleep(self.server.latency)
+        if self.path.startswith("/avl_evts"):
+            result = {"tm": int(time.time()), "events": []}
+        else:
+            svc = form.get("svc", [""])[0]
+            result = call_service(
+                svc, json.loads(form.get("params", ["{}"])[0])
+            )
+        body = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        # One line per call floods the console under load
+        return
+
+
+class WialonStandInServer(ThreadingHTTPServer):
+    """
+    A local stand-in for the Wialon API, for load tests.
+
+    Point ``WIALON_API_URL`` at it to run the site without Wialon. Every IMEI # matches a unit and every unit has the same commands.
+
+    :param address: A host and port to listen on, port ``0`` picks a free one.
+    :type address: tuple[str, int]
+    :param latency: Optional. Seconds to wait before answering a request, like Wialon's response time. Default is ``0``.
+    :type latency: float
+
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], latency: float = 0) -> None:
+        super().__init__(address, WialonStandInHandler)
+        self.latency = latency
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
@@ -1,4 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from terminusgps.paginator import EstimatedCountPaginator
 
 from . import models
 
@@ -11,8 +15,12 @@ class EmployeeModelAdmin(admin.ModelAdmin):
 
 @admin.register(models.WialonUnit)
 class WialonUnitAdmin(admin.ModelAdmin):
-    list_display = ["imei", "name"]
-    search_fields = ["name"]
+    autocomplete_fields = ["job"]
+    list_display = ["imei", "name", "job"]
+    list_select_related = ["job"]
+    paginator = EstimatedCountPaginator
+    search_fields = ["=imei", "name"]
+    show_full_result_count = False
 
 
 @admin.register(models.WialonResource)
@@ -23,5 +31,82 @@ class WialonResourceAdmin(admin.ModelAdmin):
 
 @admin.register(models.InstallJob)
 class InstallJobModelAdmin(admin.ModelAdmin):
-    list_display = ["id", "crt_date", "mod_date"]
+    autocomplete_fields = ["company", "employee"]
+    list_display = [
+        "id",
+        "company",
+        "employee",
+        "status",
+        "unit_count",
+        "crt_date",
+        "mod_date",
+    ]
+    list_filter = ["status"]
+    list_select_related = ["company", "employee__user"]
     date_hierarchy = "crt_date"
+    paginator = EstimatedCountPaginator
+    search_fields = ["company__name", "employee__user__username"]
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        unit_count = (
+            models.WialonUnit.objects.filter(job=OuterRef("pk"))
+            .order_by()
+            .values("job")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                unit_count=Coalesce(
+                    Subquery(unit_count, output_field=IntegerField()), 0
+                )
+            )
+        )
+
+    @admin.display(description="Units", ordering="unit_count")
+    def unit_count(self, obj):
+        return obj.unit_count
+
+
+@admin.register(models.BillingSummary)
+class BillingSummaryAdmin(admin.ModelAdmin):
+    actions = ["rebuild_summaries"]
+    list_display = ["month", "company", "status", "job_count", "unit_count"]
+    list_filter = ["status", "month"]
+    list_select_related = ["company"]
+    search_fields = ["company__name"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="Rebuild all billing summaries")
+    def rebuild_summaries(self, request, queryset):  # pragma: no cover
+        models.BillingSummary.objects.rebuild()
+        self.message_user(
+            request, "Billing summaries were rebuilt.", messages.SUCCESS
+        )
+
+
+@admin.register(models.InstallJobStatusChange)
+class InstallJobStatusChangeAdmin(admin.ModelAdmin):
+    list_display = ["job", "from_status", "to_status", "changed_at"]
+    list_filter = ["to_status"]
+    list_select_related = ["job"]
+    date_hierarchy = "changed_at"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
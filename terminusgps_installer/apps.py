@@ -1,5 +1,55 @@
+import logging
+
 from django.apps import AppConfig
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
 
 
 class TerminusgpsInstallerConfig(AppConfig):
     name = "terminusgps_installer"
+    warm_up_units = 100
+    """Maximum number of units to fetch Wialon commands for on warm up."""
+    warm_up_timeout = 5
+    """Seconds to wait for each Wialon call on warm up."""
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+    def warm_up(self):
+        """
+        Fetches Wialon commands for units of unfinished jobs, most recently modified first, into the shared command cache.
+
+        Units Wialon can't find are skipped. Warm up stops at the first network error or HTTP error, so an unreachable Wialon API delays startup by at most :py:attr:`warm_up_timeout` seconds. It also stops at the first call shed by the Wialon scheduler, see :py:mod:`terminusgps.wialon_scheduler`.
+
+        """
+        from wialon.api import WialonError
+
+        from terminusgps.wialon import is_wialon_outage, wialon_timeout
+        from terminusgps.wialon_scheduler import (
+            SHED_ERROR_CODE,
+            Priority,
+            wialon_priority,
+        )
+
+        from .models import InstallJob, WialonUnit
+
+        units = WialonUnit.objects.filter(
+            job__in=InstallJob.objects.all_not_done_jobs()
+        ).order_by("-mod_date")[: self.warm_up_units]
+        try:
+            with (
+                wialon_priority(Priority.BACKGROUND),
+                wialon_timeout(self.warm_up_timeout),
+            ):
+                for unit in units:
+                    try:
+                        unit.refresh_wialon_commands()
+                    except WialonError as error:
+                        if error._code == SHED_ERROR_CODE or is_wialon_outage(
+                            error
+                        ):
+                            raise
+                        logger.warning(f"Skipped warming up {unit}: {error}")
+        except (DatabaseError, OSError, WialonError) as error:
+            logger.warning(f"Stopped warming up Wialon commands: {error}")
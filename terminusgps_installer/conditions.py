@@ -0,0 +1,103 @@
+import datetime
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpRequest
+
+from terminusgps.stale_cache import get_cached_age
+
+from .models import InstallJob, WialonUnit
+
+
+def get_command_list_cache_key(unit_pk: int) -> str:
+    return f"installer:command_list:{unit_pk}"
+
+
+def cache_command_list_digest(unit_pk: int, commands: list[dict]) -> None:
+    """
+    Caches a digest of ``commands`` for :py:func:`command_list_etag`.
+
+    :param unit_pk: A Wialon unit primary key.
+    :type unit_pk: int
+    :param commands: The unit's Wialon command definitions.
+    :type commands: list[dict]
+    :returns: Nothing.
+    :rtype: None
+
+    """
+    content = json.dumps(commands, sort_keys=True, default=str)
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    cache.set(get_command_list_cache_key(unit_pk), digest)
+
+
+# The etag and last modified functions of a view share one query per request
+def _get_job_list_state(request: HttpRequest) -> dict:
+    if not hasattr(request, "_job_list_state"):
+        request._job_list_state = (
+            InstallJob.objects.all_not_done_jobs()
+            .filter(employee__user=request.user)
+            .aggregate(jobs=Count("pk"), last_modified=Max("mod_date"))
+        )
+    return request._job_list_state
+
+
+def _get_job_details_state(request: HttpRequest, job_pk: int) -> dict:
+    states = request.__dict__.setdefault("_job_details_states", {})
+    if job_pk not in states:
+        states[job_pk] = InstallJob.objects.filter(pk=job_pk).aggregate(
+            job_modified=Max("mod_date"),
+            unit_count=Count("units"),
+            unit_modified=Max("units__mod_date"),
+        )
+    return states[job_pk]
+
+
+def job_list_etag(request: HttpRequest) -> str | None:
+    state = _get_job_list_state(request)
+    if state["last_modified"] is None:
+        return None
+    return f"{request.user.pk}:{state['jobs']}:{state['last_modified'].isoformat()}"
+
+
+def job_list_last_modified(request: HttpRequest) -> datetime.datetime | None:
+    return _get_job_list_state(request)["last_modified"]
+
+
+def job_details_etag(request: HttpRequest, job_pk: int) -> str | None:
+    state = _get_job_details_state(request, job_pk)
+    if state["job_modified"] is None:
+        return None
+    unit_modified = state["unit_modified"]
+    return ":".join(
+        [
+            str(request.user.pk),
+            state["job_modified"].isoformat(),
+            str(state["unit_count"]),
+            unit_modified.isoformat() if unit_modified else "",
+        ]
+    )
+
+
+def job_details_last_modified(
+    request: HttpRequest, job_pk: int
+) -> datetime.datetime | None:
+    state = _get_job_details_state(request, job_pk)
+    return max(
+        filter(None, [state["job_modified"], state["unit_modified"]]),
+        default=None,
+    )
+
+
+def command_list_etag(request: HttpRequest, unit_pk: int) -> str | None:
+    age = get_cached_age(
+        WialonUnit(pk=unit_pk).get_wialon_commands_cache_key()
+    )
+    if age is not None and age > WialonUnit.wialon_commands_max_age:
+        # Stale lists are being refreshed, don't let clients keep them
+        return None
+    digest = cache.get(get_command_list_cache_key(unit_pk))
+    if digest is None or not WialonUnit.objects.filter(pk=unit_pk).exists():
+        return None
+    return f"{request.user.pk}:{digest}"
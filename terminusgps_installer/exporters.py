@@ -0,0 +1,72 @@
+import csv
+from collections.abc import Iterator
+
+from django.db.models import QuerySet
+
+from .models import InstallJob
+
+EXPORT_COLUMNS = [
+    ("job", "pk"),
+    ("status", "status"),
+    ("company_id", "company__id"),
+    ("company", "company__name"),
+    ("employee", "employee__user__username"),
+    ("crt_date", "crt_date"),
+    ("mod_date", "mod_date"),
+    ("imei", "units__imei"),
+    ("unit", "units__name"),
+    ("vin", "units__vin"),
+    ("plate", "units__plate"),
+    ("mileage", "units__mileage"),
+]
+
+
+class _Echo:
+    """A file-like object that returns written values instead of buffering them."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_export_queryset(status: str | None = None) -> QuerySet:
+    """
+    Returns install jobs joined with their units and company names as value tuples.
+
+    Jobs without units are exported as a single row with empty unit columns.
+
+    :param status: Optional. An install job status to filter by.
+    :type status: str | None
+    :returns: A queryset of value tuples ordered by job creation date.
+    :rtype: ~django.db.models.QuerySet
+
+    """
+    job_qs = InstallJob.objects.all()
+    if status:
+        job_qs = job_qs.filter(status=status)
+    return job_qs.order_by("crt_date", "pk", "units__pk").values_list(
+        *(lookup for _, lookup in EXPORT_COLUMNS)
+    )
+
+
+def iter_export_csv(
+    queryset: QuerySet, chunk_size: int = 2000
+) -> Iterator[str]:
+    """
+    Lazily yields CSV lines for ``queryset``, starting with a header line.
+
+    Rows are fetched through a server-side cursor ``chunk_size`` rows at a time.
+
+    :param queryset: A queryset from :py:func:`get_export_queryset`.
+    :type queryset: ~django.db.models.QuerySet
+    :param chunk_size: Number of rows to fetch from the database at a time. Default is ``2000``.
+    :type chunk_size: int
+    :yields: CSV lines.
+    :rtype: ~collections.abc.Iterator[str]
+
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield writer.writerow(
+            ["" if value is None else value for value in row]
+        )
@@ -11,6 +11,14 @@ class CommandExecutionForm(forms.Form):
     command_name = forms.CharField()
 
 
+class JobImportForm(forms.Form):
+    file = forms.FileField(
+        help_text=_(
+            "Upload a CSV file with company, employee, imei, vin, plate and mileage columns."
+        )
+    )
+
+
 class WialonUnitForm(forms.ModelForm):
     id = forms.IntegerField(required=False, widget=HiddenInput)
 
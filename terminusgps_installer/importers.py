@@ -0,0 +1,285 @@
+import csv
+import dataclasses
+import itertools
+from collections.abc import Iterable, Iterator
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from terminusgps.wialon import get_session, get_units_by_imeis
+from terminusgps.wialon_scheduler import Priority, wialon_priority
+
+from .models import (
+    BillingSummary,
+    Employee,
+    InstallJob,
+    WialonResource,
+    WialonUnit,
+)
+from .validators import validate_is_digit
+
+CSV_FIELDNAMES = ["company", "employee", "imei", "vin", "plate", "mileage"]
+
+
+@dataclasses.dataclass
+class ImportRowError:
+    line: int
+    imei: str
+    message: str
+
+
+@dataclasses.dataclass
+class ImportReport:
+    rows: int = 0
+    jobs_created: int = 0
+    units_created: int = 0
+    errors: list[ImportRowError] = dataclasses.field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+@dataclasses.dataclass
+class _ImportRow:
+    line: int
+    company: WialonResource
+    employee: Employee
+    imei: str
+    vin: str
+    plate: str
+    mileage: int
+
+
+class InstallJobImporter:
+    """
+    Imports install jobs and their units from CSV rows in chunks.
+
+    Each row is a single unit. Units sharing a company and employee are added to the same install job.
+
+    """
+
+    def __init__(self, chunk_size: int = 500, sid: str | None = None) -> None:
+        self.chunk_size = chunk_size
+        self.sid = sid
+        self._resources_by_id = {}
+        self._resources_by_name = {}
+        for resource in WialonResource.objects.all():
+            self._resources_by_id[str(resource.pk)] = resource
+            self._resources_by_name[resource.name] = resource
+        self._employees = {
+            employee.user.get_username(): employee
+            for employee in Employee.objects.select_related("user")
+        }
+        self._jobs: dict[tuple[int, int], InstallJob] = {}
+        self._seen_imeis: set[str] = set()
+
+    @wialon_priority(Priority.BACKGROUND)
+    def run(self, rows: Iterable[dict]) -> ImportReport:
+        """
+        Imports ``rows`` and returns a report of the import.
+
+        :param rows: An iterable of CSV row dictionaries, e.g. from :py:class:`~csv.DictReader`.
+        :type rows: ~collections.abc.Iterable[dict]
+        :returns: An import report.
+        :rtype: ~terminusgps_installer.importers.ImportReport
+
+        """
+        report = ImportReport()
+        session = get_session(sid=self.sid)
+        numbered = enumerate(rows, start=2)  # Line 1 is the header
+        for chunk in itertools.batched(numbered, self.chunk_size):
+            report.rows += len(chunk)
+            parsed = []
+            for line, row in chunk:
+                try:
+                    parsed.append(self._parse_row(line, row))
+                except ValidationError as error:
+                    report.errors.append(
+                        ImportRowError(
+                            line=line,
+                            imei=(row.get("imei") or "").strip(),
+                            message=" ".join(error.messages),
+                        )
+                    )
+            self._import_chunk(session, parsed, report)
+        return report
+
+    def _parse_row(self, line: int, row: dict) -> _ImportRow:
+        values = {
+            name: (row.get(name) or "").strip() for name in CSV_FIELDNAMES
+        }
+        for name in ("company", "employee", "imei"):
+            if not values[name]:
+                raise ValidationError(
+                    _("Missing required value for '%(name)s'."),
+                    code="required",
+                    params={"name": name},
+                )
+        company = self._resources_by_id.get(
+            values["company"]
+        ) or self._resources_by_name.get(values["company"])
+        if company is None:
+            raise ValidationError(
+                _("Unknown company '%(value)s'."),
+                code="invalid",
+                params={"value": values["company"]},
+            )
+        employee = self._employees.get(values["employee"])
+        if employee is None:
+            raise ValidationError(
+                _("Unknown employee '%(value)s'."),
+                code="invalid",
+                params={"value": values["employee"]},
+            )
+        imei = values["imei"]
+        validate_is_digit(imei)
+        if len(imei) > 20:
+            raise ValidationError(
+                _("IMEI # cannot be longer than 20 digits."), code="invalid"
+            )
+        if imei in self._seen_imeis:
+            raise ValidationError(
+                _("IMEI # '%(value)s' is duplicated in this file."),
+                code="unique",
+                params={"value": imei},
+            )
+        if len(values["vin"]) > 17:
+            raise ValidationError(
+                _("VIN # cannot be longer than 17 characters."), code="invalid"
+            )
+        if len(values["plate"]) > 12:
+            raise ValidationError(
+                _("Plate cannot be longer than 12 characters."), code="invalid"
+            )
+        mileage = values["mileage"] or "0"
+        if not mileage.isdigit():
+            raise ValidationError(
+                _("Mileage must be a whole number, got '%(value)s'."),
+                code="invalid",
+                params={"value": mileage},
+            )
+        # Only once the row is valid, so a corrected row can follow it
+        self._seen_imeis.add(imei)
+        return _ImportRow(
+            line=line,
+            company=company,
+            employee=employee,
+            imei=imei,
+            vin=values["vin"],
+            plate=values["plate"],
+            mileage=int(mileage),
+        )
+
+    def _import_chunk(
+        self, session, rows: list[_ImportRow], report: ImportReport
+    ) -> None:
+        from wialon.api import WialonError
+
+        if not rows:
+            return
+        imeis = [row.imei for row in rows]
+        existing = set(
+            WialonUnit.objects.filter(imei__in=imeis).values_list(
+                "imei", flat=True
+            )
+        )
+        try:
+            wialon_units = get_units_by_imeis(session, imeis)
+        except WialonError as error:
+            report.errors.extend(
+                ImportRowError(
+                    line=row.line, imei=row.imei, message=str(error)
+                )
+                for row in rows
+            )
+            return
+
+        valid = []
+        for row in rows:
+            if row.imei in existing:
+                message = _("A unit with this IMEI # already exists.")
+            elif row.imei not in wialon_units:
+                message = _("Invalid IMEI #.")
+            else:
+                valid.append(row)
+                continue
+            report.errors.append(
+                ImportRowError(line=row.line, imei=row.imei, message=message)
+            )
+        if not valid:
+            return
+
+        with transaction.atomic():
+            new_jobs = {}
+            for row in valid:
+                key = (row.company.pk, row.employee.pk)
+                if key not in self._jobs and key not in new_jobs:
+                    new_jobs[key] = InstallJob(
+                        company=row.company, employee=row.employee
+                    )
+            InstallJob.objects.bulk_create(new_jobs.values())
+            self._jobs.update(new_jobs)
+            report.jobs_created += len(new_jobs)
+            units = [
+                WialonUnit(
+                    job=self._jobs[(row.company.pk, row.employee.pk)],
+                    imei=row.imei,
+                    name=wialon_units[row.imei].get("nm", ""),
+                    vin=row.vin,
+                    plate=row.plate,
+                    mileage=row.mileage,
+                )
+                for row in valid
+            ]
+            WialonUnit.objects.bulk_create(units)
+            report.units_created += len(units)
+            BillingSummary.objects.refresh_on_commit(
+                {unit.job.get_billing_bucket() for unit in units}
+            )
+
+
+def read_csv_rows(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Returns a lazy iterator of row dictionaries from CSV ``lines``.
+
+    :param lines: An iterable of CSV lines, e.g. an open text file.
+    :type lines: ~collections.abc.Iterable[str]
+    :raises ValueError: If the CSV header is missing a required column.
+    :returns: An iterator of CSV row dictionaries.
+    :rtype: ~collections.abc.Iterator[dict]
+
+    """
+    reader = csv.DictReader(lines)
+    fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = {"company", "employee", "imei"} - set(fieldnames)
+    if missing:
+        raise ValueError(
+            f"CSV header is missing required columns: {sorted(missing)}"
+        )
+    reader.fieldnames = fieldnames
+    return reader
+
+
+def import_jobs_from_csv(
+    lines: Iterable[str], chunk_size: int = 500, sid: str | None = None
+) -> ImportReport:
+    """
+    Imports install jobs and units from CSV ``lines`` and returns a report.
+
+    The CSV is parsed lazily, IMEI #s are validated against Wialon and saved in chunks of ``chunk_size`` rows.
+
+    :param lines: An iterable of CSV lines, e.g. an open text file.
+    :type lines: ~collections.abc.Iterable[str]
+    :param chunk_size: Number of rows to validate and save at a time. Default is ``500``.
+    :type chunk_size: int
+    :param sid: Optional. A Wialon API session id.
+    :type sid: str | None
+    :raises ValueError: If the CSV header is missing a required column.
+    :returns: An import report.
+    :rtype: ~terminusgps_installer.importers.ImportReport
+
+    """
+    importer = InstallJobImporter(chunk_size=chunk_size, sid=sid)
+    return importer.run(read_csv_rows(lines))
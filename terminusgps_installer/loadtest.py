@@ -0,0 +1,408 @@
+import contextlib
+import dataclasses
+import html
+import http.cookiejar
+import json
+import math
+import re
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.urls import reverse
+
+STEPS = [
+    "login",
+    "new job",
+    "job list",
+    "job details",
+    "command list",
+    "execute command",
+]
+"""Steps of the installer workflow, in order."""
+
+JOB_DETAILS_RE = re.compile(r'href="([^"]*/jobs/\d+/details/)"')
+COMMAND_LIST_RE = re.compile(r'hx-get="([^"]*/units/\d+/cmds/)"')
+EXECUTE_COMMAND_RE = re.compile(r'hx-post="([^"]*/units/\d+/exec_cmd/)"')
+COMMAND_NAME_RE = re.compile(r'name="command_name"[^>]*value="([^"]*)"')
+OPTION_RE = re.compile(r'<option value="(\d+)"[^>]*>([^<]*)</option>')
+
+
+class LoadTestError(Exception):
+    """Raised when a workflow step fails, ending the workflow."""
+
+
+@dataclasses.dataclass
+class StepStats:
+    latencies: list[float] = dataclasses.field(default_factory=list)
+    """Seconds taken by each run of the step, failed or not."""
+    errors: Counter = dataclasses.field(default_factory=Counter)
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_count(self) -> int:
+        return self.errors.total()
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.count if self.count else 0
+
+    def percentile(self, p: float) -> float:
+        """
+        Returns the ``p`` th percentile latency by the nearest-rank method.
+
+        :param p: A percentile between ``0`` and ``100``.
+        :type p: float
+        :returns: A latency in seconds, or ``0`` if the step never ran.
+        :rtype: float
+
+        """
+        if not self.latencies:
+            return 0
+        latencies = sorted(self.latencies)
+        return latencies[max(0, math.ceil(p / 100 * len(latencies)) - 1)]
+
+
+@dataclasses.dataclass
+class LoadTestReport:
+    concurrency: int
+    duration: float = 0
+    workflows: int = 0
+    failed_workflows: int = 0
+    steps: dict[str, StepStats] = dataclasses.field(
+        default_factory=lambda: {step: StepStats() for step in STEPS}
+    )
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def record(self, step: str, latency: float, error: str = "") -> None:
+        with self._lock:
+            self.steps[step].latencies.append(latency)
+            if error:
+                self.steps[step].errors[error] += 1
+
+    def record_workflow(self, ok: bool) -> None:
+        with self._lock:
+            self.workflows += 1
+            if not ok:
+                self.failed_workflows += 1
+
+    def throughput(self, count: int) -> float:
+        return count / self.duration if self.duration else 0
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class InstallerClient:
+    """
+    Drives the installer workflow over HTTP like a browser with htmx would, recording each step in ``report``.
+
+    :param base_url: URL of the site, e.g. ``http://127.0.0.1:8000``.
+    :type base_url: str
+    :param report: A report to record steps in.
+    :type report: ~terminusgps_installer.loadtest.LoadTestReport
+    :param timeout: Optional. Seconds to wait for a response. Default is ``30``.
+    :type timeout: float
+
+    """
+
+    def __init__(
+        self, base_url: str, report: LoadTestReport, timeout: float = 30
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.report = report
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), NoRedirectHandler
+        )
+
+    @contextlib.contextmanager
+    def step(self, name: str):
+        """Times the block as a run of the step ``name``, recording it as an error if it raises :py:exc:`LoadTestError`."""
+        start = time.perf_counter()
+        try:
+            yield
+        except LoadTestError as error:
+            self.report.record(name, time.perf_counter() - start, str(error))
+            raise
+        self.report.record(name, time.perf_counter() - start)
+
+    def get_csrf_token(self) -> str:
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value or ""
+        return ""
+
+    def request(
+        self,
+        path: str,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> tuple[int, str]:
+        """
+        Requests ``path``, a ``POST`` if ``data`` is provided.
+
+        Redirects aren't followed.
+
+        :param path: A path on the site.
+        :type path: str
+        :param data: Optional. A request body.
+        :type data: bytes | None
+        :param headers: Optional. Request headers.
+        :type headers: dict[str, str] | None
+        :raises LoadTestError: If the request failed or was answered with an error status.
+        :returns: The response status and body.
+        :rtype: tuple[int, str]
+
+        """
+        headers = dict(headers or {})
+        if data is not None:
+            headers["X-CSRFToken"] = self.get_csrf_token()
+            headers["Referer"] = self.base_url + path
+        request = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers
+        )
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, body = error.code, error.read()
+        except OSError as error:
+            reason = getattr(error, "reason", error)
+            raise LoadTestError(f"{type(reason).__name__}") from error
+        if status >= 400:
+            raise LoadTestError(f"HTTP {status}")
+        return status, body.decode("utf-8", errors="replace")
+
+    def find(self, pattern: re.Pattern, text: str, what: str) -> list[str]:
+        if not (matches := pattern.findall(text)):
+            raise LoadTestError(f"No {what} found")
+        return matches
+
+    def _get_select(self, page: str, name: str) -> str:
+        match = re.search(
+            rf'<select name="{name}".*?</select>', page, flags=re.DOTALL
+        )
+        return match.group(0) if match else ""
+
+    def login(self, username: str, password: str) -> None:
+        path = reverse("login")
+        with self.step("login"):
+            self.request(path)
+            status, _ = self.request(
+                path,
+                urllib.parse.urlencode(
+                    {
+                        "username": username,
+                        "password": password,
+                        "csrfmiddlewaretoken": self.get_csrf_token(),
+                    }
+                ).encode(),
+                {"Content-Type": "application/x-www-form-urlencoded"},
+            )
+            if status != 302:
+                raise LoadTestError("Invalid credentials")
+
+    def create_job(self, username: str, units: int) -> str:
+        """Submits the new job form with ``units`` units under random IMEI #s and returns the URL it redirects to."""
+        path = reverse("installer:new job form")
+        with self.step("new job"):
+            _, page = self.request(path)
+            companies = self.find(
+                OPTION_RE, self._get_select(page, "company"), "company"
+            )
+            employee = next(
+                (
+                    value
+                    for value, label in OPTION_RE.findall(
+                        self._get_select(page, "employee")
+                    )
+                    if html.unescape(label).strip() == username
+                ),
+                None,
+            )
+            if employee is None:
+                raise LoadTestError(f"No employee for '{username}'")
+            data = {
+                "formset_data": {
+                    "job": {"company": companies[0][0], "employee": employee},
+                    "units": [
+                        {
+                            "unit": {
+                                "imei": str(secrets.randbelow(10**15)).zfill(
+                                    15
+                                ),
+                                "mileage": 0,
+                            }
+                        }
+                        for _ in range(units)
+                    ],
+                }
+            }
+            _, body = self.request(
+                path,
+                json.dumps(data).encode(),
+                {"Content-Type": "application/json"},
+            )
+            try:
+                return json.loads(body)["success_url"]
+            except (ValueError, KeyError) as error:
+                raise LoadTestError("Invalid new job response") from error
+
+    def run_workflow(self, username: str, units: int) -> None:
+        """
+        Creates a job with ``units`` units, opens it from the job list and executes a command on each of its units.
+
+        The newest job in the list is opened, which is another installer's when several log in as the same user.
+
+        :param username: Username the client is logged in as.
+        :type username: str
+        :param units: Number of units to install.
+        :type units: int
+        :raises LoadTestError: If a step failed.
+        :returns: Nothing.
+        :rtype: None
+
+        """
+        job_list_url = self.create_job(username, units)
+        with self.step("job list"):
+            _, page = self.request(job_list_url)
+            job_urls = self.find(JOB_DETAILS_RE, page, "job")
+        job_url = max(job_urls, key=lambda url: int(url.split("/")[-3]))
+        with self.step("job details"):
+            _, page = self.request(job_url)
+            command_list_urls = list(
+                dict.fromkeys(self.find(COMMAND_LIST_RE, page, "unit"))
+            )
+        htmx = {"HX-Request": "true"}
+        for url in command_list_urls:
+            with self.step("command list"):
+                _, fragment = self.request(url, headers=htmx)
+                execute_url = self.find(
+                    EXECUTE_COMMAND_RE, fragment, "command"
+                )[0]
+                command_name = self.find(COMMAND_NAME_RE, fragment, "command")[
+                    0
+                ]
+            with self.step("execute command"):
+                self.request(
+                    execute_url,
+                    urllib.parse.urlencode(
+                        {"command_name": html.unescape(command_name)}
+                    ).encode(),
+                    htmx
+                    | {"Content-Type": "application/x-www-form-urlencoded"},
+                )
+
+
+def get_installer_usernames(username: str, concurrency: int) -> list[str]:
+    """
+    Returns the username each of ``concurrency`` installers logs in as.
+
+    ``{n}`` in ``username`` is replaced by the installer's number, from ``1``, so each installer can log in as its own employee. Without it every installer shares one account.
+
+    :param username: A username, optionally containing ``{n}``, e.g. ``"installer{n}"``.
+    :type username: str
+    :param concurrency: Number of installers.
+    :type concurrency: int
+    :returns: Usernames.
+    :rtype: list[str]
+
+    """
+    return [username.replace("{n}", str(n)) for n in range(1, concurrency + 1)]
+
+
+def run_installer(
+    base_url: str,
+    username: str,
+    password: str,
+    iterations: int,
+    units: int,
+    report: LoadTestReport,
+    timeout: float = 30,
+) -> None:
+    client = InstallerClient(base_url, report, timeout=timeout)
+    try:
+        client.login(username, password)
+    except LoadTestError:
+        for _ in range(iterations):
+            report.record_workflow(ok=False)
+        return
+    for _ in range(iterations):
+        try:
+            client.run_workflow(username, units)
+        except LoadTestError:
+            report.record_workflow(ok=False)
+        else:
+            report.record_workflow(ok=True)
+
+
+def run_load_test(
+    base_url: str,
+    username: str,
+    password: str,
+    concurrency: int = 10,
+    iterations: int = 5,
+    units: int = 3,
+    timeout: float = 30,
+) -> LoadTestReport:
+    """
+    Runs the installer workflow against the site at ``base_url`` with ``concurrency`` installers at once.
+
+    Each installer logs in, then runs :py:meth:`InstallerClient.run_workflow` ``iterations`` times.
+
+    Throttles limit requests per account and per IP address, so installers sharing an account or a machine share their buckets. To measure capacity rather than the throttles, give each installer its own account with ``{n}`` in ``username`` and run the site with ``THROTTLE_ENABLED`` off or with raised rates.
+
+    :param base_url: URL of the site, e.g. ``http://127.0.0.1:8000``.
+    :type base_url: str
+    :param username: Username of an employee to log in as, ``{n}`` is replaced by each installer's number, see :py:func:`get_installer_usernames`.
+    :type username: str
+    :param password: The employees' password.
+    :type password: str
+    :param concurrency: Optional. Number of installers running at once. Default is ``10``.
+    :type concurrency: int
+    :param iterations: Optional. Number of workflows each installer runs. Default is ``5``.
+    :type iterations: int
+    :param units: Optional. Number of units per job. Default is ``3``.
+    :type units: int
+    :param timeout: Optional. Seconds to wait for a response. Default is ``30``.
+    :type timeout: float
+    :returns: The load test report.
+    :rtype: ~terminusgps_installer.loadtest.LoadTestReport
+
+    """
+    report = LoadTestReport(concurrency=concurrency)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(
+                run_installer,
+                base_url,
+                installer_username,
+                password,
+                iterations,
+                units,
+                report,
+                timeout,
+            )
+            for installer_username in get_installer_usernames(
+                username, concurrency
+            )
+        ]
+        for future in futures:
+            future.result()
+    report.duration = time.perf_counter() - start
+    return report
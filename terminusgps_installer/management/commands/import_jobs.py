@@ -0,0 +1,44 @@
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError
+
+from terminusgps_installer.importers import import_jobs_from_csv
+
+
+class Command(BaseCommand):
+    help = "Imports install jobs and units from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "file",
+            type=argparse.FileType("r", encoding="utf-8-sig"),
+            help="CSV file with company, employee, imei, vin, plate and mileage columns.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of rows to validate and save at a time.",
+        )
+        parser.add_argument(
+            "--sid", default=None, help="Optional Wialon API session id."
+        )
+
+    def handle(self, *args, **options):
+        with options["file"] as lines:
+            try:
+                report = import_jobs_from_csv(
+                    lines, chunk_size=options["chunk_size"], sid=options["sid"]
+                )
+            except ValueError as error:
+                raise CommandError(error)
+        for error in report.errors:
+            self.stderr.write(
+                f"Line {error.line} ({error.imei or 'no IMEI #'}): {error.message}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Read {report.rows} rows, created {report.jobs_created} jobs "
+                f"and {report.units_created} units with {len(report.errors)} errors."
+            )
+        )
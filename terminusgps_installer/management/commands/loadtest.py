@@ -0,0 +1,109 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from terminusgps_installer.loadtest import run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Load tests the installer workflow of a running site: login, job "
+        "creation, job details, command listing and command execution. "
+        "Run the site against the wialon_standin command to leave Wialon out, "
+        "and with THROTTLE_ENABLED off to measure capacity rather than the "
+        "throttles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="URL of the running site.",
+        )
+        parser.add_argument(
+            "--username",
+            required=True,
+            help=(
+                "Username of an employee. '{n}' is replaced by each "
+                "installer's number, e.g. 'installer{n}' logs installers in "
+                "as installer1, installer2 and so on."
+            ),
+        )
+        parser.add_argument(
+            "--password",
+            default=os.getenv("LOADTEST_PASSWORD"),
+            help="The employee's password. Defaults to $LOADTEST_PASSWORD.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Number of installers running at once.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="Number of jobs each installer creates.",
+        )
+        parser.add_argument(
+            "--units", type=int, default=3, help="Number of units per job."
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30,
+            help="Seconds to wait for a response.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["password"]:
+            raise CommandError("Provide --password or set $LOADTEST_PASSWORD.")
+        if min(options["concurrency"], options["iterations"]) < 1:
+            raise CommandError("--concurrency and --iterations must be >= 1.")
+        if options["concurrency"] > 1 and "{n}" not in options["username"]:
+            self.stderr.write(
+                "Every installer logs in as the same employee and shares its "
+                "throttles, add '{n}' to --username to give each its own."
+            )
+        report = run_load_test(
+            options["url"],
+            options["username"],
+            options["password"],
+            concurrency=options["concurrency"],
+            iterations=options["iterations"],
+            units=options["units"],
+            timeout=options["timeout"],
+        )
+        self.stdout.write(
+            f"{report.workflows} workflows by {report.concurrency} installers "
+            f"in {report.duration:.1f}s, "
+            f"{report.throughput(report.workflows - report.failed_workflows):.2f} "
+            f"completed/s, {report.failed_workflows} failed."
+        )
+        self.stdout.write(
+            f"{'step':<16}{'count':>8}{'req/s':>9}{'errors':>8}{'err %':>7}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for name, stats in report.steps.items():
+            self.stdout.write(
+                f"{name:<16}{stats.count:>8}"
+                f"{report.throughput(stats.count):>9.2f}"
+                f"{stats.error_count:>8}{stats.error_rate:>7.1%}"
+                + "".join(
+                    f"{stats.percentile(p) * 1000:>9.1f}" for p in (50, 95, 99)
+                )
+            )
+        for name, stats in report.steps.items():
+            for error, count in stats.errors.most_common():
+                self.stderr.write(f"{name}: {error} ({count})")
+        if report.failed_workflows:
+            style = self.style.WARNING
+        else:
+            style = self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"{report.failed_workflows / report.workflows:.1%} of "
+                "workflows failed."
+            )
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from terminusgps_installer.models import BillingSummary
+
+
+class Command(BaseCommand):
+    help = "Recomputes every billing summary from install jobs and units."
+
+    def handle(self, *args, **options):
+        BillingSummary.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {BillingSummary.objects.count()} billing summaries."
+            )
+        )
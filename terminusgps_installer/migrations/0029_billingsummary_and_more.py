@@ -0,0 +1,46 @@
+# Generated by Django 6.0.7 on 2026-10-19 16:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_installer', '0028_alter_wialonunit_imei'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('status', models.CharField(choices=[('needs_billing', 'Needs billing'), ('done', 'Done')])),
+                ('job_count', models.PositiveIntegerField(default=0)),
+                ('unit_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'billing summary',
+                'verbose_name_plural': 'billing summaries',
+                'ordering': ['-month', 'company', 'status'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='installjob',
+            index=models.Index(fields=['company', 'crt_date'], name='terminusgps_company_72c2b3_idx'),
+        ),
+        migrations.AddField(
+            model_name='billingsummary',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='billing_summaries', to='terminusgps_installer.wialonresource'),
+        ),
+        migrations.AddIndex(
+            model_name='billingsummary',
+            index=models.Index(fields=['month'], name='terminusgps_month_f859b2_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='billingsummary',
+            constraint=models.UniqueConstraint(fields=('company', 'month', 'status'), name='unique_billing_summary'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.7 on 2026-10-19 16:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_installer', '0029_billingsummary_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstallJobStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('needs_billing', 'Needs billing'), ('done', 'Done')])),
+                ('to_status', models.CharField(choices=[('needs_billing', 'Needs billing'), ('done', 'Done')])),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='terminusgps_installer.installjob')),
+            ],
+            options={
+                'verbose_name': 'install job status change',
+                'verbose_name_plural': 'install job status changes',
+                'ordering': ['changed_at'],
+                'get_latest_by': 'changed_at',
+                'indexes': [models.Index(fields=['changed_at'], name='terminusgps_changed_465c38_idx'), models.Index(fields=['to_status', 'changed_at'], name='terminusgps_to_stat_07dc0d_idx'), models.Index(fields=['job', 'to_status', 'changed_at'], name='terminusgps_job_id_0133ef_idx')],
+            },
+        ),
+    ]
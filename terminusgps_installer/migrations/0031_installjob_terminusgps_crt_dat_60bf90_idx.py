@@ -0,0 +1,17 @@
+# Generated by Django 6.0.7 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_installer', '0030_installjobstatuschange'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='installjob',
+            index=models.Index(fields=['crt_date'], name='terminusgps_crt_dat_60bf90_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.7 on 2026-10-19 17:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_installer', '0031_installjob_terminusgps_crt_dat_60bf90_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wialonunit',
+            name='mod_date',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -1,12 +1,20 @@
+import datetime
 import functools
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractBaseUser
-from django.db import models
+from django.db import NotSupportedError, models, transaction
+from django.db.models.functions import TruncMonth
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from terminusgps.constants import CommandFlag, CommandLinkType
+from terminusgps.stale_cache import (
+    CachedValue,
+    get_stale_while_revalidate,
+    set_cached_value,
+)
 from terminusgps.wialon import (
     execute_command,
     generate_locator_token,
@@ -28,6 +36,161 @@ class InstallJobQuerySet(models.QuerySet):
     def all_not_done_jobs(self):
         return self.exclude(status=InstallJobStatus.DONE)
 
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        InstallJobStatusChange.objects.using(self.db).record(
+            [
+                InstallJobStatusChange(job=job, to_status=job.status)
+                for job in objs
+                if job.pk is not None
+            ]
+        )
+        return objs
+
+    def update(self, **kwargs):
+        """Updates the jobs and records a status change for every job whose status changed."""
+        kwargs.setdefault("mod_date", timezone.now())
+        if "status" not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            before = {
+                pk: (status, company_id, crt_date)
+                for pk, status, company_id, crt_date in self.values_list(
+                    "pk", "status", "company_id", "crt_date"
+                )
+            }
+            rows = super().update(**kwargs)
+            if isinstance(kwargs["status"], str):
+                after = dict.fromkeys(before, kwargs["status"])
+            else:
+                after = dict(
+                    self.model._base_manager.using(self.db)
+                    .filter(pk__in=before)
+                    .values_list("pk", "status")
+                )
+            changed = [
+                pk
+                for pk, values in before.items()
+                if pk in after and after[pk] != values[0]
+            ]
+            InstallJobStatusChange.objects.using(self.db).record(
+                [
+                    InstallJobStatusChange(
+                        job_id=pk,
+                        from_status=before[pk][0],
+                        to_status=after[pk],
+                    )
+                    for pk in changed
+                ]
+            )
+            BillingSummary.objects.using(self.db).refresh_on_commit(
+                {
+                    (before[pk][1], get_billing_month(before[pk][2]))
+                    for pk in changed
+                }
+            )
+        return rows
+
+    def average_hours_to_status(
+        self,
+        status: str = InstallJobStatus.DONE,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+    ) -> list[dict]:
+        """
+        Returns the average number of hours from job creation to ``status`` per employee.
+
+        Only the first time a job reached ``status`` is counted. The averages are computed in the database.
+
+        :param status: An install job status. Default is :py:attr:`~terminusgps_installer.models.InstallJobStatus.DONE`.
+        :type status: str
+        :param since: Optional. Only count jobs that reached ``status`` at or after this time.
+        :type since: ~datetime.datetime | None
+        :param until: Optional. Only count jobs that reached ``status`` before this time.
+        :type until: ~datetime.datetime | None
+        :returns: A list of dictionaries with ``employee_id``, ``employee``, ``jobs`` and ``average_hours`` keys.
+        :rtype: list[dict]
+
+        """
+        reached_at = (
+            InstallJobStatusChange.objects.filter(
+                job=models.OuterRef("pk"), to_status=status
+            )
+            .order_by("changed_at")
+            .values("changed_at")[:1]
+        )
+        job_qs = self.annotate(
+            status_reached_at=models.Subquery(reached_at)
+        ).filter(status_reached_at__isnull=False)
+        if since is not None:
+            job_qs = job_qs.filter(status_reached_at__gte=since)
+        if until is not None:
+            job_qs = job_qs.filter(status_reached_at__lt=until)
+        rows = (
+            job_qs.order_by()
+            .values("employee_id", "employee__user__username")
+            .annotate(
+                jobs=models.Count("pk"),
+                average_duration=models.Avg(
+                    models.ExpressionWrapper(
+                        models.F("status_reached_at") - models.F("crt_date"),
+                        output_field=models.DurationField(),
+                    )
+                ),
+            )
+            .order_by("employee__user__username")
+        )
+        return [
+            {
+                "employee_id": row["employee_id"],
+                "employee": row["employee__user__username"],
+                "jobs": row["jobs"],
+                "average_hours": row["average_duration"].total_seconds()
+                / 3600,
+            }
+            for row in rows
+        ]
+
+
+class StatusChangeBatch:
+    """Install job status changes recorded at one savepoint level, inserted together when the transaction commits."""
+
+    def __init__(self, using: str, changes: list) -> None:
+        self.using = using
+        self.changes = list(changes)
+
+    def __call__(self) -> None:
+        InstallJobStatusChange.objects.using(self.using).bulk_create(
+            self.changes
+        )
+
+
+class InstallJobStatusChangeQuerySet(models.QuerySet):
+    def record(self, changes: list) -> None:
+        """
+        Appends ``changes`` to the status history.
+
+        Inside a transaction, changes are written with a single insert per savepoint level when it commits. Each level's changes are inserted by one :py:func:`~django.db.transaction.on_commit` callback, which Django discards with the changes if their savepoint rolls back.
+
+        """
+        if not changes:
+            return
+        connection = transaction.get_connection(self.db)
+        savepoint_ids = set(connection.savepoint_ids)
+        for sids, func, robust in connection.run_on_commit:
+            if sids == savepoint_ids and isinstance(func, StatusChangeBatch):
+                func.changes.extend(changes)
+                return
+        transaction.on_commit(
+            StatusChangeBatch(self.db, changes), using=self.db
+        )
+
+    def update(self, **kwargs):
+        raise NotSupportedError("Install job status changes are append-only.")
+
+    def delete(self):
+        raise NotSupportedError("Install job status changes are append-only.")
+
 
 class EmployeeQuerySet(models.QuerySet):
     def get_by_user(self, user: AbstractBaseUser):
@@ -53,11 +216,86 @@ class WialonResourceQuerySet(models.QuerySet):
 
 class WialonUnitQuerySet(models.QuerySet):
     def with_wialon_commands(self, sid: str | None = None) -> list:
+        """Returns ``(unit, commands)`` tuples, with cached commands and no commands for units Wialon failed to return any for."""
+        from wialon.api import WialonError
+
         unit_qs = self.filter()
-        commands = [unit.get_wialon_commands(sid=sid) for unit in unit_qs]
+        commands = []
+        for unit in unit_qs:
+            try:
+                commands.append(unit.get_cached_wialon_commands(sid=sid).value)
+            except WialonError:
+                commands.append([])
         return list(zip(unit_qs, commands))
 
 
+def get_billing_month(dt: datetime.datetime) -> datetime.date:
+    """Returns the first day of the local month containing ``dt``."""
+    return timezone.localdate(dt).replace(day=1)
+
+
+class BillingSummaryQuerySet(models.QuerySet):
+    def _get_counts(self, job_qs):
+        return (
+            job_qs.order_by()
+            .annotate(
+                month=TruncMonth("crt_date", output_field=models.DateField())
+            )
+            .values("company_id", "month", "status")
+            .annotate(
+                job_count=models.Count("pk", distinct=True),
+                unit_count=models.Count("units"),
+            )
+        )
+
+    def refresh(self, company_id: int, month: datetime.date) -> None:
+        """Recomputes the summary rows for a single company and month."""
+        start = timezone.make_aware(
+            datetime.datetime.combine(month, datetime.time.min)
+        )
+        end = timezone.make_aware(
+            datetime.datetime.combine(
+                (month + datetime.timedelta(days=32)).replace(day=1),
+                datetime.time.min,
+            )
+        )
+        counts = self._get_counts(
+            InstallJob.objects.filter(
+                company_id=company_id, crt_date__gte=start, crt_date__lt=end
+            )
+        )
+        summaries = [self.model(**row) for row in counts]
+        with transaction.atomic():
+            self.filter(company_id=company_id, month=month).exclude(
+                status__in=[summary.status for summary in summaries]
+            ).delete()
+            self.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=["company", "month", "status"],
+                update_fields=["job_count", "unit_count"],
+            )
+
+    def refresh_on_commit(
+        self, buckets: set[tuple[int, datetime.date]]
+    ) -> None:
+        """Recomputes the summary rows for ``buckets`` once the current transaction commits."""
+
+        def refresh_buckets():
+            for company_id, month in buckets:
+                self.refresh(company_id, month)
+
+        if buckets:
+            transaction.on_commit(refresh_buckets)
+
+    def rebuild(self) -> None:
+        """Recomputes every summary row from scratch."""
+        counts = self._get_counts(InstallJob.objects.all())
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(self.model(**row) for row in counts)
+
+
 class Employee(models.Model):
     user = models.OneToOneField(
         get_user_model(), on_delete=models.CASCADE, related_name="employee"
@@ -99,14 +337,19 @@ class WialonUnit(models.Model):
     plate = models.CharField(blank=True, max_length=12)
     mileage = models.PositiveIntegerField(blank=True, default=0)
     locator_url = models.URLField(blank=True)
+    mod_date = models.DateTimeField(auto_now=True)
     objects = WialonUnitQuerySet.as_manager()
+    wialon_commands_max_age = 300
+    """Seconds cached Wialon commands are served without revalidation."""
+    wialon_commands_stale_ttl = 86400
+    """Seconds cached Wialon commands are kept, to be served stale."""
 
     def __str__(self) -> str:
         return self.name if self.name else f"WialonUnit #{self.pk}"
 
     def get_wialon_unit_name_and_save(self, sid: str | None = None) -> str:
         self.name = self._get_wialon_unit_name(sid)
-        self.save(update_fields=["name"])
+        self.save(update_fields=["name", "mod_date"])
         return self.name
 
     def refresh_locator_url_and_save(self, sid: str | None = None) -> str:
@@ -114,7 +357,7 @@ class WialonUnit(models.Model):
         unit = get_unit_by_imei(session, self.imei)
         token = generate_locator_token(session, [unit["id"]])
         self.locator_url = generate_locator_url(token)
-        self.save(update_fields=["locator_url"])
+        self.save(update_fields=["locator_url", "mod_date"])
         return self.locator_url
 
     def execute_wialon_command(
@@ -144,12 +387,49 @@ class WialonUnit(models.Model):
         unit = get_unit_by_imei(session, self.imei)
         return int(unit["id"])
 
-    @functools.lru_cache(maxsize=300)
     def get_wialon_commands(self, sid: str | None = None) -> list[dict]:
         unit_id = self.get_wialon_unit_id(sid=sid)
         session = get_session(sid=sid)
         return get_command_definition_data(session, unit_id)
 
+    def get_wialon_commands_cache_key(self) -> str:
+        return f"installer:wialon_commands:{self.pk}"
+
+    def get_cached_wialon_commands(
+        self, sid: str | None = None
+    ) -> CachedValue:
+        """
+        Returns the unit's cached Wialon commands, see :py:func:`~terminusgps.stale_cache.get_stale_while_revalidate`.
+
+        Commands older than :py:attr:`wialon_commands_max_age` are returned stale while a background task refreshes them.
+
+        :param sid: Optional. A Wialon API session id.
+        :type sid: str | None
+        :raises wialon.api.WialonError: If no commands were cached and Wialon failed to return them.
+        :returns: The commands and whether they're stale.
+        :rtype: ~terminusgps.stale_cache.CachedValue
+
+        """
+        from .tasks import refresh_wialon_commands
+
+        return get_stale_while_revalidate(
+            self.get_wialon_commands_cache_key(),
+            functools.partial(self.get_wialon_commands, sid=sid),
+            functools.partial(refresh_wialon_commands.enqueue, self.pk),
+            max_age=self.wialon_commands_max_age,
+            stale_ttl=self.wialon_commands_stale_ttl,
+        )
+
+    def refresh_wialon_commands(self, sid: str | None = None) -> list[dict]:
+        """Fetches the unit's Wialon commands into the cache read by :py:meth:`get_cached_wialon_commands`."""
+        commands = self.get_wialon_commands(sid=sid)
+        set_cached_value(
+            self.get_wialon_commands_cache_key(),
+            commands,
+            self.wialon_commands_stale_ttl,
+        )
+        return commands
+
     @functools.lru_cache(maxsize=300)
     def _get_wialon_unit_name(self, sid: str | None = None) -> str:
         session = get_session(sid=sid)
@@ -183,9 +463,88 @@ class InstallJob(models.Model):
         ordering = ["crt_date"]
         verbose_name = _("install job")
         verbose_name_plural = _("install jobs")
+        indexes = [
+            models.Index(fields=["crt_date"]),
+            models.Index(fields=["company", "crt_date"]),
+        ]
 
     def __str__(self) -> str:
         return f"InstallJob #{self.pk}"
 
     def get_absolute_url(self):
         return reverse("installer:job details", kwargs={"job_pk": self.pk})
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_billing_bucket(self) -> tuple[int, datetime.date]:
+        return self.company_id, get_billing_month(self.crt_date)
+
+
+class InstallJobStatusChange(models.Model):
+    job = models.ForeignKey(
+        "terminusgps_installer.InstallJob",
+        on_delete=models.CASCADE,
+        related_name="status_changes",
+    )
+    from_status = models.CharField(
+        blank=True, choices=InstallJobStatus.choices
+    )
+    to_status = models.CharField(choices=InstallJobStatus.choices)
+    changed_at = models.DateTimeField(default=timezone.now)
+    objects = InstallJobStatusChangeQuerySet.as_manager()
+
+    class Meta:
+        get_latest_by = "changed_at"
+        ordering = ["changed_at"]
+        verbose_name = _("install job status change")
+        verbose_name_plural = _("install job status changes")
+        indexes = [
+            models.Index(fields=["changed_at"]),
+            models.Index(fields=["to_status", "changed_at"]),
+            models.Index(fields=["job", "to_status", "changed_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.job} - {self.from_status or '-'} -> {self.to_status}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise NotSupportedError(
+                "Install job status changes are append-only."
+            )
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise NotSupportedError("Install job status changes are append-only.")
+
+
+class BillingSummary(models.Model):
+    company = models.ForeignKey(
+        "terminusgps_installer.WialonResource",
+        on_delete=models.CASCADE,
+        related_name="billing_summaries",
+    )
+    month = models.DateField()
+    status = models.CharField(choices=InstallJobStatus.choices)
+    job_count = models.PositiveIntegerField(default=0)
+    unit_count = models.PositiveIntegerField(default=0)
+    objects = BillingSummaryQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-month", "company", "status"]
+        verbose_name = _("billing summary")
+        verbose_name_plural = _("billing summaries")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "month", "status"],
+                name="unique_billing_summary",
+            )
+        ]
+        indexes = [models.Index(fields=["month"])]
+
+    def __str__(self) -> str:
+        return f"{self.company} - {self.month:%Y-%m} - {self.get_status_display()}"
@@ -0,0 +1,77 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    BillingSummary,
+    InstallJob,
+    InstallJobStatusChange,
+    WialonUnit,
+    get_billing_month,
+)
+
+
+@receiver(post_save, sender=InstallJob)
+def record_status_change_on_job_save(sender, instance, created, **kwargs):
+    loaded = getattr(instance, "_loaded_values", {})
+    from_status = "" if created else loaded.get("status", instance.status)
+    if created or from_status != instance.status:
+        InstallJobStatusChange.objects.record(
+            [
+                InstallJobStatusChange(
+                    job=instance,
+                    from_status=from_status,
+                    to_status=instance.status,
+                )
+            ]
+        )
+
+
+@receiver(post_save, sender=InstallJob)
+def refresh_billing_summary_on_job_save(
+    sender, instance, created, update_fields, **kwargs
+):
+    buckets = {instance.get_billing_bucket()}
+    if not created:
+        loaded = getattr(instance, "_loaded_values", {})
+        if "company_id" in loaded and "crt_date" in loaded:
+            buckets.add(
+                (loaded["company_id"], get_billing_month(loaded["crt_date"]))
+            )
+        if update_fields is not None and not {
+            "company",
+            "crt_date",
+            "status",
+        }.intersection(update_fields):
+            return
+    BillingSummary.objects.refresh_on_commit(buckets)
+
+
+@receiver(post_save, sender=InstallJob)
+def reset_loaded_values_on_job_save(sender, instance, **kwargs):
+    instance._loaded_values = {
+        "status": instance.status,
+        "company_id": instance.company_id,
+        "crt_date": instance.crt_date,
+    }
+
+
+@receiver(post_delete, sender=InstallJob)
+def refresh_billing_summary_on_job_delete(sender, instance, **kwargs):
+    BillingSummary.objects.refresh_on_commit({instance.get_billing_bucket()})
+
+
+@receiver(post_save, sender=WialonUnit)
+def refresh_billing_summary_on_unit_save(sender, instance, created, **kwargs):
+    if created:
+        BillingSummary.objects.refresh_on_commit(
+            {instance.job.get_billing_bucket()}
+        )
+
+
+@receiver(post_delete, sender=WialonUnit)
+def refresh_billing_summary_on_unit_delete(sender, instance, **kwargs):
+    try:
+        job = instance.job
+    except InstallJob.DoesNotExist:
+        return
+    BillingSummary.objects.refresh_on_commit({job.get_billing_bucket()})
@@ -0,0 +1,21 @@
+from django.tasks import task
+
+from .conditions import cache_command_list_digest
+from .models import WialonUnit
+
+
+@task
+def refresh_wialon_commands(unit_pk: int) -> int:
+    """
+    Refreshes a unit's cached Wialon commands.
+
+    :param unit_pk: A Wialon unit primary key.
+    :type unit_pk: int
+    :returns: The number of commands.
+    :rtype: int
+
+    """
+    unit = WialonUnit.objects.get(pk=unit_pk)
+    commands = unit.refresh_wialon_commands()
+    cache_command_list_digest(unit.pk, commands)
+    return len(commands)
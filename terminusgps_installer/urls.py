@@ -7,6 +7,11 @@ urlpatterns = [
     path("", views.home_view, name="home"),
     path("jobs/list/", views.job_list_view, name="job list"),
     path("jobs/form/", views.NewJobFormView.as_view(), name="new job form"),
+    path("jobs/import/", views.import_jobs_view, name="import jobs"),
+    path("jobs/export/", views.export_jobs_view, name="export jobs"),
+    path(
+        "billing/summary/", views.billing_summary_view, name="billing summary"
+    ),
     path(
         "jobs/<int:job_pk>/details/",
         views.job_details_view,
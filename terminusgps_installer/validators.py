@@ -1,6 +1,5 @@
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-from wialon.api import WialonError
 
 from terminusgps.wialon import get_session, get_unit_by_imei
 
@@ -10,6 +9,8 @@ def validate_vin(value: str) -> None:
 
 
 def validate_imei(value: str) -> None:
+    from wialon.api import WialonError
+
     session = get_session(sid=None)
     try:
         get_unit_by_imei(session, value)
@@ -1,23 +1,51 @@
+import codecs
+import csv
+import datetime
 import logging
 
-import wialon.api
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, permission_required
 from django.http import HttpRequest as HttpRequestBase
-from django.http import HttpResponse
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
+from django.utils.cache import patch_cache_control
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_control, never_cache
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import (
+    require_GET,
+    require_http_methods,
+    require_POST,
+)
 from django.views.decorators.vary import vary_on_headers
 from formset.views import FormCollectionView
 
-from terminusgps.decorators import htmx_template
-from terminusgps.wialon import get_session
+from terminusgps.decorators import htmx_template, throttle
+from terminusgps.responses import StreamingTemplateResponse
 
-from .forms import CommandExecutionForm, InstallJobCollection
-from .models import Employee, InstallJob, WialonUnit
+from .conditions import (
+    cache_command_list_digest,
+    command_list_etag,
+    job_details_etag,
+    job_details_last_modified,
+    job_list_etag,
+    job_list_last_modified,
+)
+from .forms import CommandExecutionForm, InstallJobCollection, JobImportForm
+from .exporters import get_export_queryset, iter_export_csv
+from .importers import import_jobs_from_csv
+from .models import (
+    BillingSummary,
+    Employee,
+    InstallJob,
+    InstallJobStatus,
+    WialonUnit,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +54,10 @@ class HttpRequest(HttpRequestBase):
     template_name: str
 
 
+def unit_throttle_key(request: HttpRequest, unit_pk: int) -> str:
+    return f"unit:{unit_pk}"
+
+
 @login_required
 @vary_on_headers("HX-Request")
 @cache_control(max_age=300)
@@ -60,10 +92,91 @@ class NewJobFormView(FormCollectionView):
         return super().form_collection_valid(form_collection)
 
 
+@login_required
+@permission_required(
+    "terminusgps_installer.add_installjob", raise_exception=True
+)
+@never_cache
+@htmx_template("installer/import_jobs.html")
+@require_http_methods(["GET", "POST"])
+def import_jobs_view(request: HttpRequest) -> HttpResponse:
+    form = JobImportForm()
+    report = None
+    if request.method == "POST":
+        form = JobImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            lines = codecs.iterdecode(form.cleaned_data["file"], "utf-8-sig")
+            try:
+                report = import_jobs_from_csv(lines)
+            except (ValueError, csv.Error) as error:
+                form.add_error("file", str(error))
+    return TemplateResponse(
+        request, request.template_name, {"form": form, "report": report}
+    )
+
+
+@login_required
+@permission_required(
+    "terminusgps_installer.view_installjob", raise_exception=True
+)
+@never_cache
+@require_GET
+def export_jobs_view(request: HttpRequest) -> HttpResponse:
+    status = request.GET.get("status", InstallJobStatus.NEEDS_BILLING)
+    if status not in [*InstallJobStatus.values, "all"]:
+        return HttpResponseBadRequest(f"Invalid status: '{status}'")
+    queryset = get_export_queryset(None if status == "all" else status)
+    return StreamingHttpResponse(
+        iter_export_csv(queryset),
+        content_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="jobs-{status}.csv"'
+        },
+    )
+
+
+@login_required
+@permission_required(
+    "terminusgps_installer.view_billingsummary", raise_exception=True
+)
+@never_cache
+@require_GET
+def billing_summary_view(request: HttpRequest) -> HttpResponse:
+    summary_qs = BillingSummary.objects.select_related("company")
+    try:
+        if month := request.GET.get("month"):
+            summary_qs = summary_qs.filter(
+                month=datetime.date.fromisoformat(f"{month}-01")
+            )
+        if year := request.GET.get("year"):
+            summary_qs = summary_qs.filter(month__year=int(year))
+    except ValueError:
+        return JsonResponse({"error": "Invalid month or year."}, status=400)
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "company_id": summary.company_id,
+                    "company": summary.company.name,
+                    "month": f"{summary.month:%Y-%m}",
+                    "status": summary.status,
+                    "job_count": summary.job_count,
+                    "unit_count": summary.unit_count,
+                }
+                for summary in summary_qs
+            ]
+        }
+    )
+
+
 @login_required
 @vary_on_headers("HX-Request")
 @cache_control(max_age=300)
-@htmx_template("installer/job_list.html")
+@htmx_template(
+    "installer/job_list.html",
+    etag_func=job_list_etag,
+    last_modified_func=job_list_last_modified,
+)
 @require_GET
 def job_list_view(request: HttpRequest) -> HttpResponse:
     employee = get_object_or_404(Employee, user=request.user)
@@ -75,20 +188,32 @@ def job_list_view(request: HttpRequest) -> HttpResponse:
 @login_required
 @vary_on_headers("HX-Request")
 @cache_control(max_age=300)
-@htmx_template("installer/job_details.html")
+@htmx_template(
+    "installer/job_details.html",
+    etag_func=job_details_etag,
+    last_modified_func=job_details_last_modified,
+)
 @require_GET
 def job_details_view(request: HttpRequest, job_pk: int) -> HttpResponse:
     job = get_object_or_404(InstallJob, pk=job_pk)
     unit_qs = job.units.filter()
-    context = {"job": job, "units": unit_qs.with_wialon_commands()}
-    return TemplateResponse(request, request.template_name, context)
+    return StreamingTemplateResponse(
+        request,
+        request.template_name,
+        {"job": job},
+        deferred_context={"units": unit_qs.with_wialon_commands},
+    )
 
 
 @login_required
 @never_cache
 @htmx_template("installer/command_executed.html")
+@throttle("execute-command-user", "30/m", key="user")
+@throttle("execute-command-unit", "5/m", key=unit_throttle_key)
 @require_POST
 def execute_command_view(request: HttpRequest, unit_pk: int) -> HttpResponse:
+    import wialon.api
+
     unit = get_object_or_404(WialonUnit, pk=unit_pk)
     form = CommandExecutionForm(request.POST)
     if not form.is_valid():
@@ -110,16 +235,28 @@ def execute_command_view(request: HttpRequest, unit_pk: int) -> HttpResponse:
 
 @login_required
 @cache_control(max_age=300)
-@htmx_template("installer/command_list.html")
+@htmx_template("installer/command_list.html", etag_func=command_list_etag)
+@throttle("command-list-user", "60/m", key="user")
+@throttle("command-list-unit", "20/m", key=unit_throttle_key)
 @require_GET
 def command_list_view(request: HttpRequest, unit_pk: int) -> HttpResponse:
-    session = get_session(sid=None)
+    import wialon.api
+
     unit = get_object_or_404(WialonUnit, pk=unit_pk)
     try:
-        commands = unit.get_wialon_commands(session)
+        cached = unit.get_cached_wialon_commands()
     except wialon.api.WialonError as error:
         logger.error(error)
-        commands = []
-    return TemplateResponse(
-        request, request.template_name, {"commands": commands, "unit": unit}
+        commands, stale = [], False
+    else:
+        commands, stale = cached.value, cached.stale
+        if not stale:
+            cache_command_list_digest(unit.pk, commands)
+    response = TemplateResponse(
+        request,
+        request.template_name,
+        {"commands": commands, "stale": stale, "unit": unit},
     )
+    if stale:
+        patch_cache_control(response, max_age=0)
+    return response
@@ -1,26 +1,32 @@
 from django.contrib import admin, messages
 from django.utils.translation import ngettext
 
+from terminusgps.paginator import EstimatedCountPaginator
+
 from . import models
+from .tasks import email_contact_form_responses
 
 
 @admin.register(models.ContactFormResponse)
 class ContactFormResponseAdmin(admin.ModelAdmin):
     actions = ["email_admins"]
-    list_display = ["name", "pub_date"]
+    list_display = ["name", "email", "pub_date"]
     date_hierarchy = "pub_date"
+    paginator = EstimatedCountPaginator
+    search_fields = ["name", "email"]
+    show_full_result_count = False
 
     @admin.action(description="Email selected responses to admins")
-    def email_admins(self, request, queryset):  # pragma: no cover
-        for response in queryset:
-            response.email_to_admins()
+    def email_admins(self, request, queryset):
+        pks = list(queryset.values_list("pk", flat=True))
+        email_contact_form_responses.enqueue(pks)
         self.message_user(
             request,
             ngettext(
-                "%d response was successfully emailed.",
-                "%d responses were successfully emailed.",
-                len(queryset),
+                "%d response was queued for emailing.",
+                "%d responses were queued for emailing.",
+                len(pks),
             )
-            % len(queryset),
+            % len(pks),
             messages.SUCCESS,
         )
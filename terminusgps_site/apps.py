@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class TerminusgpsSiteConfig(AppConfig):
     name = 'terminusgps_site'
+
+    def warm_up(self):
+        """Loads prerendered pages, the responsive image manifest and critical stylesheets."""
+        from .critical_css import find_layout_templates, load_critical_css
+        from .images import load_manifest
+        from .prerender import load_prerendered_pages
+
+        load_prerendered_pages()
+        load_manifest()
+        for template_name in find_layout_templates():
+            load_critical_css(template_name)
@@ -0,0 +1,374 @@
+import functools
+import hashlib
+import pathlib
+import re
+
+from django.apps import apps
+from django.contrib.staticfiles import finders
+from django.template import engines
+
+STYLESHEET = "terminusgps/css/output.css"
+CRITICAL_CSS_DIR = "terminusgps/css/critical"
+LAYOUT_TEMPLATE = "terminusgps/layout.html"
+TEMPLATE_APPS = ("terminusgps_site", "terminusgps_installer")
+FOLD_CHARS = 6000
+"""Number of characters of a template's main content assumed to be above the fold."""
+
+# At-rules without selectors, kept whole until drop_unused_definitions()
+KEEP_AT_RULES = ("@property", "@keyframes", "@font-face")
+
+CLASS_ATTRIBUTE_PATTERN = re.compile(r"""\bclass=(["'])(.*?)\1""", re.DOTALL)
+TEMPLATE_TAG_PATTERN = re.compile(r"{[%{#].*?[%}#]}", re.DOTALL)
+SELECTOR_CLASS_PATTERN = re.compile(
+    r"\.((?:\\[0-9a-fA-F]{1,6}\s?|\\.|[\w-])+)"
+)
+CSS_ESCAPE_PATTERN = re.compile(r"\\([0-9a-fA-F]{1,6}\s?|.)")
+CUSTOM_PROPERTY_PATTERN = re.compile(r"(--[\w-]+)\s*:")
+VAR_REFERENCE_PATTERN = re.compile(r"var\(\s*(--[\w-]+)")
+
+
+def parse_css(css: str) -> list:
+    """
+    Parses ``css`` into a tree of rules.
+
+    Each item is either a string, a declaration or statement at-rule including its trailing semicolon, or a ``(prelude, children)`` tuple for a block.
+
+    :param css: A stylesheet.
+    :type css: str
+    :returns: A list of top level items.
+    :rtype: list
+
+    """
+    stack = [[]]
+    preludes = []
+    buffer = []
+    quote = None
+    i = 0
+    while i < len(css):
+        char = css[i]
+        if quote:
+            buffer.append(char)
+            if char == "\\":
+                buffer.append(css[i + 1 : i + 2])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char == "\\":
+            buffer.append(css[i : i + 2])
+            i += 1
+        elif char in "\"'":
+            quote = char
+            buffer.append(char)
+        elif css.startswith("/*", i):
+            i = css.find("*/", i + 2)
+            i = len(css) if i == -1 else i + 1
+        elif char == "{":
+            preludes.append("".join(buffer).strip())
+            stack.append([])
+            buffer = []
+        elif char == "}":
+            if "".join(buffer).strip():
+                stack[-1].append("".join(buffer).strip())
+            buffer = []
+            children = stack.pop()
+            stack[-1].append((preludes.pop(), children))
+        elif char == ";":
+            stack[-1].append("".join(buffer).strip() + ";")
+            buffer = []
+        else:
+            buffer.append(char)
+        i += 1
+    return stack[0]
+
+
+def serialize_css(items: list) -> str:
+    """Returns the stylesheet parsed into ``items`` by :py:func:`parse_css`."""
+    return "".join(
+        item
+        if isinstance(item, str)
+        else f"{item[0]}{{{serialize_css(item[1])}}}"
+        for item in items
+    )
+
+
+def unescape_css_identifier(identifier: str) -> str:
+    def replace(match: re.Match) -> str:
+        escaped = match.group(1)
+        if len(escaped) > 1 or escaped in "0123456789abcdefABCDEF":
+            return chr(int(escaped.strip(), 16))
+        return escaped
+
+    return CSS_ESCAPE_PATTERN.sub(replace, identifier)
+
+
+def split_selectors(selector_list: str) -> list[str]:
+    """Splits ``selector_list`` on commas outside of parentheses."""
+    selectors, depth, start = [], 0, 0
+    for i, char in enumerate(selector_list):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(selector_list[start:i])
+            start = i + 1
+    selectors.append(selector_list[start:])
+    return selectors
+
+
+def selector_matches(selector_list: str, classes: set[str]) -> bool:
+    """
+    Returns whether a selector in ``selector_list`` could match markup using ``classes``.
+
+    Selectors without classes always match.
+
+    :param selector_list: A comma separated selector list.
+    :type selector_list: str
+    :param classes: Class names used in markup.
+    :type classes: set[str]
+    :returns: Whether the rule applies.
+    :rtype: bool
+
+    """
+    for selector in split_selectors(selector_list):
+        selector_classes = {
+            unescape_css_identifier(name)
+            for name in SELECTOR_CLASS_PATTERN.findall(selector)
+        }
+        if selector_classes <= classes:
+            return True
+    return False
+
+
+def filter_css(items: list, classes: set[str]) -> list:
+    """
+    Returns ``items`` without the style rules that can't match markup using ``classes``.
+
+    :param items: Items parsed by :py:func:`parse_css`.
+    :type items: list
+    :param classes: Class names used in markup.
+    :type classes: set[str]
+    :returns: The filtered items.
+    :rtype: list
+
+    """
+    filtered = []
+    for item in items:
+        if isinstance(item, str):
+            if item.startswith("@"):
+                filtered.append(item)
+            continue
+        prelude, children = item
+        if prelude.startswith(KEEP_AT_RULES):
+            filtered.append(item)
+        elif prelude.startswith("@"):
+            children = filter_css(children, classes)
+            if children:
+                filtered.append((prelude, children))
+        elif selector_matches(prelude, classes):
+            filtered.append(item)
+    return filtered
+
+
+def iter_declarations(items: list):
+    """Yields the declarations in ``items`` and their blocks."""
+    for item in items:
+        if isinstance(item, str):
+            if not item.startswith("@"):
+                yield item
+        else:
+            yield from iter_declarations(item[1])
+
+
+def get_used_custom_properties(items: list) -> set[str]:
+    """Returns the custom properties read by ``items``, directly or through other custom properties."""
+    definitions, used = {}, set()
+    for declaration in iter_declarations(items):
+        if match := CUSTOM_PROPERTY_PATTERN.match(declaration):
+            definitions.setdefault(match.group(1), []).append(declaration)
+        else:
+            used.update(VAR_REFERENCE_PATTERN.findall(declaration))
+    pending = list(used)
+    while pending:
+        for declaration in definitions.get(pending.pop(), []):
+            for name in VAR_REFERENCE_PATTERN.findall(declaration):
+                if name not in used:
+                    used.add(name)
+                    pending.append(name)
+    return used
+
+
+def is_keyframes(item) -> bool:
+    return not isinstance(item, str) and item[0].startswith("@keyframes")
+
+
+def drop_unused_definitions(items: list) -> list:
+    """
+    Returns ``items`` without the custom properties, ``@property`` rules and ``@keyframes`` that nothing in them uses.
+
+    Rules left empty are dropped.
+
+    :param items: Items filtered by :py:func:`filter_css`.
+    :type items: list
+    :returns: The pruned items.
+    :rtype: list
+
+    """
+    rules = [item for item in items if not is_keyframes(item)]
+    used = get_used_custom_properties(rules)
+    # Animations are named by theme variables, e.g. --animate-spin:spin 1s
+    animation_words = set()
+    for declaration in iter_declarations(rules):
+        name, _, value = declaration.partition(":")
+        if name.startswith("animation") or name in used:
+            animation_words.update(re.findall(r"[\w-]+", value))
+    keyframes = [
+        item
+        for item in items
+        if is_keyframes(item) and item[0].split()[1] in animation_words
+    ]
+    used |= get_used_custom_properties(keyframes)
+
+    def prune(items: list) -> list:
+        pruned = []
+        for item in items:
+            if isinstance(item, str):
+                match = CUSTOM_PROPERTY_PATTERN.match(item)
+                if match is None or match.group(1) in used:
+                    pruned.append(item)
+            elif is_keyframes(item):
+                if item in keyframes:
+                    pruned.append(item)
+            elif item[0].startswith("@property"):
+                if item[0].split()[1] in used:
+                    pruned.append(item)
+            elif item[0].startswith("@font-face"):
+                pruned.append(item)
+            elif children := prune(item[1]):
+                pruned.append((item[0], children))
+        # The last declaration of a block has no semicolon in minified CSS
+        if pruned and isinstance(pruned[-1], str) and pruned != items:
+            pruned[-1] = pruned[-1].removesuffix(";")
+        return pruned
+
+    return prune(items)
+
+
+def get_markup_classes(markup: str) -> set[str]:
+    """Returns class names used in ``class`` attributes of ``markup``, ignoring template tags."""
+    return {
+        name
+        for _, value in CLASS_ATTRIBUTE_PATTERN.findall(markup)
+        for name in TEMPLATE_TAG_PATTERN.sub(" ", value).split()
+    }
+
+
+def get_above_the_fold_markup(template_name: str) -> str:
+    """
+    Returns the layout markup before the page content and the first :py:data:`FOLD_CHARS` characters of ``template_name``'s content.
+
+    :param template_name: A template extending :py:data:`LAYOUT_TEMPLATE`.
+    :type template_name: str
+    :returns: Template source.
+    :rtype: str
+
+    """
+    engine = engines["django"].engine
+    layout = engine.get_template(LAYOUT_TEMPLATE).source
+    source = engine.get_template(template_name).source
+    layout = layout.partition("{% block content %}")[0]
+    content = source.partition("{% partialdef main %}")[2] or source
+    return layout + content[:FOLD_CHARS]
+
+
+def get_critical_css_name(template_name: str) -> str:
+    stem = template_name.removesuffix(".html").replace("/", "-")
+    return f"{CRITICAL_CSS_DIR}/{stem}.css"
+
+
+def find_layout_templates() -> list[str]:
+    """Returns names of templates in :py:data:`TEMPLATE_APPS` extending :py:data:`LAYOUT_TEMPLATE`."""
+    names = []
+    for app_label in TEMPLATE_APPS:
+        directory = pathlib.Path(
+            apps.get_app_config(app_label).path, "templates"
+        )
+        for path in directory.rglob("*.html"):
+            if f'{{% extends "{LAYOUT_TEMPLATE}" %}}' in path.read_text():
+                names.append(path.relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def extract_critical_css(stylesheet: str, template_name: str) -> str:
+    """
+    Returns the rules of ``stylesheet`` used by the above-the-fold markup of ``template_name``.
+
+    :param stylesheet: The full stylesheet.
+    :type stylesheet: str
+    :param template_name: A template extending :py:data:`LAYOUT_TEMPLATE`.
+    :type template_name: str
+    :returns: The critical stylesheet.
+    :rtype: str
+
+    """
+    classes = get_markup_classes(get_above_the_fold_markup(template_name))
+    digest = hashlib.sha256(stylesheet.encode()).hexdigest()[:16]
+    critical = serialize_css(
+        drop_unused_definitions(filter_css(parse_css(stylesheet), classes))
+    )
+    return f"/* {template_name} {STYLESHEET}:{digest} */\n{critical}\n"
+
+
+def write_critical_css(
+    static_root: pathlib.Path, template_names: list[str] | None = None
+) -> dict[str, str]:
+    """
+    Writes critical stylesheets for ``template_names`` to :py:data:`CRITICAL_CSS_DIR` in ``static_root``.
+
+    :param static_root: The static files directory containing :py:data:`STYLESHEET`.
+    :type static_root: ~pathlib.Path
+    :param template_names: Optional. Template names. Default is every template extending :py:data:`LAYOUT_TEMPLATE`.
+    :type template_names: list[str] | None
+    :returns: The written static paths by template name.
+    :rtype: dict[str, str]
+
+    """
+    stylesheet = (static_root / STYLESHEET).read_text()
+    written = {}
+    for template_name in template_names or find_layout_templates():
+        name = get_critical_css_name(template_name)
+        path = static_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(extract_critical_css(stylesheet, template_name))
+        written[template_name] = name
+    return written
+
+
+def find_stale_critical_css(static_root: pathlib.Path) -> list[str]:
+    """
+    Returns the templates whose critical stylesheet in ``static_root`` is missing or no longer matches :py:data:`STYLESHEET` and the template.
+
+    :param static_root: The static files directory containing :py:data:`STYLESHEET`.
+    :type static_root: ~pathlib.Path
+    :returns: Template names.
+    :rtype: list[str]
+
+    """
+    stylesheet = (static_root / STYLESHEET).read_text()
+    stale = []
+    for template_name in find_layout_templates():
+        path = static_root / get_critical_css_name(template_name)
+        if not path.exists() or path.read_text() != extract_critical_css(
+            stylesheet, template_name
+        ):
+            stale.append(template_name)
+    return stale
+
+
+@functools.lru_cache(maxsize=64)
+def load_critical_css(template_name: str) -> str | None:
+    """Returns the critical stylesheet for ``template_name``, or ``None`` if it wasn't extracted."""
+    path = finders.find(get_critical_css_name(template_name))
+    if path is None:
+        return None
+    return pathlib.Path(path).read_text()
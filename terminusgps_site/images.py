@@ -0,0 +1,155 @@
+import functools
+import hashlib
+import io
+import json
+import logging
+import pathlib
+import posixpath
+
+from django.contrib.staticfiles import finders
+
+logger = logging.getLogger(__name__)
+
+RESPONSIVE_IMAGE_DIR = "terminusgps/img"
+RESPONSIVE_OUTPUT_DIR = "terminusgps/img/responsive"
+RESPONSIVE_MANIFEST = f"{RESPONSIVE_OUTPUT_DIR}/manifest.json"
+RESPONSIVE_WIDTHS = (480, 960, 1440)
+RASTER_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# (content type, Pillow format, extension, save options), most preferred first
+VARIANT_FORMATS = [
+    ("image/avif", "AVIF", "avif", {"quality": 50}),
+    ("image/webp", "WEBP", "webp", {"quality": 75, "method": 6}),
+]
+FALLBACK_FORMATS = {
+    False: ("image/jpeg", "JPEG", "jpg", {"quality": 80, "progressive": True}),
+    True: ("image/png", "PNG", "png", {"optimize": True}),
+}
+
+
+def find_source_images(static_root: pathlib.Path) -> list[str]:
+    """
+    Returns static paths of raster images under :py:data:`RESPONSIVE_IMAGE_DIR`.
+
+    :param static_root: A static files directory.
+    :type static_root: ~pathlib.Path
+    :returns: A sorted list of static paths.
+    :rtype: list[str]
+
+    """
+    image_dir = static_root / RESPONSIVE_IMAGE_DIR
+    output_dir = static_root / RESPONSIVE_OUTPUT_DIR
+    return sorted(
+        path.relative_to(static_root).as_posix()
+        for path in image_dir.rglob("*")
+        if path.suffix.lower() in RASTER_EXTENSIONS
+        and output_dir not in path.parents
+    )
+
+
+def get_variant_widths(width: int, widths=RESPONSIVE_WIDTHS) -> list[int]:
+    """Returns ``widths`` capped at ``width``, the source image's width."""
+    return sorted({min(w, width) for w in widths})
+
+
+def generate_variants(
+    static_root: pathlib.Path, name: str, widths=RESPONSIVE_WIDTHS
+) -> dict:
+    """
+    Writes resized AVIF, WebP and JPEG (or PNG, for transparent images) variants of static image ``name``.
+
+    :param static_root: The static files directory containing ``name``.
+    :type static_root: ~pathlib.Path
+    :param name: A static path to a raster image.
+    :type name: str
+    :param widths: Widths to resize the image to. Widths larger than the image are capped.
+    :type widths: ~collections.abc.Iterable[int]
+    :returns: A manifest entry for the image.
+    :rtype: dict
+
+    """
+    # Only needed to generate variants, not to render them
+    from PIL import Image
+
+    content = (static_root / name).read_bytes()
+    stem = posixpath.splitext(posixpath.relpath(name, RESPONSIVE_IMAGE_DIR))[0]
+    with Image.open(io.BytesIO(content)) as image:
+        image.load()
+    has_alpha = image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    fallback_format = FALLBACK_FORMATS[has_alpha]
+    formats = [*VARIANT_FORMATS, fallback_format]
+    sources = {content_type: [] for content_type, *_ in formats}
+    for width in get_variant_widths(image.width, widths):
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for content_type, image_format, extension, options in formats:
+            variant = f"{RESPONSIVE_OUTPUT_DIR}/{stem}-{width}.{extension}"
+            path = static_root / variant
+            path.parent.mkdir(parents=True, exist_ok=True)
+            resized.save(path, image_format, **options)
+            sources[content_type].append([variant, width])
+    return {
+        "digest": hashlib.sha256(content).hexdigest()[:16],
+        "width": image.width,
+        "height": image.height,
+        "fallback": sources.pop(fallback_format[0]),
+        "sources": sources,
+    }
+
+
+def generate_responsive_images(
+    static_root: pathlib.Path,
+    names: list[str] | None = None,
+    widths=RESPONSIVE_WIDTHS,
+    force: bool = False,
+) -> dict[str, dict]:
+    """
+    Generates variants for static images ``names`` and writes :py:data:`RESPONSIVE_MANIFEST`.
+
+    Images that haven't changed since they were last generated are skipped unless ``force`` is ``True``.
+
+    :param static_root: The static files directory containing ``names``.
+    :type static_root: ~pathlib.Path
+    :param names: Optional. Static paths of images. Default is every raster image under :py:data:`RESPONSIVE_IMAGE_DIR`.
+    :type names: list[str] | None
+    :param widths: Widths to resize images to.
+    :type widths: ~collections.abc.Iterable[int]
+    :param force: Whether to regenerate unchanged images. Default is ``False``.
+    :type force: bool
+    :returns: The generated manifest entries by static path.
+    :rtype: dict[str, dict]
+
+    """
+    manifest_path = static_root / RESPONSIVE_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except FileNotFoundError:
+        manifest = {}
+    generated = {}
+    for name in names or find_source_images(static_root):
+        content = (static_root / name).read_bytes()
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        entry = manifest.get(name)
+        if not force and entry and entry["digest"] == digest:
+            continue
+        manifest[name] = generated[name] = generate_variants(
+            static_root, name, widths
+        )
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=4, sort_keys=True))
+    return generated
+
+
+@functools.cache
+def load_manifest() -> dict[str, dict]:
+    """Returns responsive image manifest entries by static path, loaded once per process."""
+    path = finders.find(RESPONSIVE_MANIFEST)
+    if path is None:
+        logger.info(
+            f"Responsive image manifest '{RESPONSIVE_MANIFEST}' not found."
+        )
+        return {}
+    return json.loads(pathlib.Path(path).read_text())
@@ -0,0 +1,39 @@
+import pathlib
+
+from django.conf import settings
+from django.contrib.staticfiles.management.commands import collectstatic
+from django.core.management.base import CommandError
+
+from terminusgps_site.critical_css import find_stale_critical_css
+
+
+class Command(collectstatic.Command):
+    """
+    Collects static files, skipping files whose content is already in storage.
+
+    The default command compares modification times, so every file looks modified after a fresh checkout or container build. Storages with a ``file_matches(name, source_storage, source_path)`` method compare content instead.
+
+    Fails if the critical stylesheets are out of date with ``output.css`` or their templates, run ``extract_critical_css`` first.
+
+    """
+
+    def handle(self, **options):
+        stale = find_stale_critical_css(
+            pathlib.Path(settings.STATICFILES_DIRS[0])
+        )
+        if stale:
+            raise CommandError(
+                f"Critical CSS is out of date for {', '.join(stale)}, run 'manage.py extract_critical_css'."
+            )
+        return super().handle(**options)
+
+    def delete_file(self, path, prefixed_path, source_storage):
+        file_matches = getattr(self.storage, "file_matches", None)
+        if file_matches is not None and file_matches(
+            prefixed_path, source_storage, path
+        ):
+            if prefixed_path not in self.unmodified_files:
+                self.unmodified_files.append(prefixed_path)
+            self.log(f"Skipping '{path}' (unchanged)")
+            return False
+        return super().delete_file(path, prefixed_path, source_storage)
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from terminusgps.cloudfront import enable_compression
+
+
+class Command(BaseCommand):
+    help = "Makes the CloudFront distribution compress static files and pages with brotli or gzip. Run it once per distribution, not on every deploy."
+
+    def handle(self, *args, **options):
+        distribution_id = getattr(settings, "CLOUDFRONT_DISTRIBUTION_ID", None)
+        if not distribution_id:
+            raise CommandError("CLOUDFRONT_DISTRIBUTION_ID isn't set.")
+        changed = enable_compression(distribution_id)
+        for name in changed:
+            self.stdout.write(f"Enabled compression for {name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compression is enabled for '{distribution_id}'."
+            )
+        )
@@ -0,0 +1,39 @@
+import pathlib
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from terminusgps_site.critical_css import write_critical_css
+
+
+class Command(BaseCommand):
+    help = "Extracts the above-the-fold subset of output.css for every page template. Run after rebuilding output.css."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "template_names",
+            nargs="*",
+            help="Template names, e.g. 'terminusgps/home.html'. Default is every template extending the layout.",
+        )
+        parser.add_argument(
+            "--static-root",
+            type=pathlib.Path,
+            default=None,
+            help="Static files directory containing the stylesheet. Default is the first STATICFILES_DIRS entry.",
+        )
+
+    def handle(self, *args, **options):
+        static_root = options["static_root"] or pathlib.Path(
+            settings.STATICFILES_DIRS[0]
+        )
+        written = write_critical_css(
+            static_root, template_names=options["template_names"]
+        )
+        for template_name, name in written.items():
+            size = (static_root / name).stat().st_size
+            self.stdout.write(f"{template_name} -> {name} ({size} bytes)")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Extracted critical CSS for {len(written)} templates."
+            )
+        )
@@ -0,0 +1,59 @@
+import pathlib
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from terminusgps_site.images import (
+    RESPONSIVE_WIDTHS,
+    generate_responsive_images,
+)
+
+
+class Command(BaseCommand):
+    help = "Generates resized AVIF, WebP and JPEG variants of static images for the responsive_image template tag."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Static paths of images, e.g. 'terminusgps/img/sedan.jpg'. Default is every image in 'terminusgps/img'.",
+        )
+        parser.add_argument(
+            "--static-root",
+            type=pathlib.Path,
+            default=None,
+            help="Static files directory containing the images. Default is the first STATICFILES_DIRS entry.",
+        )
+        parser.add_argument(
+            "--widths",
+            type=int,
+            nargs="+",
+            default=list(RESPONSIVE_WIDTHS),
+            help="Widths to resize images to.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants of unchanged images.",
+        )
+
+    def handle(self, *args, **options):
+        static_root = options["static_root"] or pathlib.Path(
+            settings.STATICFILES_DIRS[0]
+        )
+        generated = generate_responsive_images(
+            static_root,
+            names=options["names"],
+            widths=options["widths"],
+            force=options["force"],
+        )
+        for name, entry in generated.items():
+            variants = sum(
+                len(variants) for variants in entry["sources"].values()
+            ) + len(entry["fallback"])
+            self.stdout.write(f"{name} -> {variants} variants")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated variants of {len(generated)} images in '{static_root}'."
+            )
+        )
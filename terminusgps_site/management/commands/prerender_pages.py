@@ -0,0 +1,28 @@
+import pathlib
+
+from django.core.management.base import BaseCommand
+
+from terminusgps_site.prerender import get_prerender_root, render_pages
+
+
+class Command(BaseCommand):
+    help = "Renders the marketing pages to static HTML files for anonymous visitors."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            type=pathlib.Path,
+            default=None,
+            help="Directory to write rendered pages to. Default is the PRERENDER_ROOT setting.",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options["output_dir"] or get_prerender_root()
+        manifest = render_pages(output_dir)
+        for template_name, filename in manifest.items():
+            self.stdout.write(f"{template_name} -> {filename}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {len(manifest)} pages to '{output_dir}'."
+            )
+        )
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from terminusgps.surrogate_keys import (
+    SITE_SURROGATE_KEY,
+    get_default_cache,
+    get_surrogate_key,
+    purge_surrogate_keys,
+)
+from terminusgps_site.prerender import get_template_digests
+
+DEPLOYED_DIGESTS_CACHE_KEY = "surrogate-key:deployed-digests"
+
+
+class Command(BaseCommand):
+    help = "Purges cached pages by surrogate key or template name from the page cache and the CDN."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "keys",
+            nargs="*",
+            help="Surrogate keys or template names to purge, e.g. 'terminusgps-home' or 'terminusgps/home.html'.",
+        )
+        parser.add_argument(
+            "--changed",
+            action="store_true",
+            help="Also purge templates whose output changed since the last run, for deploys.",
+        )
+        parser.add_argument(
+            "--all", action="store_true", help="Purge every cached page."
+        )
+
+    def handle(self, *args, **options):
+        if not (options["keys"] or options["changed"] or options["all"]):
+            raise CommandError("Provide keys to purge, --changed or --all.")
+        keys = [get_surrogate_key(key) for key in options["keys"]]
+        if options["all"]:
+            keys.append(SITE_SURROGATE_KEY)
+        if options["changed"]:
+            cache = get_default_cache()
+            deployed = cache.get(DEPLOYED_DIGESTS_CACHE_KEY, {})
+            digests = get_template_digests()
+            keys.extend(
+                get_surrogate_key(template_name)
+                for template_name, digest in digests.items()
+                if deployed.get(template_name) != digest
+            )
+        paths = purge_surrogate_keys(keys)
+        if options["changed"]:
+            # Only remembered once purged, so a failed purge is retried
+            cache.set(DEPLOYED_DIGESTS_CACHE_KEY, digests, timeout=None)
+        for path in paths:
+            self.stdout.write(path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {len(paths)} paths tagged with {len(keys)} keys."
+            )
+        )
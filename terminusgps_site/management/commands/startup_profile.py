@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_TIME_PATTERN = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$", re.MULTILINE
+)
+
+# Run in a fresh interpreter, this process has imported everything already
+PROFILE_SCRIPT = """
+import json, sys, time, wsgiref.util
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": sys.argv[2]}
+wsgiref.util.setup_testing_defaults(environ)
+statuses = []
+body = application(environ, lambda status, headers, *args: statuses.append(status))
+for chunk in body:
+    pass
+body.close()
+done = time.perf_counter()
+print(json.dumps({"setup": ready - start, "first_request": done - start, "status": statuses[0]}))
+"""
+
+
+def parse_import_times(output: str) -> list[tuple[str, int, int, int]]:
+    """
+    Parses the output of ``python -X importtime``.
+
+    :param output: Standard error of a process run with ``-X importtime``.
+    :type output: str
+    :returns: ``(module, self, cumulative, depth)`` tuples in microseconds, in import order.
+    :rtype: list[tuple[str, int, int, int]]
+
+    """
+    return [
+        (module, int(self_us), int(cumulative_us), len(indent) // 2)
+        for self_us, cumulative_us, indent, module in IMPORT_TIME_PATTERN.findall(
+            output
+        )
+    ]
+
+
+class Command(BaseCommand):
+    help = "Reports per-module import times and the time to the first request of a fresh process."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", default="/", help="Path of the first request."
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header of the first request.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=25,
+            help="Number of slowest modules to list.",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=["cumulative", "self"],
+            default="cumulative",
+            help="Sort modules by time including or excluding their imports.",
+        )
+        parser.add_argument(
+            "--max-first-request",
+            type=float,
+            default=None,
+            metavar="MS",
+            help="Fail if the first request takes longer than this many milliseconds.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                PROFILE_SCRIPT,
+                options["path"],
+                options["host"],
+            ],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR.parent,
+            env=os.environ
+            | {"DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE},
+        )
+        wall_time = time.perf_counter() - start
+        if process.returncode != 0:
+            raise CommandError(
+                f"Profiled process failed:\n{process.stderr[-2000:]}"
+            )
+        result = json.loads(process.stdout.splitlines()[-1])
+        imports = parse_import_times(process.stderr)
+
+        index = 1 if options["sort"] == "self" else 2
+        slowest = sorted(imports, key=lambda i: i[index], reverse=True)
+        self.stdout.write(f"{'cumulative':>12} {'self':>10}  module")
+        for module, self_us, cumulative_us, _ in slowest[: options["limit"]]:
+            self.stdout.write(
+                f"{cumulative_us / 1000:>9.1f} ms {self_us / 1000:>7.1f} ms  {module}"
+            )
+        total_us = sum(i[2] for i in imports if i[3] == 0)
+        first_request_ms = result["first_request"] * 1000
+        self.stdout.write(
+            f"\nImports: {total_us / 1000:.1f} ms ({len(imports)} modules)\n"
+            f"Setup: {result['setup'] * 1000:.1f} ms\n"
+            f"First request ({options['path']}): {first_request_ms:.1f} ms, {result['status']}\n"
+            f"Process: {wall_time * 1000:.1f} ms"
+        )
+        limit = options["max_first_request"]
+        if limit is not None and first_request_ms > limit:
+            raise CommandError(
+                f"First request took {first_request_ms:.1f} ms, more than {limit:.1f} ms."
+            )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from terminusgps.wialon_standin import WialonStandInServer
+
+
+class Command(BaseCommand):
+    help = "Serves a local stand-in for the Wialon API, for load tests."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host", default="127.0.0.1", help="Host to listen on."
+        )
+        parser.add_argument(
+            "--port", type=int, default=8001, help="Port to listen on."
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.1,
+            help="Seconds to wait before answering a request, like Wialon's response time.",
+        )
+
+    def handle(self, *args, **options):
+        server = WialonStandInServer(
+            (options["host"], options["port"]), latency=options["latency"]
+        )
+        self.stdout.write(
+            f"Serving a Wialon stand-in at {server.url}, start the site with "
+            f"WIALON_API_URL={server.url} to use it."
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
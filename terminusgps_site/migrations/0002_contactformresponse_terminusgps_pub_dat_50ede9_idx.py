@@ -0,0 +1,17 @@
+# Generated by Django 6.0.7 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_site', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactformresponse',
+            index=models.Index(fields=['pub_date'], name='terminusgps_pub_dat_50ede9_idx'),
+        ),
+    ]
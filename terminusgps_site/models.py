@@ -1,4 +1,5 @@
 from django.core.mail import mail_admins
+from django.core.mail.backends.base import BaseEmailBackend
 from django.db import models
 from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
@@ -13,6 +14,7 @@ class ContactFormResponse(models.Model):
     class Meta:
         verbose_name = _("contact form response")
         verbose_name_plural = _("contact form responses")
+        indexes = [models.Index(fields=["pub_date"])]
 
     def __str__(self) -> str:
         return self.name
@@ -20,7 +22,24 @@ class ContactFormResponse(models.Model):
     def email_to_admins(
         self,
         template_name: str = "terminusgps/emails/contact_form_response.txt",
+        connection: BaseEmailBackend | None = None,
     ) -> None:
+        """
+        Emails the response to the site admins.
+
+        :param template_name: Optional. The message body template.
+        :type template_name: str
+        :param connection: Optional. An open email connection to send over. Default is a new connection, failing silently.
+        :type connection: ~django.core.mail.backends.base.BaseEmailBackend | None
+        :returns: Nothing.
+        :rtype: None
+
+        """
         subject = f"Contact Form Response - {self}"
         message = render_to_string(template_name, {"response": self})
-        mail_admins(subject, message, fail_silently=True)
+        mail_admins(
+            subject,
+            message,
+            fail_silently=connection is None,
+            connection=connection,
+        )
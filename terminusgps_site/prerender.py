@@ -0,0 +1,143 @@
+import functools
+import hashlib
+import json
+import logging
+import pathlib
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import get_messages
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from .forms import ContactForm
+
+logger = logging.getLogger(__name__)
+
+CSRF_PLACEHOLDER = "__prerendered_csrf_token__"
+
+PRERENDERED_TEMPLATES = {
+    "terminusgps/home.html": dict,
+    "terminusgps/about.html": dict,
+    "terminusgps/terms.html": dict,
+    "terminusgps/privacy.html": dict,
+    "terminusgps/features.html": dict,
+    "terminusgps/faq.html": dict,
+    "terminusgps/contact.html": lambda: {"form": ContactForm()},
+}
+
+
+def get_prerender_root() -> pathlib.Path:
+    return pathlib.Path(settings.PRERENDER_ROOT)
+
+
+def render_pages(output_dir: pathlib.Path) -> dict[str, str]:
+    """
+    Renders every prerendered template in full and partial variants to ``output_dir``.
+
+    Each file is named after a digest of its content, and a ``manifest.json`` mapping template names to file names is written last.
+
+    :param output_dir: A directory to write rendered pages to.
+    :type output_dir: ~pathlib.Path
+    :returns: The manifest of template names to file names.
+    :rtype: dict[str, str]
+
+    """
+    from django.test import RequestFactory
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    manifest = {}
+    for template_name, get_context in PRERENDERED_TEMPLATES.items():
+        stem = template_name.removesuffix(".html").replace("/", "-")
+        for variant, suffix in (
+            (template_name, ""),
+            (f"{template_name}#main", "-main"),
+        ):
+            context = get_context() | {"csrf_token": CSRF_PLACEHOLDER}
+            content = render_to_string(variant, context, request).encode()
+            digest = hashlib.sha256(content).hexdigest()[:16]
+            filename = f"{stem}{suffix}.{digest}.html"
+            (output_dir / filename).write_bytes(content)
+            manifest[variant] = filename
+    (output_dir / "manifest.json").write_text(json.dumps(manifest, indent=4))
+    return manifest
+
+
+@functools.cache
+def load_prerendered_pages() -> dict[str, tuple[bytes, str]]:
+    """Returns prerendered page contents and ETags by template name, loaded once per process."""
+    root = get_prerender_root()
+    try:
+        manifest = json.loads((root / "manifest.json").read_text())
+        return {
+            template_name: (
+                (root / filename).read_bytes(),
+                filename.rsplit(".", 2)[-2],
+            )
+            for template_name, filename in manifest.items()
+        }
+    except (OSError, ValueError) as error:
+        logger.info(f"Prerendered pages unavailable: {error}")
+        return {}
+
+
+def get_template_digests() -> dict[str, str]:
+    """
+    Returns a digest of each template of this app, for finding templates whose output changed between deploys.
+
+    Prerendered templates are digested by their rendered output, which also changes with the static files they reference, other templates by their source.
+
+    :returns: Digests by template name.
+    :rtype: dict[str, str]
+
+    """
+    directory = pathlib.Path(__file__).resolve().parent / "templates"
+    pages = load_prerendered_pages()
+    digests = {}
+    for path in sorted(directory.rglob("*.html")):
+        template_name = path.relative_to(directory).as_posix()
+        variants = [template_name, f"{template_name}#main"]
+        if all(variant in pages for variant in variants):
+            content = ":".join(pages[variant][1] for variant in variants)
+        else:
+            content = path.read_text()
+        digests[template_name] = hashlib.sha256(content.encode()).hexdigest()
+    return digests
+
+
+def can_serve_prerendered(request: HttpRequest) -> bool:
+    """Returns whether the prerendered page is identical to what the view would render for ``request``."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return False
+    return not get_messages(request)
+
+
+def prerendered(view_func):
+    """
+    Serves the prerendered bytes of ``request.template_name`` for anonymous visitors.
+
+    Must be applied below :py:func:`~terminusgps.decorators.htmx_template`. Falls back to ``view_func`` if the page wasn't prerendered.
+
+    """
+
+    @functools.wraps(view_func)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        page = load_prerendered_pages().get(request.template_name)
+        if page is None or not can_serve_prerendered(request):
+            return view_func(request, *args, **kwargs)
+        content, etag = page
+        if CSRF_PLACEHOLDER.encode() in content:
+            content = content.replace(
+                CSRF_PLACEHOLDER.encode(), get_token(request).encode()
+            )
+            etag = None
+        response = HttpResponse(content)
+        if etag is not None:
+            response.headers["ETag"] = f'"{etag}"'
+        return response
+
+    return wrapper
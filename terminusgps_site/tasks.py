@@ -0,0 +1,24 @@
+from django.core.mail import get_connection
+from django.tasks import task
+
+from .models import ContactFormResponse
+
+
+@task
+def email_contact_form_responses(pks: list[int]) -> int:
+    """
+    Emails contact form responses to the site admins over a single SMTP connection.
+
+    :param pks: Contact form response primary keys.
+    :type pks: list[int]
+    :returns: The number of emailed responses.
+    :rtype: int
+
+    """
+    responses = ContactFormResponse.objects.filter(pk__in=pks)
+    count = 0
+    with get_connection() as connection:
+        for response in responses.order_by("pub_date"):
+            response.email_to_admins(connection=connection)
+            count += 1
+    return count
@@ -0,0 +1,36 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import SafeString, mark_safe
+
+from terminusgps_site.critical_css import STYLESHEET, load_critical_css
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def stylesheet(context: template.Context) -> SafeString:
+    """
+    Renders the page's critical CSS inline and loads the full stylesheet without blocking rendering.
+
+    Renders a render-blocking ``<link>`` if no critical CSS was extracted for the page's template.
+
+    Usage::
+
+        {% load critical_css %}
+        {% stylesheet %}
+
+    """
+    href = static(STYLESHEET)
+    template_name = getattr(context.template, "name", None)
+    critical_css = load_critical_css(template_name) if template_name else None
+    if critical_css is None:
+        return format_html('<link rel="stylesheet" href="{}"/>', href)
+    return format_html(
+        "<style>{}</style>"
+        '<link rel="stylesheet" href="{}" media="print" onload="this.media=\'all\'"/>'
+        '<noscript><link rel="stylesheet" href="{}"/></noscript>',
+        mark_safe(critical_css.replace("</", "<\\/")),
+        href,
+        href,
+    )
@@ -0,0 +1,79 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import SafeString
+
+from terminusgps_site.images import VARIANT_FORMATS, load_manifest
+
+register = template.Library()
+
+
+def get_srcset(variants: list[list]) -> str:
+    return ", ".join(f"{static(name)} {width}w" for name, width in variants)
+
+
+@register.simple_tag
+def responsive_image(
+    name: str,
+    alt: str,
+    sizes: str = "100vw",
+    loading: str = "lazy",
+    width: int | None = None,
+    height: int | None = None,
+    **attrs,
+) -> SafeString:
+    """
+    Renders a ``<picture>`` with AVIF, WebP and JPEG sources for static image ``name``.
+
+    Renders a plain ``<img>`` if no variants were generated for ``name``. Extra keyword arguments are rendered as ``<img>`` attributes.
+
+    The ``<img>`` is sized like the image, so it keeps its aspect ratio while loading. Pass ``width`` or ``height`` for images displayed smaller than they are, like avatars, the other is scaled to match.
+
+    Usage::
+
+        {% load responsive_images %}
+        {% responsive_image "terminusgps/img/sedan.jpg" alt="A sedan" sizes="(min-width: 56rem) 50vw, 100vw" class="w-full" %}
+        {% responsive_image "terminusgps/img/headshot.jpg" alt="A headshot" sizes="96px" width=96 height=96 class="size-24 object-cover" %}
+
+    """
+    attrs = {"alt": alt, "loading": loading, "decoding": "async", **attrs}
+    entry = load_manifest().get(name)
+    if entry is not None:
+        if width is None and height is None:
+            width, height = entry["width"], entry["height"]
+        elif height is None:
+            height = round(width * entry["height"] / entry["width"])
+        elif width is None:
+            width = round(height * entry["width"] / entry["height"])
+    attrs |= {
+        key: value
+        for key, value in (("width", width), ("height", height))
+        if value is not None
+    }
+    if entry is None:
+        return format_html(
+            '<img src="{}"{}>',
+            static(name),
+            format_html_join("", ' {}="{}"', attrs.items()),
+        )
+
+    fallback = entry["fallback"]
+    attrs = {"srcset": get_srcset(fallback), "sizes": sizes, **attrs}
+    return format_html(
+        '<picture style="display: contents">{}<img src="{}"{}></picture>',
+        format_html_join(
+            "",
+            '<source type="{}" srcset="{}" sizes="{}">',
+            (
+                (
+                    content_type,
+                    get_srcset(entry["sources"][content_type]),
+                    sizes,
+                )
+                for content_type, *_ in VARIANT_FORMATS
+                if content_type in entry["sources"]
+            ),
+        ),
+        static(fallback[-1][0]),
+        format_html_join("", ' {}="{}"', attrs.items()),
+    )
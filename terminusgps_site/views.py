@@ -1,3 +1,6 @@
+from functools import partial
+
+from django.db import transaction
 from django.http import (
     HttpRequest,
     HttpResponse,
@@ -9,23 +12,27 @@ from django.views.decorators.cache import cache_control, never_cache
 from django.views.decorators.http import require_GET, require_http_methods
 from django.views.decorators.vary import vary_on_headers
 
-from terminusgps.decorators import htmx_template
+from terminusgps.decorators import htmx_template, throttle
 
 from .forms import ContactForm
+from .prerender import prerendered
+from .tasks import email_contact_form_responses
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/home.html")
+@prerendered
 def home_view(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, request.template_name)
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/contact.html")
+@prerendered
 def contact_view(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(
         request, request.template_name, {"form": ContactForm()}
@@ -36,19 +43,25 @@ def contact_view(request: HttpRequest) -> HttpResponse:
 @never_cache
 @require_http_methods(["GET", "POST"])
 @htmx_template("terminusgps/contact_form.html")
+@throttle("contact-form", "5/h", methods=["POST"])
 def contact_form_view(request: HttpRequest) -> HttpResponse:
     form = ContactForm()
     if request.method == "POST":
         form = ContactForm(request.POST)
         if form.is_valid():
             contact_form_response = form.save(commit=True)
-            contact_form_response.email_to_admins()
+            transaction.on_commit(
+                partial(
+                    email_contact_form_responses.enqueue,
+                    [contact_form_response.pk],
+                )
+            )
             return redirect("contact form success")
     return TemplateResponse(request, request.template_name, {"form": form})
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/contact_form_success.html")
 def contact_form_success_view(request: HttpRequest) -> HttpResponse:
@@ -56,41 +69,46 @@ def contact_form_success_view(request: HttpRequest) -> HttpResponse:
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/about.html")
+@prerendered
 def about_view(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, request.template_name)
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/terms.html")
+@prerendered
 def terms_view(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, request.template_name)
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/privacy.html")
+@prerendered
 def privacy_view(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, request.template_name)
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/features.html")
+@prerendered
 def features_view(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, request.template_name)
 
 
 @vary_on_headers("HX-Request")
-@cache_control(max_age=300)
+@cache_control(public=True, max_age=300, s_maxage=3600)
 @require_GET
 @htmx_template("terminusgps/faq.html")
+@prerendered
 def faq_view(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, request.template_name)
 
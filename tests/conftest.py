@@ -3,7 +3,7 @@ from unittest.mock import MagicMock
 import pytest
 from django.test import Client
 
-import terminusgps.wialon
+import wialon.api
 
 
 @pytest.fixture
@@ -16,7 +16,7 @@ def mock_api(monkeypatch):
         "gis_sid": "def456",
     }
     mock_wialon_cls = MagicMock(return_value=mock_api)
-    monkeypatch.setattr(terminusgps.wialon, "Wialon", mock_wialon_cls)
+    monkeypatch.setattr(wialon.api, "Wialon", mock_wialon_cls)
     yield mock_api
 
 
@@ -0,0 +1,102 @@
+import pytest
+from django.core.cache import cache
+from wialon.api import WialonError
+
+from terminusgps import circuit_breaker, wialon
+from terminusgps.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(
+        "test",
+        is_failure=lambda error: isinstance(error, OSError),
+        failure_threshold=2,
+        reset_timeout=30,
+    )
+
+
+def call(breaker, error=None):
+    with breaker.guard():
+        if error is not None:
+            raise error
+
+
+def test_circuit_opens_after_repeated_failures(breaker, clock):
+    for _ in range(2):
+        with pytest.raises(OSError):
+            call(breaker, OSError("timed out"))
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        call(breaker)
+
+
+def test_circuit_ignores_other_errors(breaker, clock):
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            call(breaker, ValueError("bad input"))
+    assert not breaker.is_open()
+
+
+def test_circuit_closes_after_successful_probe(breaker, clock):
+    breaker.open()
+    clock[0] += 31
+    assert not breaker.is_open()
+    call(breaker)
+    call(breaker)
+
+
+def test_circuit_lets_a_single_probe_through(breaker, clock):
+    breaker.open()
+    clock[0] += 31
+    with breaker.guard():
+        with pytest.raises(CircuitOpenError):
+            call(breaker)
+
+
+def test_circuit_reopens_after_failed_probe(breaker, clock):
+    breaker.open()
+    clock[0] += 31
+    with pytest.raises(OSError):
+        call(breaker, OSError("timed out"))
+    assert breaker.is_open()
+
+
+def test_guard_requests_fails_fast_with_wialon_error(clock, monkeypatch):
+    monkeypatch.setattr(wialon.wialon_circuit_breaker, "failure_threshold", 1)
+    calls = []
+
+    def request(action_name, url, params):
+        calls.append(action_name)
+        raise WialonError(0, "HTTP 502")
+
+    guarded = wialon.guard_requests(request)
+    with pytest.raises(WialonError):
+        guarded("core/search_items", "https://example.com", {})
+    with pytest.raises(WialonError) as error:
+        guarded("core/search_items", "https://example.com", {})
+    assert error.value._code == 0
+    assert calls == ["core/search_items"]
+
+
+def test_is_wialon_outage():
+    assert wialon.is_wialon_outage(WialonError(0, "HTTP 503"))
+    assert wialon.is_wialon_outage(TimeoutError())
+    assert not wialon.is_wialon_outage(WialonError(4, "Invalid input"))
@@ -0,0 +1,159 @@
+import gzip
+import types
+import zlib
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory
+
+import terminusgps.compression
+from terminusgps.compression import compress_bytes, get_accepted_encoding
+from terminusgps.middleware import CompressionMiddleware
+
+HTML = b"<p>Terminus GPS</p>" * 100
+
+
+@pytest.fixture(autouse=True)
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(terminusgps.compression, "brotli", None)
+
+
+@pytest.fixture
+def middleware():
+    def get_response(request):
+        return request.response
+
+    return CompressionMiddleware(get_response)
+
+
+@pytest.fixture
+def fake_brotli(monkeypatch):
+    monkeypatch.setattr(
+        terminusgps.compression,
+        "brotli",
+        types.SimpleNamespace(compress=lambda content, quality: b"br"),
+    )
+
+
+def get(
+    middleware, response, accept_encoding="gzip, deflate", csrf_token=False
+):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    if csrf_token:
+        get_token(request)
+    request.response = response
+    return middleware(request)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding,expected",
+    [
+        ("gzip, deflate, br", "gzip"),
+        ("br;q=1.0, gzip;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+        ("*, gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_get_accepted_encoding(accept_encoding, expected):
+    assert get_accepted_encoding(accept_encoding) == expected
+
+
+def test_get_accepted_encoding_prefers_brotli(monkeypatch):
+    monkeypatch.setattr(terminusgps.compression, "brotli", object())
+    assert get_accepted_encoding("gzip, deflate, br") == "br"
+
+
+def test_compression_middleware_compresses_html(middleware):
+    response = HttpResponse(HTML, headers={"ETag": '"abc"'})
+    response = get(middleware, response)
+    assert response["Content-Encoding"] == "gzip"
+    assert response["ETag"] == 'W/"abc"'
+    assert "Accept-Encoding" in response["Vary"]
+    assert int(response["Content-Length"]) == len(response.content)
+    assert gzip.decompress(response.content) == HTML
+
+
+def test_compression_middleware_skips_unaccepted(middleware):
+    response = get(middleware, HttpResponse(HTML), accept_encoding="")
+    assert not response.has_header("Content-Encoding")
+    assert "Accept-Encoding" in response["Vary"]
+    assert response.content == HTML
+
+
+def test_compression_middleware_skips_short_responses(middleware):
+    response = get(middleware, HttpResponse(b"<p>Hi</p>"))
+    assert not response.has_header("Content-Encoding")
+
+
+def test_compression_middleware_skips_binary_content(middleware):
+    response = HttpResponse(HTML, content_type="image/png")
+    response = get(middleware, response)
+    assert not response.has_header("Content-Encoding")
+
+
+def test_compression_middleware_flushes_streaming_chunks(middleware):
+    response = StreamingHttpResponse(iter([b"<header>", b"<main></main>"]))
+    response = get(middleware, response)
+    assert response["Content-Encoding"] == "gzip"
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = iter(response.streaming_content)
+    assert decompressor.decompress(next(chunks)) == b"<header>"
+    rest = b"".join(decompressor.decompress(chunk) for chunk in chunks)
+    assert rest == b"<main></main>"
+
+
+def test_compress_bytes_pads_gzip():
+    lengths = {
+        len(compress_bytes(HTML, "gzip", max_random_bytes=100))
+        for _ in range(20)
+    }
+    compressed = compress_bytes(HTML, "gzip", max_random_bytes=100)
+    assert compressed[3] & gzip.FNAME
+    assert gzip.decompress(compressed) == HTML
+    assert len(lengths) > 1
+
+
+def test_compress_bytes_without_padding_is_deterministic():
+    compressed = compress_bytes(HTML, "gzip")
+    assert compressed == compress_bytes(HTML, "gzip")
+    assert gzip.decompress(compressed) == HTML
+
+
+def test_compression_middleware_pads_streaming_gzip(middleware):
+    response = StreamingHttpResponse(iter([b"<header>", b"<main></main>"]))
+    response = get(middleware, response)
+    content = b"".join(response.streaming_content)
+    assert content[3] & gzip.FNAME
+    assert gzip.decompress(content) == b"<header><main></main>"
+
+
+def test_compression_middleware_uses_brotli_without_token(
+    middleware, fake_brotli
+):
+    response = get(middleware, HttpResponse(HTML), accept_encoding="br, gzip")
+    assert response["Content-Encoding"] == "br"
+
+
+def test_compression_middleware_pads_responses_with_token(
+    middleware, fake_brotli
+):
+    response = get(
+        middleware,
+        HttpResponse(HTML),
+        accept_encoding="br, gzip",
+        csrf_token=True,
+    )
+    assert response["Content-Encoding"] == "gzip"
+    assert response.content[3] & gzip.FNAME
+
+
+def test_compression_middleware_pads_streaming_responses(
+    middleware, fake_brotli
+):
+    response = StreamingHttpResponse(iter([HTML]))
+    response = get(middleware, response, accept_encoding="br, gzip")
+    assert response["Content-Encoding"] == "gzip"
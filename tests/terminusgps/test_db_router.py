@@ -0,0 +1,105 @@
+import pytest
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from terminusgps import db_router
+from terminusgps.db_router import ReplicaRouter, RoutingState, routing_state
+from terminusgps.middleware import PrimaryPinningMiddleware
+from terminusgps_site.models import ContactFormResponse
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ["replica_1", "replica_2"]
+    healthy = {"replica_1": True, "replica_2": True}
+    monkeypatch.setattr(
+        db_router, "check_replica", lambda alias: healthy[alias]
+    )
+    monkeypatch.setattr(db_router, "_replica_health", {})
+    token = routing_state.set(RoutingState())
+    yield healthy
+    routing_state.reset(token)
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter()
+
+
+def test_reads_go_to_replicas(replicas, router):
+    assert router.db_for_read(ContactFormResponse) in replicas
+
+
+def test_reads_outside_requests_go_to_primary(replicas, router):
+    routing_state.set(None)
+    assert router.db_for_read(ContactFormResponse) == "default"
+
+
+def test_reads_after_write_go_to_primary(replicas, router):
+    assert router.db_for_write(ContactFormResponse) == "default"
+    assert router.db_for_read(ContactFormResponse) == "default"
+    assert routing_state.get().wrote
+
+
+@pytest.mark.django_db
+def test_reads_in_transaction_go_to_primary(replicas, router):
+    with transaction.atomic():
+        assert router.db_for_read(ContactFormResponse) == "default"
+
+
+def test_unhealthy_replicas_fall_back(replicas, router, monkeypatch):
+    replicas["replica_1"] = False
+    assert {router.db_for_read(ContactFormResponse) for _ in range(10)} == {
+        "replica_2"
+    }
+    monkeypatch.setattr(db_router, "_replica_health", {})
+    replicas["replica_2"] = False
+    assert router.db_for_read(ContactFormResponse) == "default"
+
+
+def test_replica_health_is_reused(replicas, monkeypatch):
+    checks = []
+    monkeypatch.setattr(
+        db_router, "check_replica", lambda alias: checks.append(alias) or True
+    )
+    for _ in range(3):
+        assert db_router.is_replica_healthy("replica_1")
+    assert checks == ["replica_1"]
+
+
+def test_migrations_only_run_on_primary(replicas, router):
+    assert router.allow_migrate("default", "terminusgps_site")
+    assert not router.allow_migrate("replica_1", "terminusgps_site")
+
+
+@pytest.mark.parametrize(
+    "method,cookies,pinned",
+    [
+        ("get", {}, False),
+        ("post", {}, True),
+        ("get", {"pin_primary": "1"}, True),
+    ],
+)
+def test_middleware_pins_unsafe_and_recently_writing_requests(
+    method, cookies, pinned
+):
+    request = getattr(RequestFactory(), method)("/")
+    request.COOKIES.update(cookies)
+    middleware = PrimaryPinningMiddleware(lambda request: HttpResponse())
+    middleware(request)
+    assert routing_state.get().pinned is pinned
+
+
+def test_middleware_sets_pin_cookie_after_write(router):
+    def view(request):
+        router.db_for_write(ContactFormResponse)
+        return HttpResponse()
+
+    middleware = PrimaryPinningMiddleware(view)
+    response = middleware(RequestFactory().get("/"))
+    assert response.cookies["pin_primary"]["max-age"] == 5
+    response = PrimaryPinningMiddleware(lambda r: HttpResponse())(
+        RequestFactory().get("/")
+    )
+    assert "pin_primary" not in response.cookies
@@ -0,0 +1,46 @@
+from django.urls import reverse
+
+from terminusgps.early_hints import (
+    get_preload_link,
+    get_template_preload_links,
+)
+
+LAYOUT_LINKS = (
+    "</static/terminusgps/css/output.css>; rel=preload; as=style",
+    "</static/terminusgps/js/htmx.min.js>; rel=preload; as=script",
+    "</static/terminusgps/js/hx-preload.js>; rel=preload; as=script",
+)
+
+
+def test_get_preload_link():
+    assert get_preload_link(
+        """<link rel="preload" href="{% static 'a.css' %}" as="style">"""
+    ) == ("</static/a.css>; rel=preload; as=style")
+    assert get_preload_link('<link rel="stylesheet" href="/a.css">') is None
+    assert get_preload_link('<link rel="preload" href="{{ url }}">') is None
+
+
+def test_template_preload_links_include_parents():
+    assert get_template_preload_links("terminusgps/home.html") == LAYOUT_LINKS
+    assert get_template_preload_links("installer/new_job.html") == (
+        *LAYOUT_LINKS,
+        "</static/formset/js/django-formset.js>; rel=modulepreload",
+    )
+
+
+def test_early_hints_sent_before_view(client):
+    sent = []
+    response = client.get(reverse("home"), **{"wsgi.early_hints": sent.append})
+    assert sent == [[("Link", ", ".join(LAYOUT_LINKS))]]
+    assert response["Link"] == ", ".join(LAYOUT_LINKS)
+
+
+def test_early_hints_skipped_for_htmx_requests(client):
+    sent = []
+    response = client.get(
+        reverse("home"),
+        headers={"HX-Request": "true"},
+        **{"wsgi.early_hints": sent.append},
+    )
+    assert sent == []
+    assert not response.has_header("Link")
@@ -0,0 +1,91 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from terminusgps import health
+
+
+@pytest.fixture(autouse=True)
+def probes(monkeypatch, settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    calls = {"database": 0, "cache": 0, "wialon": 0}
+    failing = set()
+
+    def make_check(name):
+        def check():
+            calls[name] += 1
+            if name in failing:
+                raise ConnectionError("10.0.0.1 refused")
+
+        return check
+
+    monkeypatch.setattr(
+        health,
+        "PROBES",
+        [
+            health.Probe(p.name, make_check(p.name), p.ttl, p.critical)
+            for p in health.PROBES
+        ],
+    )
+    monkeypatch.setattr(health, "_results", {})
+    yield calls, failing
+    cache.clear()
+
+
+def test_healthz(client):
+    response = client.get(reverse("healthz"))
+    assert response.status_code == 200
+    assert response.content == b"ok"
+
+
+def test_readyz_reports_each_dependency(client, probes):
+    calls, _ = probes
+    response = client.get(reverse("readyz"))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert set(body["checks"]) == {"database", "cache", "wialon"}
+    assert all(c["status"] == "ok" for c in body["checks"].values())
+    assert calls == {"database": 1, "cache": 1, "wialon": 1}
+
+
+def test_readyz_reuses_recent_results(client, probes):
+    calls, _ = probes
+    client.get(reverse("readyz"))
+    response = client.head(reverse("readyz"))
+    assert response.status_code == 200
+    response = client.get(reverse("readyz"))
+    assert all(c["cached"] for c in response.json()["checks"].values())
+    assert calls == {"database": 1, "cache": 1, "wialon": 1}
+
+
+def test_readyz_unavailable_without_critical_dependency(client, probes):
+    _, failing = probes
+    failing.add("database")
+    response = client.get(reverse("readyz"))
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "unavailable"
+    assert body["checks"]["database"]["error"] == "ConnectionError"
+    assert "10.0.0.1" not in response.content.decode()
+
+
+def test_readyz_degraded_without_wialon(client, probes):
+    _, failing = probes
+    failing.add("wialon")
+    response = client.get(reverse("readyz"))
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+
+
+def test_check_wialon_reuses_session(mock_api):
+    mock_api.avl_evts.return_value = {}
+    mock_api.sid = None
+    health.check_wialon()
+    assert mock_api.token_login.call_count == 1
+    assert cache.get(health.WIALON_SID_CACHE_KEY) == "abc123"
+    health.check_wialon()
+    assert mock_api.token_login.call_count == 1
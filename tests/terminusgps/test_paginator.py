@@ -0,0 +1,42 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from terminusgps.paginator import EstimatedCountPaginator
+
+
+@pytest.fixture
+def users():
+    return get_user_model().objects.bulk_create(
+        get_user_model()(username=f"user{i}") for i in range(3)
+    )
+
+
+@pytest.mark.django_db
+def test_estimatedcountpaginator_exact_count_without_estimate(users):
+    """Fails if :py:class:`EstimatedCountPaginator` doesn't fall back to an exact count when no estimate is available."""
+    queryset = get_user_model().objects.order_by("pk")
+    paginator = EstimatedCountPaginator(queryset, 2)
+    assert paginator.count == 3
+    assert paginator.num_pages == 2
+
+
+@pytest.mark.django_db
+def test_estimatedcountpaginator_uses_large_estimate(users, monkeypatch):
+    """Fails if :py:class:`EstimatedCountPaginator` doesn't use an estimate above :py:attr:`exact_count_threshold`."""
+    monkeypatch.setattr(
+        EstimatedCountPaginator, "_get_estimated_count", lambda self: 50_000
+    )
+    queryset = get_user_model().objects.order_by("pk")
+    assert EstimatedCountPaginator(queryset, 2).count == 50_000
+
+
+@pytest.mark.django_db
+def test_estimatedcountpaginator_small_estimate_counts_exactly(
+    users, monkeypatch
+):
+    """Fails if :py:class:`EstimatedCountPaginator` trusts an estimate below :py:attr:`exact_count_threshold`."""
+    monkeypatch.setattr(
+        EstimatedCountPaginator, "_get_estimated_count", lambda self: 10
+    )
+    queryset = get_user_model().objects.order_by("pk")
+    assert EstimatedCountPaginator(queryset, 2).count == 3
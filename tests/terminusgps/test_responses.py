@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+from django.test import RequestFactory
+
+from terminusgps.responses import StreamingTemplateResponse
+
+
+def test_shell_streamed_before_deferred_context():
+    request = RequestFactory().get("/")
+    get_units = MagicMock(return_value=[])
+    response = StreamingTemplateResponse(
+        request, "terminusgps/home.html", deferred_context={"units": get_units}
+    )
+    chunks = iter(response.streaming_content)
+    head = next(chunks)
+    assert head.lstrip().startswith(b"<!doctype html>")
+    assert head.rstrip().endswith(b'<main class="@container">')
+    get_units.assert_not_called()
+    content = next(chunks)
+    get_units.assert_called_once_with()
+    assert content.lstrip().startswith(b"<")
+    assert next(chunks).lstrip().startswith(b"</main>")
+
+
+def test_partial_streamed_in_one_chunk():
+    request = RequestFactory().get("/")
+    response = StreamingTemplateResponse(
+        request, "terminusgps/home.html#main", deferred_context={}
+    )
+    chunks = list(response.streaming_content)
+    assert len(chunks) == 1
+    assert b"<main" not in chunks[0]
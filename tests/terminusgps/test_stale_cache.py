@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache import cache
+
+from terminusgps import stale_cache
+from terminusgps.stale_cache import (
+    CachedValue,
+    get_stale_while_revalidate,
+    set_cached_value,
+)
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stale_cache.time, "time", lambda: now[0])
+    return now
+
+
+def get(fetch, revalidate):
+    return get_stale_while_revalidate(
+        "key", fetch, revalidate, max_age=60, stale_ttl=3600
+    )
+
+
+def test_fetches_missing_value(clock):
+    fetch, revalidate = MagicMock(return_value=[1]), MagicMock()
+    assert get(fetch, revalidate) == CachedValue([1])
+    assert get(fetch, revalidate) == CachedValue([1])
+    assert fetch.call_count == 1
+    revalidate.assert_not_called()
+
+
+def test_serves_stale_value_while_revalidating_once(clock):
+    fetch, revalidate = MagicMock(return_value=[1]), MagicMock()
+    get(fetch, revalidate)
+    clock[0] += 61
+    assert get(fetch, revalidate) == CachedValue([1], stale=True)
+    assert get(fetch, revalidate) == CachedValue([1], stale=True)
+    assert fetch.call_count == 1
+    assert revalidate.call_count == 1
+    set_cached_value("key", [2], 3600)
+    assert get(fetch, revalidate) == CachedValue([2])
+
+
+def test_missing_value_fetch_errors_propagate(clock):
+    fetch = MagicMock(side_effect=OSError("timed out"))
+    with pytest.raises(OSError):
+        get(fetch, MagicMock())
@@ -0,0 +1,105 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.cache import get_cache_key
+
+import terminusgps.middleware
+import terminusgps.surrogate_keys
+from terminusgps.surrogate_keys import (
+    get_default_cache,
+    get_index_cache_key,
+    get_template_surrogate_keys,
+    index_response,
+    purge_surrogate_keys,
+)
+
+
+@pytest.fixture(autouse=True)
+def page_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    settings.MIDDLEWARE = settings.MIDDLEWARE + [
+        "terminusgps.middleware.AnonymousFetchFromCacheMiddleware"
+    ]
+    cache = get_default_cache()
+    yield cache
+    cache.clear()
+
+
+def get_cached_page(cache, response):
+    key = get_cache_key(response.wsgi_request, cache=cache)
+    return None if key is None else cache.get(key)
+
+
+def test_template_surrogate_keys():
+    assert get_template_surrogate_keys("terminusgps/home.html") == (
+        "terminusgps",
+        "terminusgps-home",
+        "terminusgps-layout",
+    )
+    assert get_template_surrogate_keys("terminusgps/home.html#main") == (
+        "terminusgps",
+        "terminusgps-home",
+    )
+
+
+def test_anonymous_response_is_shared(client, page_cache):
+    client.cookies["csrftoken"] = "a" * 32
+    response = client.get(reverse("home"))
+    assert "public" in response["Cache-Control"]
+    assert "Cookie" not in response.get("Vary", "")
+    assert response["Surrogate-Key"] == (
+        "terminusgps terminusgps-home terminusgps-layout"
+    )
+    assert get_cached_page(page_cache, response) is not None
+
+
+@pytest.mark.django_db
+def test_session_response_is_private(client, page_cache):
+    client.get(reverse("home"))
+    user = get_user_model().objects.create_user(username="cached")
+    client.force_login(user)
+    response = client.get(reverse("home"))
+    assert "private" in response["Cache-Control"]
+    assert b"Logout" in response.content
+
+
+def test_response_setting_cookie_is_private(client):
+    response = client.get(reverse("contact"))
+    assert "csrftoken" in response.cookies
+    assert "private" in response["Cache-Control"]
+
+
+def test_purge_surrogate_keys(client, page_cache):
+    home = client.get(reverse("home"))
+    faq = client.get(reverse("faq"))
+    assert purge_surrogate_keys(["terminusgps-home"]) == ["/"]
+    assert get_cached_page(page_cache, home) is None
+    assert get_cached_page(page_cache, faq) is not None
+    assert purge_surrogate_keys(["terminusgps-layout"]) == ["/", "/faq/"]
+    assert get_cached_page(page_cache, faq) is None
+
+
+def test_cache_hit_is_not_indexed_again(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        terminusgps.middleware,
+        "index_response",
+        lambda *args: calls.append(args) or index_response(*args),
+    )
+    client.get(reverse("home"))
+    client.get(reverse("home"))
+    assert len(calls) == 1
+
+
+def test_index_caps_cache_keys_per_path(client, page_cache, monkeypatch):
+    monkeypatch.setattr(
+        terminusgps.surrogate_keys, "MAX_INDEXED_CACHE_KEYS", 2
+    )
+    responses = [client.get(reverse("home"), {"page": n}) for n in range(3)]
+    index = page_cache.get(get_index_cache_key("terminusgps-home"))
+    assert index["/"] == [
+        get_cache_key(response.wsgi_request, cache=page_cache)
+        for response in responses[1:]
+    ]
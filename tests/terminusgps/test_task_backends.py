@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+from django.tasks import TaskResultStatus, task, task_backends
+
+seen_threads = []
+
+
+@task
+def record_thread() -> str:
+    seen_threads.append(threading.current_thread().name)
+    return "done"
+
+
+@pytest.fixture
+def thread_pool_backend(settings):
+    settings.TASKS = {
+        "default": {
+            "BACKEND": "terminusgps.task_backends.ThreadPoolBackend",
+            "QUEUES": ["default"],
+            "OPTIONS": {"MAX_WORKERS": 1},
+        }
+    }
+    backend = task_backends["default"]
+    yield backend
+    if backend._executor is not None:
+        backend._executor.shutdown(wait=True)
+
+
+def test_thread_pool_backend_runs_tasks_off_the_calling_thread(
+    thread_pool_backend,
+):
+    seen_threads.clear()
+    result = record_thread.enqueue()
+    thread_pool_backend.get_executor().shutdown(wait=True)
+    assert result.status == TaskResultStatus.SUCCESSFUL
+    assert result.return_value == "done"
+    assert seen_threads == ["tasks-default_0"]
+
+
+def test_thread_pool_backend_forgets_executor_after_fork(thread_pool_backend):
+    executor = thread_pool_backend.get_executor()
+    thread_pool_backend._forget_executor()
+    assert thread_pool_backend.get_executor() is not executor
@@ -0,0 +1,127 @@
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from terminusgps import throttling
+from terminusgps.decorators import throttle
+from terminusgps.middleware import ThrottleMiddleware
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throttling.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize(
+    "rate,expected",
+    [("5/m", (5, 60)), ("10/s", (10, 1)), ("2/hour", (2, 3600))],
+)
+def test_parse_rate(rate, expected):
+    assert throttling.parse_rate(rate) == expected
+
+
+@pytest.mark.parametrize("rate", ["5", "five/m", "5/w"])
+def test_parse_rate_invalid(rate):
+    with pytest.raises(ValueError):
+        throttling.parse_rate(rate)
+
+
+@pytest.mark.parametrize(
+    "proxy_count,expected", [(0, "10.0.0.1"), (1, "2.2.2.2"), (5, "1.1.1.1")]
+)
+def test_get_client_ip(settings, proxy_count, expected):
+    settings.THROTTLE_PROXY_COUNT = proxy_count
+    request = RequestFactory().get(
+        "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2"
+    )
+    assert throttling.get_client_ip(request) == expected
+
+
+def test_take_token_empties_and_refills_bucket(clock):
+    assert [throttling.take_token("bucket", 2, 60) for _ in range(2)] == [0, 0]
+    assert throttling.take_token("bucket", 2, 60) == pytest.approx(30)
+    clock[0] += 30
+    assert throttling.take_token("bucket", 2, 60) == 0
+    assert throttling.take_token("bucket", 2, 60) == pytest.approx(30)
+
+
+def test_take_token_buckets_are_independent(clock):
+    assert throttling.take_token("a", 1, 60) == 0
+    assert throttling.take_token("b", 1, 60) == 0
+    assert throttling.take_token("a", 1, 60) > 0
+
+
+def test_throttle_middleware_not_used_without_rate(settings):
+    settings.THROTTLE_RATE = None
+    with pytest.raises(MiddlewareNotUsed):
+        ThrottleMiddleware(lambda request: HttpResponse())
+
+
+def test_throttle_decorator_returns_429_with_retry_after(clock):
+    @throttle("test", "1/m", methods=["POST"])
+    def view(request):
+        return HttpResponse("ok")
+
+    factory = RequestFactory()
+    assert view(factory.post("/")).status_code == 200
+    assert view(factory.get("/")).status_code == 200
+    response = view(factory.post("/"))
+    assert response.status_code == 429
+    assert response["Retry-After"] == "60"
+    assert "no-store" in response["Cache-Control"]
+
+
+def test_throttle_decorator_key_function(clock):
+    @throttle("test", "1/m", key=lambda request, pk: f"unit:{pk}")
+    def view(request, pk):
+        return HttpResponse("ok")
+
+    factory = RequestFactory()
+    assert view(factory.get("/"), pk=1).status_code == 200
+    assert view(factory.get("/"), pk=2).status_code == 200
+    assert view(factory.get("/"), pk=1).status_code == 429
+
+
+def test_throttle_decorator_disabled(clock, settings):
+    settings.THROTTLE_ENABLED = False
+
+    @throttle("test", "1/m")
+    def view(request):
+        return HttpResponse("ok")
+
+    factory = RequestFactory()
+    assert view(factory.get("/")).status_code == 200
+    assert view(factory.get("/")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_contact_form_view_is_throttled(client, settings):
+    settings.TASKS = {
+        "default": {
+            "BACKEND": "django.tasks.backends.dummy.DummyBackend",
+            "QUEUES": ["default"],
+        }
+    }
+    data = {"name": "Tester", "email": "tester@example.com", "message": "Hi"}
+    url = reverse("contact form")
+    for _ in range(5):
+        assert client.post(url, data).status_code == 302
+    response = client.post(url, data)
+    assert response.status_code == 429
+    assert int(response["Retry-After"]) > 0
+    assert client.get(url).status_code == 200
@@ -0,0 +1,328 @@
+import dataclasses
+import functools
+import json
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+import terminusgps.wialon
+from terminusgps_installer.models import (
+    Employee,
+    InstallJob,
+    InstallJobStatus,
+    WialonResource,
+    WialonUnit,
+)
+
+BUDGETS_PATH = Path(__file__).with_name("view_budgets.json")
+UPDATE_BUDGETS = os.environ.get("UPDATE_VIEW_BUDGETS") == "1"
+"""Set ``UPDATE_VIEW_BUDGETS=1`` to record the measured numbers as the new baseline."""
+TIME_FACTOR = 3
+TIME_MARGIN_MS = 50
+"""Wall time may exceed its baseline by this factor, or by this margin for fast views."""
+RUNS = 3
+JOB_COUNT = 20
+UNITS_PER_JOB = 3
+COMMAND_COUNT = 5
+
+
+@dataclasses.dataclass
+class Seed:
+    user: object
+    employee: Employee
+    job: InstallJob
+    unit: WialonUnit
+
+
+@dataclasses.dataclass(frozen=True)
+class Case:
+    url_name: str
+    request: Callable
+    """Calls ``(client, seed, run)`` and returns the response, ``run`` numbers each call."""
+    status: int = 200
+    login: bool = False
+
+
+def get(url_name, **kwargs):
+    def request(client, seed, run):
+        args = [getattr(seed, attr).pk for attr in kwargs.values()]
+        return client.get(reverse(url_name, args=args))
+
+    return request
+
+
+def post_contact_form(client, seed, run):
+    return client.post(
+        reverse("contact form"),
+        {
+            "name": "Test User",
+            "email": f"test{run}@example.com",
+            "message": "Hello, I'd like a quote for 20 vehicles.",
+        },
+    )
+
+
+def post_new_job_form(client, seed, run):
+    data = {
+        "formset_data": {
+            "job": {"company": 1, "employee": seed.employee.pk},
+            "units": [
+                {"unit": {"imei": f"9{run:02}{n:05}", "mileage": 100}}
+                for n in range(UNITS_PER_JOB)
+            ],
+        }
+    }
+    return client.post(
+        reverse("installer:new job form"),
+        json.dumps(data),
+        content_type="application/json",
+    )
+
+
+def post_import_jobs(client, seed, run):
+    lines = ["company,employee,imei,vin,plate,mileage"] + [
+        f"Resource #{n % 3 + 1},{seed.user.username},8{run:02}{n:05},,,0"
+        for n in range(JOB_COUNT)
+    ]
+    upload = SimpleUploadedFile(
+        "jobs.csv", "\n".join(lines).encode(), content_type="text/csv"
+    )
+    return client.post(reverse("installer:import jobs"), {"file": upload})
+
+
+def post_execute_command(client, seed, run):
+    return client.post(
+        reverse("installer:execute command", args=[seed.unit.pk]),
+        {"command_name": "Command #1"},
+    )
+
+
+CASES = {
+    "home": Case("home", get("home")),
+    "about": Case("about", get("about")),
+    "terms": Case("terms", get("terms")),
+    "privacy": Case("privacy", get("privacy")),
+    "source code": Case("source code", get("source code"), status=301),
+    "contact": Case("contact", get("contact")),
+    "platform": Case("platform", get("platform"), status=301),
+    "cameras": Case("cameras", get("cameras"), status=301),
+    "features": Case("features", get("features")),
+    "faq": Case("faq", get("faq")),
+    "ios app": Case("ios app", get("ios app"), status=301),
+    "android app": Case("android app", get("android app"), status=301),
+    "contact form": Case("contact form", get("contact form")),
+    "contact form post": Case("contact form", post_contact_form, status=302),
+    "contact form success": Case(
+        "contact form success", get("contact form success")
+    ),
+    "installer:home": Case(
+        "installer:home", get("installer:home"), login=True
+    ),
+    "installer:job list": Case(
+        "installer:job list", get("installer:job list"), login=True
+    ),
+    "installer:new job form": Case(
+        "installer:new job form", get("installer:new job form"), login=True
+    ),
+    "installer:new job form post": Case(
+        "installer:new job form", post_new_job_form, login=True
+    ),
+    "installer:import jobs": Case(
+        "installer:import jobs", get("installer:import jobs"), login=True
+    ),
+    "installer:import jobs post": Case(
+        "installer:import jobs", post_import_jobs, login=True
+    ),
+    "installer:export jobs": Case(
+        "installer:export jobs", get("installer:export jobs"), login=True
+    ),
+    "installer:billing summary": Case(
+        "installer:billing summary",
+        get("installer:billing summary"),
+        login=True,
+    ),
+    "installer:job details": Case(
+        "installer:job details",
+        get("installer:job details", job_pk="job"),
+        login=True,
+    ),
+    "installer:execute command": Case(
+        "installer:execute command", post_execute_command, login=True
+    ),
+    "installer:command list": Case(
+        "installer:command list",
+        get("installer:command list", unit_pk="unit"),
+        login=True,
+    ),
+}
+
+
+@functools.cache
+def load_budgets() -> dict:
+    if not BUDGETS_PATH.exists():
+        return {}
+    return json.loads(BUDGETS_PATH.read_text())
+
+
+def get_url_names() -> set[str]:
+    site = get_resolver("terminusgps_site.urls").reverse_dict
+    installer = get_resolver("terminusgps_installer.urls").reverse_dict
+    return {name for name in site if isinstance(name, str)} | {
+        f"installer:{name}" for name in installer if isinstance(name, str)
+    }
+
+
+def clear_wialon_caches() -> None:
+    for value in vars(terminusgps.wialon).values():
+        if hasattr(value, "cache_clear"):
+            value.cache_clear()
+    WialonUnit.get_wialon_unit_id.cache_clear()
+    WialonUnit._get_wialon_unit_name.cache_clear()
+
+
+def measure(case: Case, client, seed: Seed, mock_api, run: int) -> dict:
+    clear_wialon_caches()
+    mock_api.reset_mock()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = case.request(client, seed, run)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == case.status
+    return {
+        "queries": len(queries),
+        "wialon_calls": len(mock_api.method_calls),
+        "time_ms": round(elapsed * 1000, 1),
+    }
+
+
+@pytest.fixture(scope="module")
+def measurements(request):
+    measurements = {}
+    yield measurements
+    if UPDATE_BUDGETS:
+        BUDGETS_PATH.write_text(
+            json.dumps(load_budgets() | measurements, indent=4, sort_keys=True)
+            + "\n"
+        )
+    plugins = request.config.pluginmanager
+    reporter = plugins.get_plugin("terminalreporter")
+    if reporter is None or not measurements:
+        return
+    baselines = load_budgets()
+    with plugins.get_plugin("capturemanager").global_and_fixture_disabled():
+        reporter.section("view budgets")
+        for name, measured in sorted(measurements.items()):
+            baseline = baselines.get(name, measured)
+            reporter.write_line(
+                f"{name:<32}"
+                + "".join(
+                    f" {key} {measured[key]:g} ({measured[key] - baseline[key]:+g})"
+                    for key in ("queries", "wialon_calls", "time_ms")
+                )
+            )
+
+
+@pytest.fixture
+def wialon(mock_api):
+    mock_api.core_search_items.return_value = {
+        "totalItemsCount": 1,
+        "items": [{"id": 1, "nm": "Unit #1"}],
+    }
+    mock_api.core_batch.side_effect = lambda **kwargs: [
+        {"totalItemsCount": 1, "items": [{"id": n, "nm": f"Unit #{n}"}]}
+        for n, _ in enumerate(kwargs["params"], start=1)
+    ]
+    mock_api.unit_get_command_definition_data.return_value = [
+        {"id": n, "n": f"Command #{n}", "c": "custom_msg", "l": "tcp"}
+        for n in range(1, COMMAND_COUNT + 1)
+    ]
+    mock_api.token_update.return_value = {"h": "abc123"}
+    mock_api.unit_exec_cmd.return_value = {}
+    return mock_api
+
+
+@pytest.fixture
+def seed(credentials):
+    user = get_user_model().objects.create_superuser(**credentials)
+    employee = Employee.objects.create(user=user)
+    other_employee = Employee.objects.create(
+        user=get_user_model().objects.create_user(username="other")
+    )
+    resources = [
+        WialonResource.objects.create(id=n, name=f"Resource #{n}")
+        for n in range(1, 4)
+    ]
+    jobs = []
+    for n in range(JOB_COUNT):
+        job = InstallJob.objects.create(
+            company=resources[n % len(resources)],
+            employee=employee if n % 4 else other_employee,
+        )
+        WialonUnit.objects.bulk_create(
+            WialonUnit(
+                job=job,
+                imei=f"1{n:03}{u:02}",
+                name=f"Unit #{n}-{u}",
+                vin="JTHBA30G065155212",
+                plate=f"LYL{n:03}{u}",
+            )
+            for u in range(UNITS_PER_JOB)
+        )
+        jobs.append(job)
+    InstallJob.objects.filter(pk__in=[job.pk for job in jobs[::3]]).update(
+        status=InstallJobStatus.DONE
+    )
+    job = jobs[1]
+    return Seed(user=user, employee=employee, job=job, unit=job.units.first())
+
+
+def test_every_view_has_a_budget():
+    assert get_url_names() <= {case.url_name for case in CASES.values()}
+
+
+@pytest.mark.skipif(UPDATE_BUDGETS, reason="Recording new budgets")
+def test_every_case_has_a_baseline():
+    assert set(CASES) <= set(load_budgets())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", list(CASES))
+def test_view_within_budget(client, seed, wialon, measurements, name):
+    case = CASES[name]
+    if case.login:
+        client.force_login(seed.user)
+    # The first request loads templates and fills per-process caches
+    measure(case, client, seed, wialon, 0)
+    runs = [
+        measure(case, client, seed, wialon, run) for run in range(1, RUNS + 1)
+    ]
+    measured = runs[0] | {"time_ms": min(run["time_ms"] for run in runs)}
+    measurements[name] = measured
+    if UPDATE_BUDGETS:
+        return
+    budget = load_budgets().get(name)
+    assert budget is not None, (
+        f"No budget for '{name}', run with UPDATE_VIEW_BUDGETS=1"
+    )
+    assert measured["queries"] <= budget["queries"], (
+        f"'{name}' made {measured['queries']} queries, budget is {budget['queries']}"
+    )
+    assert measured["wialon_calls"] <= budget["wialon_calls"], (
+        f"'{name}' made {measured['wialon_calls']} Wialon calls, budget is {budget['wialon_calls']}"
+    )
+    max_time = max(
+        budget["time_ms"] * TIME_FACTOR, budget["time_ms"] + TIME_MARGIN_MS
+    )
+    assert measured["time_ms"] <= max_time, (
+        f"'{name}' took {measured['time_ms']}ms, budget is {max_time:g}ms"
+    )
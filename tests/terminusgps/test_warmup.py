@@ -0,0 +1,72 @@
+import pytest
+from django.contrib.auth import get_user_model
+from wialon.api import WialonError
+
+import terminusgps.warmup
+from terminusgps.warmup import warm_templates, warm_up
+from terminusgps_installer.models import (
+    Employee,
+    InstallJob,
+    InstallJobStatus,
+    WialonResource,
+    WialonUnit,
+)
+
+
+@pytest.fixture
+def job(credentials):
+    user = get_user_model().objects.create_user(**credentials)
+    employee = Employee.objects.create(user=user)
+    company = WialonResource.objects.create(id=1, name="Resource #1")
+    return InstallJob.objects.create(company=company, employee=employee)
+
+
+def test_warm_templates():
+    assert warm_templates() > 0
+
+
+@pytest.mark.django_db
+def test_warm_up_fetches_wialon_commands(job, monkeypatch):
+    done_job = InstallJob.objects.create(
+        company=job.company, employee=job.employee
+    )
+    InstallJob.objects.filter(pk=done_job.pk).update(
+        status=InstallJobStatus.DONE
+    )
+    WialonUnit.objects.create(job=job, imei="111", name="Unit #1")
+    WialonUnit.objects.create(job=job, imei="222", name="Unit #2")
+    WialonUnit.objects.create(job=done_job, imei="333", name="Unit #3")
+    fetched = []
+
+    def get_wialon_commands(self, sid=None):
+        fetched.append(self.imei)
+        if self.imei == "222":
+            raise WialonError(-1, "Not found")
+        return []
+
+    monkeypatch.setattr(WialonUnit, "get_wialon_commands", get_wialon_commands)
+    # Closing the test's connection would end its transaction
+    monkeypatch.setattr(
+        terminusgps.warmup.connections, "close_all", lambda: None
+    )
+    warm_up()
+    assert sorted(fetched) == ["111", "222"]
+
+
+@pytest.mark.django_db
+def test_warm_up_stops_when_wialon_is_unreachable(job, monkeypatch):
+    for n in range(30):
+        WialonUnit.objects.create(job=job, imei=f"{n:03}", name=f"Unit #{n}")
+    fetched = []
+
+    def get_wialon_commands(self, sid=None):
+        fetched.append(self.imei)
+        # python-wialon raises code 0 for connection and HTTP errors
+        raise WialonError(0, "Connection refused")
+
+    monkeypatch.setattr(WialonUnit, "get_wialon_commands", get_wialon_commands)
+    monkeypatch.setattr(
+        terminusgps.warmup.connections, "close_all", lambda: None
+    )
+    warm_up()
+    assert len(fetched) == 1
@@ -1,3 +1,7 @@
+import threading
+import unittest.mock
+import urllib.request
+
 import pytest
 from django.conf import settings
 from wialon.api import WialonError
@@ -20,11 +24,15 @@ from terminusgps.wialon import (
     get_resources,
     get_unit_by_id,
     get_unit_by_imei,
+    get_units_by_imeis,
     get_vin_info,
+    get_wialon_api,
     session_is_active,
     update_name,
     update_vin,
+    wialon_timeout,
 )
+from terminusgps.wialon_standin import WialonStandInServer
 
 
 @pytest.fixture(autouse=True)
@@ -46,6 +54,16 @@ def test_wialonsession_explicit_token_overrides_wialon_token_setting(mock_api):
     assert session._token == expected_token
 
 
+def test_wialonsession_uses_wialon_api_url_setting(settings):
+    """Fails if a Wialon session doesn't call the API at :py:obj:`~django.conf.settings.WIALON_API_URL`."""
+    settings.WIALON_API_URL = "http://127.0.0.1:8001"
+    with unittest.mock.patch("wialon.api.Wialon") as mock_wialon_cls:
+        WialonSession()
+    mock_wialon_cls.assert_called_once_with(
+        scheme="http", host="127.0.0.1", port=8001, sid=None
+    )
+
+
 def test_wialonsession_login(mock_api):
     """Fails if :py:meth:`login` doesn't properly set required attributes post login."""
     session = WialonSession()
@@ -136,6 +154,28 @@ def test_get_unit_by_id_reraises_wialonerror(mock_api):
         get_unit_by_id(session, 1)
 
 
+def test_get_units_by_imeis(mock_api):
+    """Fails if :py:func:`get_units_by_imeis` doesn't key matched units by IMEI # and omit unmatched IMEI #s."""
+    mock_api.core_batch.return_value = [
+        {"totalItemsCount": 1, "items": [{"id": 1, "nm": "Unit #1"}]},
+        {"totalItemsCount": 0, "items": []},
+    ]
+    session = WialonSession()
+    session.login()
+    result = get_units_by_imeis(session, ["111", "222"])
+    assert result == {"111": {"id": 1, "nm": "Unit #1"}}
+    assert mock_api.core_batch.call_count == 1
+    assert len(mock_api.core_batch.call_args.kwargs["params"]) == 2
+
+
+def test_get_units_by_imeis_no_imeis_skips_wialon_call(mock_api):
+    """Fails if :py:func:`get_units_by_imeis` calls the Wialon API without any IMEI #s."""
+    session = WialonSession()
+    session.login()
+    assert get_units_by_imeis(session, []) == {}
+    mock_api.core_batch.assert_not_called()
+
+
 def test_get_resources(mock_api):
     """Fails if :py:func:`get_resources` doesn't return the expected list of Wialon resources."""
     mock_api.core_search_items.return_value = {
@@ -575,3 +615,17 @@ def test_get_command_name_with_nonexistant_command(mock_api):
     session.login()
     result = get_command_name(session, 1, 1)
     assert result is None
+
+
+def test_wialon_timeout_times_out_requests():
+    server = WialonStandInServer(("127.0.0.1", 0), latency=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    request = urllib.request.Request(
+        server.url + "/wialon/ajax.html", data=b"svc=core/logout"
+    )
+    try:
+        with wialon_timeout(0.1), pytest.raises(TimeoutError):
+            get_wialon_api().urlopen(request)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,115 @@
+import pytest
+from django.core.cache import cache
+from wialon.api import WialonError
+
+from terminusgps import throttling, wialon_scheduler
+from terminusgps.wialon_scheduler import (
+    SHED_ERROR_CODE,
+    Priority,
+    get_limits,
+    schedule_requests,
+    scheduled,
+    wialon_priority,
+)
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    settings.WIALON_REQUESTS_PER_SECOND = 2
+    settings.WIALON_MAX_CONCURRENT_REQUESTS = 2
+    settings.WIALON_BACKGROUND_RESERVE = 0.5
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def no_waiting(monkeypatch):
+    monkeypatch.setattr(throttling.time, "time", lambda: 1000.0)
+    monkeypatch.setattr(
+        wialon_scheduler,
+        "MAX_WAIT",
+        {Priority.INTERACTIVE: 0, Priority.BACKGROUND: 0},
+    )
+
+
+def test_get_limits_reserves_capacity_for_interactive_calls():
+    assert get_limits(Priority.INTERACTIVE) == (2, 0, 2)
+    assert get_limits(Priority.BACKGROUND) == (2, 1.0, 1)
+
+
+def test_wialon_priority_is_restored():
+    with wialon_priority(Priority.BACKGROUND):
+        assert wialon_scheduler._priority.get() == Priority.BACKGROUND
+    assert wialon_scheduler._priority.get() == Priority.INTERACTIVE
+
+
+def test_scheduled_sheds_background_calls_near_the_rate_limit(no_waiting):
+    with wialon_priority(Priority.BACKGROUND):
+        with scheduled("core/search_items"):
+            pass
+        with pytest.raises(WialonError) as error:
+            with scheduled("core/search_items"):
+                pass
+    assert error.value._code == SHED_ERROR_CODE
+    with scheduled("unit/exec_cmd"):
+        pass
+
+
+def test_scheduled_sheds_interactive_calls_at_the_rate_limit(no_waiting):
+    for _ in range(2):
+        with scheduled("unit/exec_cmd"):
+            pass
+    with pytest.raises(WialonError):
+        with scheduled("unit/exec_cmd"):
+            pass
+
+
+def test_scheduled_limits_concurrent_calls(no_waiting, settings):
+    settings.WIALON_REQUESTS_PER_SECOND = 10
+    with scheduled("core/search_items"):
+        with wialon_priority(Priority.BACKGROUND):
+            with pytest.raises(WialonError):
+                with scheduled("core/search_items"):
+                    pass
+        with scheduled("unit/exec_cmd"):
+            with pytest.raises(WialonError):
+                with scheduled("unit/exec_cmd"):
+                    pass
+    with scheduled("unit/exec_cmd"):
+        pass
+
+
+def test_scheduled_defers_until_a_token_is_available(monkeypatch):
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(throttling.time, "time", lambda: now[0])
+    monkeypatch.setattr(wialon_scheduler.time, "sleep", sleep)
+    for _ in range(3):
+        with scheduled("core/search_items"):
+            pass
+    assert sleeps == [pytest.approx(0.5)]
+
+
+def test_schedule_requests_wraps_request_method(no_waiting, settings):
+    settings.WIALON_MAX_CONCURRENT_REQUESTS = 1
+    calls = []
+
+    def request(action_name, url, params):
+        calls.append(action_name)
+        with pytest.raises(WialonError):
+            with scheduled("nested"):
+                pass
+        return {}
+
+    wrapped = schedule_requests(request)
+    assert wrapped("core/search_items", "https://example.com", {}) == {}
+    assert calls == ["core/search_items"]
@@ -0,0 +1,210 @@
+from unittest.mock import MagicMock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.tasks import default_task_backend
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from terminusgps.stale_cache import set_cached_value
+
+from terminusgps_installer.conditions import cache_command_list_digest
+from terminusgps_installer.models import (
+    Employee,
+    InstallJob,
+    InstallJobStatus,
+    WialonResource,
+    WialonUnit,
+    WialonUnitQuerySet,
+)
+
+
+@pytest.fixture(autouse=True)
+def user(credentials):
+    yield get_user_model().objects.create_user(**credentials)
+
+
+@pytest.fixture(autouse=True)
+def employee(user):
+    return Employee.objects.create(user=user)
+
+
+@pytest.fixture
+def job(employee):
+    company = WialonResource.objects.create(id=1, name="Resource #1")
+    return InstallJob.objects.create(company=company, employee=employee)
+
+
+@pytest.fixture
+def unit(job):
+    return WialonUnit.objects.create(job=job, imei="111", name="Unit #1")
+
+
+@pytest.fixture
+def client(client, user):
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def with_wialon_commands(monkeypatch):
+    mock = MagicMock(side_effect=lambda qs, sid=None: [(u, []) for u in qs])
+    monkeypatch.setattr(
+        WialonUnitQuerySet,
+        "with_wialon_commands",
+        lambda self, sid=None: mock(self, sid),
+    )
+    return mock
+
+
+@pytest.mark.django_db
+def test_job_list_not_modified(client, job):
+    url = reverse("installer:job list")
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.has_header("Last-Modified")
+    response = client.get(url, headers={"If-None-Match": response["ETag"]})
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_job_list_partial_and_full_etags_differ(client, job):
+    url = reverse("installer:job list")
+    full = client.get(url)
+    partial = client.get(url, headers={"HX-Request": "true"})
+    assert full["ETag"] != partial["ETag"]
+    response = client.get(
+        url, headers={"HX-Request": "true", "If-None-Match": full["ETag"]}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_job_list_modified_after_queryset_update(client, job):
+    url = reverse("installer:job list")
+    etag = client.get(url)["ETag"]
+    InstallJob.objects.filter(pk=job.pk).update(employee=job.employee)
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_job_list_modified_after_job_done(client, job):
+    url = reverse("installer:job list")
+    etag = client.get(url)["ETag"]
+    InstallJob.objects.filter(pk=job.pk).update(status=InstallJobStatus.DONE)
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_job_details_not_modified_skips_wialon(
+    client, unit, with_wialon_commands
+):
+    url = reverse("installer:job details", args=[unit.job.pk])
+    response = client.get(url)
+    b"".join(response.streaming_content)
+    assert with_wialon_commands.call_count == 1
+    response = client.get(url, headers={"If-None-Match": response["ETag"]})
+    assert response.status_code == 304
+    assert with_wialon_commands.call_count == 1
+
+
+@pytest.mark.django_db
+def test_job_details_modified_after_unit_change(
+    client, unit, with_wialon_commands
+):
+    url = reverse("installer:job details", args=[unit.job.pk])
+    etag = client.get(url)["ETag"]
+    unit.vin = "1HGCM82633A004352"
+    unit.save()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_job_details_modified_after_locator_refresh(
+    client, unit, with_wialon_commands, mock_api
+):
+    mock_api.core_search_items.return_value = {
+        "totalItemsCount": 1,
+        "items": [{"id": 1, "nm": "Unit #1"}],
+    }
+    mock_api.token_update.return_value = {"h": "abc123"}
+    url = reverse("installer:job details", args=[unit.job.pk])
+    etag = client.get(url)["ETag"]
+    unit.refresh_locator_url_and_save()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_job_details_state_queried_once_per_request(client, unit):
+    url = reverse("installer:job details", args=[unit.job.pk])
+    etag = client.get(url)["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert sum("MAX(" in query["sql"] for query in queries) == 1
+
+
+@pytest.mark.django_db
+def test_command_list_not_modified_skips_wialon(
+    client, unit, monkeypatch, settings
+):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    get_wialon_commands = MagicMock(
+        return_value=[{"n": "Reboot", "c": "custom_msg"}]
+    )
+    monkeypatch.setattr(
+        WialonUnit,
+        "get_wialon_commands",
+        lambda self, sid=None: get_wialon_commands(self, sid),
+    )
+    url = reverse("installer:command list", args=[unit.pk])
+    response = client.get(url, headers={"HX-Request": "true"})
+    assert response.status_code == 200
+    assert get_wialon_commands.call_count == 1
+    response = client.get(
+        url, headers={"HX-Request": "true", "If-None-Match": response["ETag"]}
+    )
+    assert response.status_code == 304
+    assert get_wialon_commands.call_count == 1
+
+
+@pytest.mark.django_db
+def test_command_list_serves_stale_commands_while_refreshing(
+    client, unit, monkeypatch, settings
+):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    settings.TASKS = {
+        "default": {
+            "BACKEND": "django.tasks.backends.dummy.DummyBackend",
+            "QUEUES": ["default"],
+        }
+    }
+    cache.clear()
+    cache_command_list_digest(unit.pk, [{"n": "Reboot", "c": "custom_msg"}])
+    set_cached_value(
+        unit.get_wialon_commands_cache_key(),
+        [{"n": "Reboot", "c": "custom_msg"}],
+        3600,
+    )
+    monkeypatch.setattr(WialonUnit, "wialon_commands_max_age", -1)
+    get_wialon_commands = MagicMock(side_effect=AssertionError)
+    monkeypatch.setattr(WialonUnit, "get_wialon_commands", get_wialon_commands)
+    url = reverse("installer:command list", args=[unit.pk])
+    response = client.get(url, headers={"HX-Request": "true"})
+    assert response.status_code == 200
+    assert b"Reboot" in response.content
+    assert b"may be outdated" in response.content
+    assert not response.has_header("ETag")
+    assert "max-age=0" in response["Cache-Control"]
+    assert len(default_task_backend.results) == 1
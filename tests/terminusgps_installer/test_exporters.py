@@ -0,0 +1,71 @@
+import csv
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from terminusgps_installer.exporters import (
+    get_export_queryset,
+    iter_export_csv,
+)
+from terminusgps_installer.models import (
+    Employee,
+    InstallJob,
+    InstallJobStatus,
+    WialonResource,
+    WialonUnit,
+)
+
+
+@pytest.fixture(autouse=True)
+def user(credentials):
+    yield get_user_model().objects.create_user(**credentials)
+
+
+@pytest.fixture(autouse=True)
+def employee(user):
+    return Employee.objects.create(user=user)
+
+
+@pytest.fixture(autouse=True)
+def resource():
+    return WialonResource.objects.create(id=1, name="Resource #1")
+
+
+@pytest.fixture
+def install_jobs(employee, resource):
+    needs_billing = InstallJob.objects.create(
+        company=resource,
+        employee=employee,
+        status=InstallJobStatus.NEEDS_BILLING,
+    )
+    done = InstallJob.objects.create(
+        company=resource, employee=employee, status=InstallJobStatus.DONE
+    )
+    WialonUnit.objects.create(job=needs_billing, imei="111", name="Unit #1")
+    WialonUnit.objects.create(job=needs_billing, imei="222", name="Unit #2")
+    return needs_billing, done
+
+
+@pytest.mark.django_db
+def test_iter_export_csv_one_row_per_unit(install_jobs):
+    queryset = get_export_queryset(InstallJobStatus.NEEDS_BILLING)
+    rows = list(csv.DictReader(iter_export_csv(queryset)))
+    assert [row["imei"] for row in rows] == ["111", "222"]
+    assert {row["company"] for row in rows} == {"Resource #1"}
+    assert {row["employee"] for row in rows} == {"testuser"}
+
+
+@pytest.mark.django_db
+def test_iter_export_csv_job_without_units_has_empty_unit_columns(
+    install_jobs,
+):
+    queryset = get_export_queryset(InstallJobStatus.DONE)
+    rows = list(csv.DictReader(iter_export_csv(queryset)))
+    assert len(rows) == 1
+    assert rows[0]["job"] == str(install_jobs[1].pk)
+    assert rows[0]["imei"] == ""
+
+
+@pytest.mark.django_db
+def test_get_export_queryset_without_status_exports_all_jobs(install_jobs):
+    assert get_export_queryset(None).count() == 3
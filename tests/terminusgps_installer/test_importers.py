@@ -0,0 +1,137 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.urls import reverse
+
+from terminusgps_installer.importers import import_jobs_from_csv
+from terminusgps_installer.models import (
+    Employee,
+    InstallJob,
+    WialonResource,
+    WialonUnit,
+)
+
+
+@pytest.fixture(autouse=True)
+def user(credentials):
+    yield get_user_model().objects.create_user(**credentials)
+
+
+@pytest.fixture(autouse=True)
+def employee(user):
+    return Employee.objects.create(user=user)
+
+
+@pytest.fixture(autouse=True)
+def resource():
+    return WialonResource.objects.create(id=1, name="Resource #1")
+
+
+@pytest.fixture
+def wialon_units(mock_api):
+    def core_batch(**kwargs):
+        return [
+            {
+                "totalItemsCount": 1,
+                "items": [{"id": 1, "nm": f"Unit {mask.removeprefix('=')}"}],
+            }
+            if mask.removeprefix("=").startswith("1")
+            else {"totalItemsCount": 0, "items": []}
+            for mask in (
+                call["params"]["spec"]["propValueMask"]
+                for call in kwargs["params"]
+            )
+        ]
+
+    mock_api.core_batch.side_effect = core_batch
+    return mock_api
+
+
+@pytest.mark.django_db
+def test_import_jobs_from_csv_creates_one_job_per_company_and_employee(
+    wialon_units,
+):
+    lines = [
+        "company,employee,imei,vin,plate,mileage\n",
+        "1,testuser,111,JTHBA30G065155212,LYL1825,100\n",
+        "Resource #1,testuser,112,,,\n",
+    ]
+    report = import_jobs_from_csv(lines)
+    assert report.ok
+    assert report.rows == 2
+    assert report.jobs_created == 1
+    assert report.units_created == 2
+    job = InstallJob.objects.get()
+    assert set(job.units.values_list("imei", flat=True)) == {"111", "112"}
+    assert WialonUnit.objects.get(imei="111").name == "Unit 111"
+    assert WialonUnit.objects.get(imei="111").mileage == 100
+
+
+@pytest.mark.django_db
+def test_import_jobs_from_csv_reports_row_errors(wialon_units):
+    lines = [
+        "company,employee,imei,vin,plate,mileage\n",
+        "1,testuser,111,,,\n",
+        "2,testuser,113,,,\n",
+        "1,nobody,114,,,\n",
+        "1,testuser,abc,,,\n",
+        "1,testuser,111,,,\n",
+        "1,testuser,222,,,\n",
+        "1,testuser,115,,,lots\n",
+    ]
+    report = import_jobs_from_csv(lines)
+    assert report.units_created == 1
+    assert [error.line for error in report.errors] == [3, 4, 5, 6, 8, 7]
+
+
+@pytest.mark.django_db
+def test_import_jobs_from_csv_skips_existing_imeis(wialon_units):
+    lines = ["company,employee,imei\n", "1,testuser,111\n"]
+    import_jobs_from_csv(lines)
+    report = import_jobs_from_csv(lines)
+    assert report.units_created == 0
+    assert report.jobs_created == 0
+    assert report.errors[0].line == 2
+
+
+@pytest.mark.django_db
+def test_import_jobs_from_csv_batches_wialon_calls(wialon_units):
+    lines = ["company,employee,imei\n"] + [
+        f"1,testuser,1{i:04}\n" for i in range(25)
+    ]
+    report = import_jobs_from_csv(lines, chunk_size=10)
+    assert report.units_created == 25
+    assert wialon_units.core_batch.call_count == 3
+
+
+@pytest.mark.django_db
+def test_import_jobs_from_csv_missing_columns_raises_valueerror(mock_api):
+    with pytest.raises(ValueError):
+        import_jobs_from_csv(["company,imei\n", "1,111\n"])
+
+
+@pytest.mark.django_db
+def test_import_jobs_from_csv_accepts_imei_after_invalid_row(wialon_units):
+    lines = [
+        "company,employee,imei,vin,plate,mileage\n",
+        "1,testuser,111,,,lots\n",
+        "1,testuser,111,,,100\n",
+    ]
+    report = import_jobs_from_csv(lines)
+    assert report.units_created == 1
+    assert [error.line for error in report.errors] == [2]
+
+
+@pytest.mark.django_db
+def test_import_jobs_view_requires_add_installjob_permission(
+    client, user, wialon_units
+):
+    client.force_login(user)
+    url = reverse("installer:import jobs")
+    assert client.get(url).status_code == 403
+    user.user_permissions.add(
+        Permission.objects.get(codename="add_installjob")
+    )
+    user = get_user_model().objects.get(pk=user.pk)
+    client.force_login(user)
+    assert client.get(url).status_code == 200
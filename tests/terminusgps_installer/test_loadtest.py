@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from terminusgps.wialon_standin import WialonStandInServer
+from terminusgps_installer.loadtest import (
+    StepStats,
+    get_installer_usernames,
+    run_load_test,
+)
+from terminusgps_installer.models import (
+    Employee,
+    InstallJob,
+    WialonResource,
+    WialonUnit,
+)
+
+
+@pytest.fixture
+def wialon_standin(settings):
+    server = WialonStandInServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.WIALON_API_URL = server.url
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def employee(credentials):
+    user = get_user_model().objects.create_user(**credentials)
+    WialonResource.objects.create(id=1, name="Resource #1")
+    return Employee.objects.create(user=user)
+
+
+def test_step_stats_percentile():
+    stats = StepStats(latencies=[n / 1000 for n in range(100, 0, -1)])
+    assert stats.percentile(50) == 0.05
+    assert stats.percentile(99) == 0.099
+    assert StepStats().percentile(95) == 0
+
+
+def test_get_installer_usernames():
+    assert get_installer_usernames("installer{n}", 3) == [
+        "installer1",
+        "installer2",
+        "installer3",
+    ]
+    assert get_installer_usernames("installer", 2) == [
+        "installer",
+        "installer",
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_load_test_completes_installer_workflows(
+    live_server, wialon_standin, employee, credentials
+):
+    # One installer, the in-memory test database locks on concurrent writes
+    report = run_load_test(
+        live_server.url, **credentials, concurrency=1, iterations=4, units=2
+    )
+    assert report.workflows == 4
+    assert report.failed_workflows == 0
+    assert report.steps["login"].count == 1
+    assert report.steps["new job"].count == 4
+    assert report.steps["execute command"].count == 8
+    assert not any(stats.errors for stats in report.steps.values())
+    assert InstallJob.objects.count() == 4
+    assert WialonUnit.objects.exclude(locator_url="").count() == 8
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_load_test_invalid_credentials_fail_every_workflow(
+    live_server, wialon_standin, employee, credentials
+):
+    report = run_load_test(
+        live_server.url,
+        credentials["username"],
+        "wrong_password",
+        concurrency=2,
+        iterations=3,
+    )
+    assert report.workflows == 6
+    assert report.failed_workflows == 6
+    assert report.steps["login"].errors == {"Invalid credentials": 2}
+    assert report.steps["new job"].count == 0
@@ -1,10 +1,16 @@
+import datetime
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import NotSupportedError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 
 from terminusgps_installer.models import (
+    BillingSummary,
     Employee,
     InstallJob,
     InstallJobStatus,
+    InstallJobStatusChange,
     WialonResource,
     WialonUnit,
 )
@@ -157,3 +163,174 @@ def test_wialonunit_refresh_locator_url(mock_api, install_jobs):
         unit.locator_url
         == "https://hosting.terminusgps.com/locator/index.html?t=locator_token"
     )
+
+
+@pytest.mark.django_db
+def test_billingsummary_refreshed_when_unit_created(
+    install_jobs, django_capture_on_commit_callbacks
+):
+    job = InstallJob.objects.get(pk=2)
+    with django_capture_on_commit_callbacks(execute=True):
+        WialonUnit.objects.create(job=job, imei="111")
+        WialonUnit.objects.create(job=job, imei="222")
+    summary = BillingSummary.objects.get(status=InstallJobStatus.NEEDS_BILLING)
+    assert summary.job_count == 1
+    assert summary.unit_count == 2
+
+
+@pytest.mark.django_db
+def test_billingsummary_refreshed_when_job_status_changes(
+    install_jobs, django_capture_on_commit_callbacks
+):
+    job = InstallJob.objects.get(pk=2)
+    with django_capture_on_commit_callbacks(execute=True):
+        WialonUnit.objects.create(job=job, imei="111")
+    with django_capture_on_commit_callbacks(execute=True):
+        job.status = InstallJobStatus.DONE
+        job.save(update_fields=["status"])
+    summary = BillingSummary.objects.get()
+    assert summary.status == InstallJobStatus.DONE
+    assert summary.job_count == 2
+    assert summary.unit_count == 1
+
+
+@pytest.mark.django_db
+def test_billingsummary_rebuild(install_jobs):
+    WialonUnit.objects.create(job=install_jobs[0], imei="111")
+    BillingSummary.objects.rebuild()
+    assert set(
+        BillingSummary.objects.values_list("status", "job_count", "unit_count")
+    ) == {
+        (InstallJobStatus.DONE, 1, 1),
+        (InstallJobStatus.NEEDS_BILLING, 1, 0),
+    }
+
+
+@pytest.mark.django_db
+def test_installjobstatuschange_recorded_on_save(
+    employee, resource, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        job = InstallJob.objects.create(company=resource, employee=employee)
+        job.status = InstallJobStatus.DONE
+        job.save()
+        job.save()
+    assert list(
+        job.status_changes.values_list("from_status", "to_status")
+    ) == [
+        ("", InstallJobStatus.NEEDS_BILLING),
+        (InstallJobStatus.NEEDS_BILLING, InstallJobStatus.DONE),
+    ]
+
+
+@pytest.mark.django_db
+def test_installjobstatuschange_recorded_on_queryset_update(
+    employee, resource, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        job = InstallJob.objects.create(company=resource, employee=employee)
+        InstallJob.objects.create(
+            company=resource, employee=employee, status=InstallJobStatus.DONE
+        )
+        InstallJob.objects.update(status=InstallJobStatus.DONE)
+    changes = InstallJobStatusChange.objects.filter(
+        from_status=InstallJobStatus.NEEDS_BILLING
+    )
+    assert list(changes.values_list("job_id", flat=True)) == [job.pk]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_installjobstatuschange_batched_per_transaction(employee, resource):
+    jobs = InstallJob.objects.bulk_create(
+        InstallJob(company=resource, employee=employee) for _ in range(3)
+    )
+    table = InstallJobStatusChange._meta.db_table
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            for job in InstallJob.objects.filter(pk__in=[j.pk for j in jobs]):
+                job.status = InstallJobStatus.DONE
+                job.save(update_fields=["status"])
+            assert not InstallJobStatusChange.objects.filter(
+                to_status=InstallJobStatus.DONE
+            ).exists()
+    inserts = [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith(f'INSERT INTO "{table}"')
+    ]
+    assert len(inserts) == 1
+    assert (
+        InstallJobStatusChange.objects.filter(
+            to_status=InstallJobStatus.DONE
+        ).count()
+        == 3
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_installjobstatuschange_discarded_with_rolled_back_savepoint(
+    employee, resource
+):
+    job = InstallJob.objects.create(company=resource, employee=employee)
+    with transaction.atomic():
+        other_job = InstallJob.objects.create(
+            company=resource, employee=employee
+        )
+        try:
+            with transaction.atomic():
+                InstallJob.objects.filter(pk=job.pk).update(
+                    status=InstallJobStatus.DONE
+                )
+                raise RuntimeError
+        except RuntimeError:
+            pass
+    assert list(
+        job.status_changes.values_list("from_status", "to_status")
+    ) == [("", InstallJobStatus.NEEDS_BILLING)]
+    assert other_job.status_changes.count() == 1
+
+
+@pytest.mark.django_db
+def test_installjobstatuschange_is_append_only(
+    employee, resource, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        job = InstallJob.objects.create(company=resource, employee=employee)
+    change = job.status_changes.get()
+    with pytest.raises(NotSupportedError):
+        change.save()
+    with pytest.raises(NotSupportedError):
+        change.delete()
+    with pytest.raises(NotSupportedError):
+        job.status_changes.update(to_status=InstallJobStatus.DONE)
+
+
+@pytest.mark.django_db
+def test_installjob_average_hours_to_status(employee, resource):
+    job = InstallJob.objects.create(company=resource, employee=employee)
+    InstallJobStatusChange.objects.bulk_create(
+        [
+            InstallJobStatusChange(
+                job=job,
+                from_status=InstallJobStatus.NEEDS_BILLING,
+                to_status=InstallJobStatus.DONE,
+                changed_at=job.crt_date + datetime.timedelta(hours=6),
+            ),
+            InstallJobStatusChange(
+                job=job,
+                from_status=InstallJobStatus.NEEDS_BILLING,
+                to_status=InstallJobStatus.DONE,
+                changed_at=job.crt_date + datetime.timedelta(hours=30),
+            ),
+        ]
+    )
+    InstallJob.objects.create(company=resource, employee=employee)
+    result = InstallJob.objects.average_hours_to_status(InstallJobStatus.DONE)
+    assert result == [
+        {
+            "employee_id": employee.pk,
+            "employee": "testuser",
+            "jobs": 1,
+            "average_hours": 6.0,
+        }
+    ]
@@ -151,3 +151,16 @@ def test_new_job_form_reset_button(live_server, credentials, mock_api):
         expect(page.get_by_label("Vin:")).to_have_value("")
         expect(page.get_by_label("Plate:")).to_have_value("")
         browser.close()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "headers",
+    [{}, {"HX-Request": "true"}, {"HX-Request": "true", "HX-Boosted": "true"}],
+)
+def test_new_job_form_loads_split_formset_bundle(client, user, headers):
+    client.force_login(user)
+    response = client.get(reverse("installer:new job form"), headers=headers)
+    assert b"formset/js/django-formset.js" in response.content
+    assert b"django-formset.monolith.js" not in response.content
+    assert reverse("javascript-catalog").encode() in response.content
@@ -0,0 +1,70 @@
+import pathlib
+import shutil
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.management import CommandError, call_command
+
+from terminusgps_site.critical_css import STYLESHEET, get_critical_css_name
+
+
+class MatchingStorage(StaticFilesStorage):
+    """Reports every file named ``unchanged.css`` as already uploaded."""
+
+    def file_matches(self, name, source_storage, source_path):
+        return name == "unchanged.css"
+
+
+@pytest.fixture
+def static_dirs(tmp_path, settings):
+    source = tmp_path / "source"
+    css = pathlib.Path(django_settings.STATICFILES_DIRS[0]) / "terminusgps/css"
+    shutil.copytree(css, source / "terminusgps/css")
+    (source / "unchanged.css").write_text("body { color: red; }")
+    (source / "changed.css").write_text("body { color: blue; }")
+    settings.STATICFILES_DIRS = [source]
+    settings.STATIC_ROOT = tmp_path / "static"
+    return source, tmp_path / "static"
+
+
+def test_collectstatic_skips_matching_files(static_dirs, settings):
+    _, static_root = static_dirs
+    settings.STORAGES = settings.STORAGES | {
+        "staticfiles": {
+            "BACKEND": "tests.terminusgps_site.test_collectstatic.MatchingStorage"
+        }
+    }
+    call_command("collectstatic", interactive=False, verbosity=0)
+    assert (static_root / "changed.css").exists()
+    assert not (static_root / "unchanged.css").exists()
+
+
+def test_collectstatic_without_file_matches_copies_files(
+    static_dirs, settings
+):
+    _, static_root = static_dirs
+    settings.STORAGES = settings.STORAGES | {
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        }
+    }
+    call_command("collectstatic", interactive=False, verbosity=0)
+    assert (static_root / "changed.css").exists()
+    assert (static_root / "unchanged.css").exists()
+
+
+def test_collectstatic_fails_on_stale_critical_css(static_dirs):
+    source, static_root = static_dirs
+    stylesheet = source / STYLESHEET
+    stylesheet.write_text(stylesheet.read_text() + ".stale{color:red}")
+    with pytest.raises(CommandError, match="terminusgps/home.html"):
+        call_command("collectstatic", interactive=False, verbosity=0)
+    assert not static_root.exists()
+
+
+def test_collectstatic_fails_on_missing_critical_css(static_dirs):
+    source, _ = static_dirs
+    (source / get_critical_css_name("terminusgps/about.html")).unlink()
+    with pytest.raises(CommandError, match="terminusgps/about.html"):
+        call_command("collectstatic", interactive=False, verbosity=0)
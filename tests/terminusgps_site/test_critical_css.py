@@ -0,0 +1,119 @@
+import pathlib
+
+import pytest
+from django.conf import settings
+from django.template import Context, Template
+
+from terminusgps_site.critical_css import (
+    drop_unused_definitions,
+    filter_css,
+    find_stale_critical_css,
+    get_markup_classes,
+    parse_css,
+    selector_matches,
+    serialize_css,
+)
+
+CSS = (
+    "@layer theme,base,utilities;"
+    "@layer base{*{margin:0}}"
+    "@layer utilities{"
+    ".flex{display:flex}"
+    ".grid{display:grid}"
+    ".\\@4xl\\:grid-cols-2{@container (width>=56rem){grid-template-columns:repeat(2,minmax(0,1fr))}}"
+    '.hover\\:bg-red{&:hover{@media (hover:hover){background:url("a{b}.png")}}}'
+    "@media (prefers-color-scheme:dark){.dark\\:bg-gray{background:gray}}"
+    "}"
+)
+
+
+@pytest.fixture
+def static_root():
+    return pathlib.Path(settings.STATICFILES_DIRS[0])
+
+
+def test_parse_css_round_trips():
+    assert serialize_css(parse_css(CSS)) == CSS
+
+
+def test_filter_css_keeps_used_rules():
+    critical = serialize_css(
+        filter_css(
+            parse_css(CSS), {"flex", "@4xl:grid-cols-2", "hover:bg-red"}
+        )
+    )
+    assert critical == (
+        "@layer theme,base,utilities;"
+        "@layer base{*{margin:0}}"
+        "@layer utilities{"
+        ".flex{display:flex}"
+        ".\\@4xl\\:grid-cols-2{@container (width>=56rem){grid-template-columns:repeat(2,minmax(0,1fr))}}"
+        '.hover\\:bg-red{&:hover{@media (hover:hover){background:url("a{b}.png")}}}'
+        "}"
+    )
+
+
+def test_filter_css_drops_empty_at_rules():
+    critical = serialize_css(filter_css(parse_css(CSS), {"grid"}))
+    assert "prefers-color-scheme" not in critical
+
+
+def test_drop_unused_definitions():
+    css = (
+        "@layer theme{:root{--color-red:red;--spin:spin 1s;--unused:0}}"
+        "@layer utilities{.text-red{color:var(--color-red)}"
+        ".animate-spin{animation:var(--spin)}}"
+        "@property --tw-x{syntax:'*';inherits:false}"
+        "@property --tw-y{syntax:'*';inherits:false}"
+        "@keyframes spin{to{transform:rotate(360deg)}}"
+        "@keyframes ping{to{opacity:0}}"
+        ".x{--tw-y:1}"
+    )
+    critical = serialize_css(drop_unused_definitions(parse_css(css)))
+    assert critical == (
+        "@layer theme{:root{--color-red:red;--spin:spin 1s}}"
+        "@layer utilities{.text-red{color:var(--color-red)}"
+        ".animate-spin{animation:var(--spin)}}"
+        "@keyframes spin{to{transform:rotate(360deg)}}"
+    )
+
+
+@pytest.mark.parametrize(
+    "selector,expected",
+    [
+        (".group-hover\\:underline:is(:where(.group):hover *)", True),
+        (".peer-checked\\:flex:is(:where(.peer):checked~*)", False),
+        ("legend", True),
+        (".unused,.flex", True),
+    ],
+)
+def test_selector_matches(selector, expected):
+    classes = {"group", "group-hover:underline", "peer-checked:flex", "flex"}
+    assert selector_matches(selector, classes) is expected
+
+
+def test_get_markup_classes_ignores_template_tags():
+    markup = '<p class="p-2 {% if x %}flex{% endif %}">{{ x }}</p>'
+    assert get_markup_classes(markup) == {"p-2", "flex"}
+
+
+def test_critical_css_is_up_to_date(static_root):
+    """Fails if output.css or a template changed without running extract_critical_css."""
+    assert find_stale_critical_css(static_root) == []
+
+
+def test_stylesheet_inlines_critical_css():
+    template = Template(
+        "{% load critical_css %}{% stylesheet %}", name="terminusgps/home.html"
+    )
+    html = template.render(Context())
+    assert html.startswith("<style>/* terminusgps/home.html ")
+    assert 'media="print" onload="this.media=\'all\'"' in html
+    assert "<noscript>" in html
+
+
+def test_stylesheet_without_critical_css_blocks():
+    template = Template("{% load critical_css %}{% stylesheet %}")
+    assert template.render(Context()) == (
+        '<link rel="stylesheet" href="/static/terminusgps/css/output.css"/>'
+    )
@@ -0,0 +1,59 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from terminusgps_site.prerender import (
+    CSRF_PLACEHOLDER,
+    load_prerendered_pages,
+    render_pages,
+)
+
+
+@pytest.fixture
+def prerendered_pages(settings, tmp_path):
+    settings.PRERENDER_ROOT = tmp_path
+    manifest = render_pages(tmp_path)
+    load_prerendered_pages.cache_clear()
+    yield manifest
+    load_prerendered_pages.cache_clear()
+
+
+def test_render_pages_writes_full_and_partial_variants(prerendered_pages):
+    assert "terminusgps/home.html" in prerendered_pages
+    assert "terminusgps/home.html#main" in prerendered_pages
+    assert len(prerendered_pages) == 14
+
+
+@pytest.mark.parametrize(
+    "headers,template_name",
+    [
+        ({}, "terminusgps/about.html"),
+        ({"HX-Request": "true"}, "terminusgps/about.html#main"),
+    ],
+)
+def test_prerendered_page_served_to_anonymous_visitor(
+    client, prerendered_pages, headers, template_name
+):
+    response = client.get(reverse("about"), headers=headers)
+    content, etag = load_prerendered_pages()[template_name]
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["ETag"] == f'"{etag}"'
+    assert not hasattr(response, "template_name")
+
+
+def test_prerendered_page_csrf_token_replaced(client, prerendered_pages):
+    response = client.get(reverse("contact"))
+    assert CSRF_PLACEHOLDER.encode() not in response.content
+    assert b'name="csrfmiddlewaretoken"' in response.content
+    assert "csrftoken" in response.cookies
+
+
+@pytest.mark.django_db
+def test_prerendered_page_not_served_to_authenticated_user(
+    client, credentials, prerendered_pages
+):
+    get_user_model().objects.create_user(**credentials)
+    client.login(**credentials)
+    response = client.get(reverse("home"))
+    assert response.template_name == "terminusgps/home.html"
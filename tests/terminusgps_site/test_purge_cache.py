@@ -0,0 +1,44 @@
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from terminusgps.surrogate_keys import get_default_cache
+
+
+@pytest.fixture(autouse=True)
+def page_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    settings.MIDDLEWARE = settings.MIDDLEWARE + [
+        "terminusgps.middleware.AnonymousFetchFromCacheMiddleware"
+    ]
+    cache = get_default_cache()
+    yield cache
+    cache.clear()
+
+
+def purge_cache(*args):
+    stdout = io.StringIO()
+    call_command("purge_cache", *args, stdout=stdout)
+    return stdout.getvalue().splitlines()
+
+
+def test_purge_cache_by_template_name(client):
+    client.get(reverse("about"))
+    client.get(reverse("faq"))
+    assert purge_cache("terminusgps/about.html")[:-1] == ["/about/"]
+
+
+def test_purge_cache_changed_purges_once(client):
+    client.get(reverse("about"))
+    assert purge_cache("--changed")[:-1] == ["/about/"]
+    client.get(reverse("about"))
+    assert purge_cache("--changed")[:-1] == []
+
+
+def test_purge_cache_requires_keys():
+    with pytest.raises(CommandError):
+        call_command("purge_cache")
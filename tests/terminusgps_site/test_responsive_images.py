@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from django.template import Context, Template
+from PIL import Image
+
+import terminusgps_site.templatetags.responsive_images
+from terminusgps_site.images import (
+    RESPONSIVE_MANIFEST,
+    generate_responsive_images,
+    get_variant_widths,
+)
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    image_dir = tmp_path / "terminusgps" / "img"
+    image_dir.mkdir(parents=True)
+    Image.new("RGB", (1000, 500), "red").save(image_dir / "sedan.jpg")
+    Image.new("RGBA", (300, 300), (0, 0, 0, 0)).save(image_dir / "logo.png")
+    return tmp_path
+
+
+@pytest.fixture
+def manifest(static_root, monkeypatch):
+    generate_responsive_images(static_root)
+    manifest = json.loads((static_root / RESPONSIVE_MANIFEST).read_text())
+    monkeypatch.setattr(
+        terminusgps_site.templatetags.responsive_images,
+        "load_manifest",
+        lambda: manifest,
+    )
+    return manifest
+
+
+def render(template_string):
+    return Template("{% load responsive_images %}" + template_string).render(
+        Context()
+    )
+
+
+def test_get_variant_widths_caps_at_source_width():
+    assert get_variant_widths(1000) == [480, 960, 1000]
+    assert get_variant_widths(300) == [300]
+
+
+def test_generate_responsive_images_writes_variants(static_root, manifest):
+    entry = manifest["terminusgps/img/sedan.jpg"]
+    assert (entry["width"], entry["height"]) == (1000, 500)
+    assert list(entry["sources"]) == ["image/avif", "image/webp"]
+    for name, width in entry["fallback"]:
+        assert name.endswith(".jpg")
+        with Image.open(static_root / name) as image:
+            assert image.size == (width, width // 2)
+    for variants in entry["sources"].values():
+        assert [width for _, width in variants] == [480, 960, 1000]
+
+
+def test_generate_responsive_images_keeps_transparency(manifest):
+    entry = manifest["terminusgps/img/logo.png"]
+    assert entry["fallback"] == [
+        ["terminusgps/img/responsive/logo-300.png", 300]
+    ]
+
+
+def test_generate_responsive_images_skips_unchanged(static_root, manifest):
+    assert generate_responsive_images(static_root) == {}
+    assert list(generate_responsive_images(static_root, force=True)) == [
+        "terminusgps/img/logo.png",
+        "terminusgps/img/sedan.jpg",
+    ]
+
+
+def test_responsive_image_renders_picture(manifest):
+    html = render(
+        '{% responsive_image "terminusgps/img/sedan.jpg" alt="A sedan" sizes="50vw" class="w-full" %}'
+    )
+    assert html.startswith('<picture style="display: contents">')
+    assert (
+        '<source type="image/avif" srcset="/static/terminusgps/img/responsive/sedan-480.avif 480w, '
+        "/static/terminusgps/img/responsive/sedan-960.avif 960w, "
+        '/static/terminusgps/img/responsive/sedan-1000.avif 1000w" sizes="50vw">'
+    ) in html
+    assert html.index("image/avif") < html.index("image/webp")
+    assert 'src="/static/terminusgps/img/responsive/sedan-1000.jpg"' in html
+    assert 'width="1000" height="500"' in html
+    assert (
+        'alt="A sedan" loading="lazy" decoding="async" class="w-full"' in html
+    )
+
+
+def test_responsive_image_without_variants_renders_img(manifest):
+    html = render(
+        '{% responsive_image "terminusgps/img/missing.jpg" alt="Missing" loading="eager" %}'
+    )
+    assert html == (
+        '<img src="/static/terminusgps/img/missing.jpg" alt="Missing" '
+        'loading="eager" decoding="async">'
+    )
+
+
+def test_responsive_image_with_width_scales_height(manifest):
+    html = render(
+        '{% responsive_image "terminusgps/img/sedan.jpg" alt="A sedan" sizes="96px" width=96 %}'
+    )
+    assert 'width="96" height="48"' in html
+    assert 'width="1000"' not in html
@@ -0,0 +1,30 @@
+import io
+
+from django.core.management import call_command
+
+from terminusgps_site.management.commands.startup_profile import (
+    parse_import_times,
+)
+
+
+def test_parse_import_times():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     encodings.aliases\n"
+        "import time:       300 |        420 |   encodings\n"
+        "import time:        80 |        500 | site\n"
+    )
+    assert parse_import_times(output) == [
+        ("encodings.aliases", 120, 120, 2),
+        ("encodings", 300, 420, 1),
+        ("site", 80, 500, 0),
+    ]
+
+
+def test_first_request_does_not_import_heavy_modules():
+    stdout = io.StringIO()
+    call_command("startup_profile", limit=10000, stdout=stdout)
+    output = stdout.getvalue()
+    assert "First request (/):" in output
+    assert " wialon.api\n" not in output
+    assert " PIL.Image\n" not in output
@@ -0,0 +1,55 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.urls import reverse
+
+from terminusgps_site.models import ContactFormResponse
+from terminusgps_site.tasks import email_contact_form_responses
+
+
+@pytest.fixture
+def responses(db):
+    return [
+        ContactFormResponse.objects.create(
+            name=f"Tester {i}", email=f"tester{i}@example.com", message="Hi"
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def locmem_email(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.ADMINS = ["admin@example.com"]
+
+
+def test_email_contact_form_responses_sends_one_email_per_response(responses):
+    result = email_contact_form_responses.enqueue([r.pk for r in responses])
+    assert result.return_value == 3
+    assert len(mail.outbox) == 3
+    assert mail.outbox[0].to == ["admin@example.com"]
+    assert "Tester 0" in mail.outbox[0].subject
+
+
+def test_email_contact_form_responses_reuses_one_connection(responses):
+    with mock.patch(
+        "django.core.mail.backends.locmem.EmailBackend.open",
+        autospec=True,
+        return_value=True,
+    ) as mock_open:
+        email_contact_form_responses.enqueue([r.pk for r in responses])
+    assert mock_open.call_count == 1
+
+
+def test_contact_form_view_enqueues_email_after_commit(
+    client, django_capture_on_commit_callbacks, db
+):
+    data = {"name": "Tester", "email": "tester@example.com", "message": "Hi"}
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        response = client.post(reverse("contact form"), data)
+    assert response.status_code == 302
+    assert len(mail.outbox) == 0
+    assert len(callbacks) == 1
+    callbacks[0]()
+    assert len(mail.outbox) == 1
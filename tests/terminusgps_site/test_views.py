@@ -133,7 +133,7 @@ def test_vary_header(client, location):
 def test_cache_control_header(client, location):
     response = client.get(location)
     assert response.has_header("Cache-Control")
-    assert response.headers["Cache-Control"].startswith("max-age=")
+    assert "max-age=" in response.headers["Cache-Control"]
 
 
 def test_source_code_view_redirect(client):
@@ -170,3 +170,19 @@ def test_android_app_view_redirect(client):
         response.url
         == "https://play.google.com/store/apps/details?id=com.terminusgps.track&pcampaignid=web_share"
     )
+
+
+@pytest.mark.parametrize(
+    "location",
+    [
+        reverse("home"),
+        reverse("about"),
+        reverse("features"),
+        reverse("faq"),
+        reverse("contact"),
+    ],
+)
+def test_marketing_pages_do_not_load_formset(client, location):
+    response = client.get(location)
+    assert b"formset/js/" not in response.content
+    assert reverse("javascript-catalog").encode() not in response.content